@@ -0,0 +1,77 @@
+from machine import Pin
+from neopixel import NeoPixel
+from time import ticks_us, ticks_diff
+import gc
+
+import render
+import brightness
+
+# Benchmark: Helligkeit pro Frame mit Float-Rechnung vs. Lookup-Tabellen
+# Misst Rechenzeit und Heap-Allokationen für Ziel-Helligkeit, weichen
+# Übergang und Füllen des Puffers (ohne np.write())
+
+NUM_LEDS = 12
+FRAMES = 500
+FREQS = (262, 330, 392, 523, 659, 784, 0)
+
+# Auf CPython (Simulator) gibt es kein gc.mem_alloc, dann ohne Heap-Werte
+HAVE_MEM = hasattr(gc, "mem_alloc")
+
+def _alloc():
+    return gc.mem_alloc() if HAVE_MEM else 0
+
+def freq_to_brightness_float(frequency):
+    """Bisheriger Weg: Float-Mapping mit quadratischer Kurve"""
+    if frequency == 0:
+        return 0.0
+    normalized = (frequency - 262) / (784 - 262)
+    normalized = max(0.0, min(1.0, normalized))
+    curved = normalized * normalized
+    return 0.1 + curved * 0.9
+
+def frame_float(np, state, frequency):
+    """Bisheriger Weg: Float-Zustand, int(255 * b) pro Frame"""
+    target = freq_to_brightness_float(frequency)
+    state[0] = state[0] + (target - state[0]) * 0.3
+    render.fill(np, int(255 * state[0]), 0, 0)
+
+def frame_table(np, state, frequency):
+    """Neuer Weg: Q8-Integer und Gamma-Tabelle"""
+    target = brightness.freq_level(frequency) << 8
+    state[0] = state[0] + (((target - state[0]) * 77) >> 8)
+    render.fill(np, brightness.GAMMA[state[0] >> 8], 0, 0)
+
+def measure(frame_func, np, state):
+    """Misst mittlere Frame-Zeit (µs) und Bytes pro Frame"""
+    frame_func(np, state, FREQS[0])
+
+    gc.collect()
+    gc.disable()
+    mem_before = _alloc()
+    start = ticks_us()
+    for f in range(FRAMES):
+        frame_func(np, state, FREQS[f % len(FREQS)])
+    elapsed = ticks_diff(ticks_us(), start)
+    allocated = _alloc() - mem_before
+    gc.enable()
+
+    return elapsed / FRAMES, allocated / FRAMES
+
+np = NeoPixel(Pin(1, Pin.OUT), NUM_LEDS)
+
+print("\n" + "="*44)
+print("  HELLIGKEIT-BENCHMARK ({} Frames)".format(FRAMES))
+print("="*44)
+print("{:>12} | {:>10} | {:>12}".format("Weg", "µs/Frame", "Bytes/Frame"))
+print("-"*44)
+
+for name, func, state in (("Float", frame_float, [0.0]),
+                          ("Tabelle", frame_table, [0])):
+    us, allocated = measure(func, np, state)
+    print("{:>12} | {:>10.1f} | {:>12}".format(
+        name, us, "{:.1f}".format(allocated) if HAVE_MEM else "-"))
+
+print("="*44)
+
+render.clear(np)
+np.write()
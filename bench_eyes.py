@@ -0,0 +1,89 @@
+from machine import Pin
+from neopixel import NeoPixel
+from time import ticks_us, ticks_diff
+import gc
+
+import render
+import segments
+import eye_keyframes
+
+# Benchmark: zwei Augen parallel (12 LEDs) vs. verkettet (24 LEDs, Segmente)
+# Misst pro Frame Puffer-Aufbau (Blinzeln als Keyframes, Lichtshow-Fill)
+# und np.write(), daraus die maximal erreichbare Bildrate. Ziel ist, dass
+# verkettet die 50 Frames pro Sekunde der Lichtshow genauso schafft.
+
+FRAMES = 200
+TARGET_FPS = 50
+PIN = 1
+
+def eye_frames(np, views):
+    """Liefert eine Funktion, die einen Blinzel-Keyframe pro Aufruf anwendet"""
+    on = render.color(np, 2, 2, 2)
+    off = render.color(np, 0, 0, 0)
+    if views is None:
+        targets = [(np, eye_keyframes.animations(12).blink)]
+    else:
+        targets = [(eye, eye_keyframes.animations(eye.n, eye.map).blink) for eye in views]
+
+    state = [None]
+
+    def frame():
+        if state[0] is None:
+            state[0] = eye_keyframes.play_together(targets, on, off)
+        try:
+            next(state[0])
+        except StopIteration:
+            state[0] = None
+
+    return frame
+
+def music_frame(np, views):
+    """Liefert eine Funktion, die einen Lichtshow-Frame (Fill) aufbaut"""
+    def frame():
+        if views is None:
+            render.fill(np, 120, 0, 0)
+        else:
+            for eye in views:
+                render.fill(eye, 120, 0, 0)
+    return frame
+
+def measure(np, frame):
+    """Mittlere Zeit für Puffer-Aufbau und write() in µs"""
+    frame()
+    gc.collect()
+
+    start = ticks_us()
+    for f in range(FRAMES):
+        frame()
+    render_us = ticks_diff(ticks_us(), start) / FRAMES
+
+    start = ticks_us()
+    for f in range(FRAMES):
+        np.write()
+    write_us = ticks_diff(ticks_us(), start) / FRAMES
+
+    return render_us, write_us
+
+print("\n" + "="*62)
+print("  AUGEN-BENCHMARK ({} Frames, Ziel {} fps)".format(FRAMES, TARGET_FPS))
+print("="*62)
+print("{:>10} {:>8} | {:>10} {:>10} | {:>8} | {:>4}".format(
+    "Aufbau", "Frame", "render µs", "write µs", "max fps", "ok"))
+print("-"*62)
+
+for name, n, layout in (("parallel", 12, None), ("verkettet", 24, segments.CHAINED_24)):
+    np = NeoPixel(Pin(PIN, Pin.OUT), n)
+    views = segments.eye_views(np, layout) if layout is not None else None
+
+    for label, frame in (("Augen", eye_frames(np, views)), ("Musik", music_frame(np, views))):
+        render_us, write_us = measure(np, frame)
+        fps = 1000000 / (render_us + write_us)
+        print("{:>10} {:>8} | {:>10.1f} {:>10.1f} | {:>8.0f} | {:>4}".format(
+            name, label, render_us, write_us, fps, "ja" if fps >= TARGET_FPS else "nein"))
+
+    render.clear(np)
+    np.write()
+    del np
+    gc.collect()
+
+print("="*62)
@@ -0,0 +1,74 @@
+from time import ticks_us, ticks_diff
+import gc
+
+import kernels
+from color_wheel import WHEEL
+
+# Benchmark: Python- vs. Viper/Native-Kernel
+# Misst jeden Kernel für verschiedene LED-Anzahlen und gibt den Faktor aus.
+# Ohne Native-Emitter (z.B. auf dem PC) wird nur die Python-Version gemessen.
+
+LED_COUNTS = (12, 24, 60, 144, 300)
+RUNS = 100
+BPP = 3
+
+def _hsv_all(hsv, n):
+    # Ein HSV-Aufruf pro LED (wie bei einem Farbverlauf pro Pixel)
+    for i in range(n):
+        hsv((i * 256 // n) & 255, 255, 128)
+
+def cases(n):
+    """Liefert (Name, Python-Aufruf, kompilierter Aufruf) pro Kernel"""
+    length = n * BPP
+    a = bytearray(length)
+    b = bytearray(b'\x80' * length)
+    dst = bytearray(length)
+
+    compiled = kernels.COMPILED
+    c = kernels
+
+    return (
+        ("scale",
+         lambda: kernels.scale_py(dst, b, length, 100),
+         (lambda: c.scale(dst, b, length, 100)) if compiled else None),
+        ("blend",
+         lambda: kernels.blend_py(dst, a, b, length, 100),
+         (lambda: c.blend(dst, a, b, length, 100)) if compiled else None),
+        ("add",
+         lambda: kernels.add_py(dst, b, length, 100),
+         (lambda: c.add(dst, b, length, 100)) if compiled else None),
+        ("hsv",
+         lambda: _hsv_all(kernels.hsv_to_rgb_py, n),
+         (lambda: _hsv_all(c.hsv_to_rgb, n)) if compiled else None),
+        ("gradient",
+         lambda: kernels.gradient_py(dst, n, BPP, WHEEL, 7, 256, 200, 1, 0, 2, 0, 1),
+         (lambda: c.gradient(dst, n, BPP, WHEEL, 7, 256, 200, 1, 0, 2, 0, 1)) if compiled else None),
+    )
+
+def measure(func):
+    """Mittlere Dauer eines Aufrufs in µs"""
+    func()
+    gc.collect()
+    start = ticks_us()
+    for r in range(RUNS):
+        func()
+    return ticks_diff(ticks_us(), start) / RUNS
+
+print("\n" + "="*52)
+print("  KERNEL-BENCHMARK ({} Aufrufe, kompiliert: {})".format(
+    RUNS, "ja" if kernels.COMPILED else "nein"))
+print("="*52)
+print("{:>8} {:>5} | {:>10} {:>10} | {:>8}".format(
+    "Kernel", "LEDs", "Python µs", "Viper µs", "Faktor"))
+print("-"*52)
+
+for n in LED_COUNTS:
+    for name, py_func, fast_func in cases(n):
+        py_us = measure(py_func)
+        if fast_func is None:
+            print("{:>8} {:>5} | {:>10.1f} {:>10} | {:>8}".format(name, n, py_us, "-", "-"))
+        else:
+            fast_us = measure(fast_func)
+            print("{:>8} {:>5} | {:>10.1f} {:>10.1f} | {:>7.1f}x".format(
+                name, n, py_us, fast_us, py_us / fast_us if fast_us else 0))
+    print("-"*52)
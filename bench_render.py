@@ -0,0 +1,83 @@
+from machine import Pin
+from neopixel import NeoPixel
+from time import ticks_us, ticks_diff
+import gc
+
+import render
+
+# Benchmark: Frame-Zeit und Allokationen pro Frame
+# Vergleicht das bisherige np[i] = (r, g, b) mit render.fill()
+# für verschiedene LED-Anzahlen (nur Puffer-Aufbau, ohne np.write())
+
+LED_COUNTS = (12, 24, 60, 144, 300)
+FRAMES = 200
+
+# Auf CPython (Simulator) gibt es kein gc.mem_alloc, dann ohne Heap-Werte
+HAVE_MEM = hasattr(gc, "mem_alloc")
+
+def _alloc():
+    return gc.mem_alloc() if HAVE_MEM else 0
+
+def _bytes(value):
+    return "{:.1f}".format(value) if HAVE_MEM else "-"
+
+def frame_tuples(np, n, brightness):
+    """Bisheriger Weg: neues Tupel pro Pixel"""
+    r = int(255 * brightness)
+    for i in range(n):
+        np[i] = (r, 0, 0)
+
+def frame_render(np, n, brightness):
+    """Neuer Weg: direkt in den Byte-Puffer"""
+    render.fill(np, int(255 * brightness), 0, 0)
+
+def measure(frame_func, np, n):
+    """Misst mittlere Frame-Zeit (µs) und Bytes pro Frame
+
+    Returns:
+        Tupel (us_pro_frame, bytes_pro_frame), ohne gc.mem_alloc 0 Bytes
+    """
+    # Einmal vorab aufrufen (legt z.B. den Kopierplan an)
+    frame_func(np, n, 0.5)
+
+    gc.collect()
+    gc.disable()
+    mem_before = _alloc()
+    start = ticks_us()
+    for f in range(FRAMES):
+        frame_func(np, n, 0.5)
+    elapsed = ticks_diff(ticks_us(), start)
+    allocated = _alloc() - mem_before
+    gc.enable()
+
+    return elapsed / FRAMES, allocated / FRAMES
+
+def measure_write(np):
+    """Misst die Dauer von np.write() in µs"""
+    start = ticks_us()
+    for f in range(10):
+        np.write()
+    return ticks_diff(ticks_us(), start) / 10
+
+print("\n" + "="*56)
+print("  RENDER-BENCHMARK ({} Frames pro Messung)".format(FRAMES))
+print("="*56)
+print("{:>5} | {:>10} {:>9} | {:>10} {:>9} | {:>8}".format(
+    "LEDs", "Tupel µs", "Bytes", "render µs", "Bytes", "write µs"))
+print("-"*56)
+
+for n in LED_COUNTS:
+    np = NeoPixel(Pin(1, Pin.OUT), n)
+    old_us, old_bytes = measure(frame_tuples, np, n)
+    new_us, new_bytes = measure(frame_render, np, n)
+    write_us = measure_write(np)
+    print("{:>5} | {:>10.1f} {:>9} | {:>10.1f} {:>9} | {:>8.0f}".format(
+        n, old_us, _bytes(old_bytes), new_us, _bytes(new_bytes), write_us))
+
+    # LEDs wieder ausschalten
+    render.clear(np)
+    np.write()
+    del np
+    gc.collect()
+
+print("="*56)
@@ -0,0 +1,80 @@
+from time import ticks_us, ticks_diff
+import gc
+
+import song_format
+
+# Benchmark: Startzeit und Heap für die Melodien
+# Vorher: alle melody_*.py Module importieren (Listen aus Tupeln mit
+# Strings und Floats) und jede Note über das NOTES-Dict nachschlagen.
+# Nachher: ein Lied erst bei Auswahl aus der .pns-Datei laden.
+
+MODULES = ("melody_jingle_bells", "melody_we_wish_you", "melody_silent_night")
+SONGS = ("songs/jingle_bells.pns", "songs/we_wish_you.pns", "songs/silent_night.pns")
+
+# Auf CPython (Simulator) gibt es kein gc.mem_alloc, dann ohne Heap-Werte
+HAVE_MEM = hasattr(gc, "mem_alloc")
+
+def _alloc():
+    return gc.mem_alloc() if HAVE_MEM else 0
+
+NOTES = {
+    'C4': 262, 'C#4': 277, 'D4': 294, 'E4': 330, 'F4': 349, 'F#4': 370,
+    'G4': 392, 'G#4': 415, 'A4': 440, 'B4': 494, 'C5': 523, 'C#5': 554,
+    'D5': 587, 'E5': 659, 'F5': 698, 'G5': 784, 'REST': 0,
+}
+
+def measure(func):
+    """Misst Dauer (µs) und belegten Heap (Bytes) eines Aufrufs
+
+    Returns:
+        Tupel (us, bytes_belegt, bytes_nach_gc, ergebnis), Bytes ohne
+        gc.mem_alloc als "-"
+    """
+    gc.collect()
+    mem_before = _alloc()
+    start = ticks_us()
+    result = func()
+    elapsed = ticks_diff(ticks_us(), start)
+    allocated = _alloc() - mem_before
+    gc.collect()
+    retained = _alloc() - mem_before
+    if not HAVE_MEM:
+        allocated = retained = "-"
+    return elapsed, allocated, retained, result
+
+def import_modules():
+    return [__import__(name).melody for name in MODULES]
+
+def load_one():
+    return song_format.load(SONGS[0])
+
+def iterate_old(melodies):
+    total = 0
+    for melody in melodies:
+        for note, duration in melody:
+            total += NOTES[note] + int(duration * 1000)
+    return total
+
+def iterate_new(songs):
+    total = 0
+    for song in songs:
+        for event in song.events():
+            total += event[0] + event[1]
+    return total
+
+print("\n" + "="*50)
+print("  MELODIE-BENCHMARK")
+print("="*50)
+
+us, allocated, retained, melodies = measure(import_modules)
+print("Vorher:  3 Module importieren   {:>7} µs  {:>6} B  (bleibt: {} B)".format(us, allocated, retained))
+
+us, allocated, retained, song = measure(load_one)
+print("Nachher: 1 Lied bei Auswahl     {:>7} µs  {:>6} B  (bleibt: {} B)".format(us, allocated, retained))
+
+songs = [song_format.load(path) for path in SONGS]
+us, allocated, retained, total = measure(lambda: iterate_old(melodies))
+print("Abspielen alt (alle Noten)      {:>7} µs  {:>6} B".format(us, allocated))
+us, allocated, retained, total = measure(lambda: iterate_new(songs))
+print("Abspielen neu (alle Noten)      {:>7} µs  {:>6} B".format(us, allocated))
+print("="*50)
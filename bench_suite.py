@@ -0,0 +1,197 @@
+from time import ticks_ms, ticks_diff
+import gc
+import json
+import random
+
+import hardware
+import render
+import kernels
+import neopixel_eyes
+import christmas_light_show
+import song_stream
+
+# Benchmark-Suite: Bildrate, write()-Aufrufe, Allokationen und Tempo
+#
+# Spielt jede Augen-Animation und jedes Lied aus songs/ einmal ab (über
+# neopixel_eyes bzw. christmas_light_show.play_melody) und misst dabei an
+# jedem np.write():
+#   fps          write()-Aufrufe pro Sekunde
+#   writes/sent  write()-Aufrufe / tatsächlich gesendete Frames (FrameBuffer)
+#   B/Frame      neu belegter Heap pro Frame (Anstieg von gc.mem_alloc)
+#   gc           Garbage Collections (gc.mem_alloc fällt zwischen zwei Frames)
+#   Abweichung   Ist- minus Soll-Dauer des Lieds (drift_log)
+# Die Ergebnisse landen als JSON in RESULTS_FILE. Liegt dort schon eine
+# Datei (z.B. vom letzten Stand), wird sie nach BASELINE_FILE verschoben
+# und die Änderung mit ausgegeben.
+#
+# Auf dem Pico dauert ein Durchlauf so lange wie alle Lieder zusammen, im
+# Simulator nur Sekunden: python3 -m sim bench_suite.py --seconds 100000
+#
+# Mit BACKEND = hardware.NULL kostet die Ausgabe nichts, die Bildrate zeigt
+# dann nur die Render-Kosten (Differenz zu REAL = Kosten von np.write()).
+
+RESULTS_FILE = "bench_results.json"
+BASELINE_FILE = "bench_results_prev.json"
+LABEL = "aktuell"      # Name des gemessenen Stands (z.B. Commit)
+
+EYE_RUNS = 5           # Wiederholungen pro Augen-Animation
+SEED = 1               # random für do_animation(), damit Läufe vergleichbar sind
+BACKEND = hardware.REAL
+
+# Auf CPython (Simulator) gibt es kein gc.mem_alloc, dann ohne Heap-Werte
+HAVE_MEM = hasattr(gc, "mem_alloc")
+
+class Probe:
+    """NeoPixel-Hülle, die bei jedem write() misst (gleiche API wie NeoPixel)"""
+
+    def __init__(self, np):
+        self.fb = render.FrameBuffer(np)
+        self.buf = self.fb.buf
+        self.bpp = self.fb.bpp
+        self.ORDER = self.fb.ORDER
+        self.n = self.fb.n
+        self.reset()
+
+    def __len__(self):
+        return self.n
+
+    def __setitem__(self, i, v):
+        self.fb[i] = v
+
+    def __getitem__(self, i):
+        return self.fb[i]
+
+    def reset(self):
+        self.writes = 0
+        self.allocated = 0
+        self.collections = 0
+        self.fb.writes = 0
+        self.fb.skipped = 0
+        self._mem = gc.mem_alloc() if HAVE_MEM else 0
+
+    def write(self):
+        if HAVE_MEM:
+            mem = gc.mem_alloc()
+            if mem >= self._mem:
+                self.allocated += mem - self._mem
+            else:
+                self.collections += 1
+            self._mem = mem
+        self.writes += 1
+        self.fb.write()
+
+    def result(self, name, kind, elapsed_ms):
+        frames = self.writes
+        return {
+            "name": name,
+            "kind": kind,
+            "ms": elapsed_ms,
+            "writes": frames,
+            "sent": self.fb.writes,
+            "fps": round(frames * 1000 / elapsed_ms, 1) if elapsed_ms > 0 else 0,
+            "bytes_per_frame": round(self.allocated / frames, 1) if HAVE_MEM and frames else None,
+            "gc": self.collections if HAVE_MEM else None,
+        }
+
+def run_case(probe, name, kind, func):
+    gc.collect()
+    probe.reset()
+    start = ticks_ms()
+    func()
+    return probe.result(name, kind, ticks_diff(ticks_ms(), start))
+
+def repeat(func, runs):
+    def run():
+        for r in range(runs):
+            func()
+    return run
+
+def bench_eyes(probe):
+    neopixel_eyes.np = probe
+    random.seed(SEED)
+    results = []
+    for name, func in (("blink", neopixel_eyes.blink),
+                       ("look_left", neopixel_eyes.look_left),
+                       ("look_right", neopixel_eyes.look_right),
+                       ("do_animation", neopixel_eyes.do_animation)):
+        results.append(run_case(probe, name, "eyes", repeat(func, EYE_RUNS)))
+    neopixel_eyes.clear_all()
+    return results
+
+def bench_songs(probe):
+    show = christmas_light_show
+    results = []
+    for path in song_stream.list_songs():
+        song = song_stream.open_song(path)
+        show.light.set(0)
+        result = run_case(probe, song.name, "song", lambda: show.play_melody(song.events()))
+        log = show.drift_log
+        result["nominal_ms"] = log.nominal_ms
+        result["actual_ms"] = log.actual_ms
+        result["deviation_ms"] = log.actual_ms - log.nominal_ms
+        results.append(result)
+    show.clear_neopixel()
+    return results
+
+def _load(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _save(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+def _fmt(value, spec):
+    return "-" if value is None else spec.format(value)
+
+def report(results, baseline):
+    old = {}
+    if baseline is not None:
+        for entry in baseline["results"]:
+            old[(entry["kind"], entry["name"])] = entry
+
+    print("\n" + "="*86)
+    print("  BENCHMARK-SUITE ({}, Backend {}, Kernel kompiliert: {})".format(
+        LABEL, BACKEND, "ja" if kernels.COMPILED else "nein"))
+    if baseline is not None:
+        print("  Vergleich mit: {}".format(baseline["label"]))
+    print("="*86)
+    print("{:<22} {:>8} {:>7} {:>6} {:>8} {:>4} {:>10} | {:>14}".format(
+        "Fall", "ms", "writes", "sent", "B/Frame", "gc", "Abw. ms", "fps (vorher)"))
+    print("-"*86)
+    for entry in results:
+        before = old.get((entry["kind"], entry["name"]))
+        print("{:<22} {:>8} {:>7} {:>6} {:>8} {:>4} {:>10} | {:>6} ({:>5})".format(
+            entry["name"][:22], entry["ms"], entry["writes"], entry["sent"],
+            _fmt(entry["bytes_per_frame"], "{:.1f}"), _fmt(entry["gc"], "{}"),
+            _fmt(entry.get("deviation_ms"), "{}"), entry["fps"],
+            "-" if before is None else before["fps"]))
+    print("="*86)
+
+def main():
+    hw = hardware.init(BACKEND)
+    np = hw.np
+    buzzer = hw.buzzer
+    probe = Probe(np)
+    christmas_light_show.init_hardware(neopixel_obj=probe, buzzer_obj=buzzer)
+
+    try:
+        results = bench_eyes(probe) + bench_songs(probe)
+    finally:
+        buzzer.duty_u16(0)
+        render.clear(np)
+        np.write()
+
+    baseline = _load(RESULTS_FILE)
+    if baseline is not None:
+        _save(BASELINE_FILE, baseline)
+    _save(RESULTS_FILE, {"label": LABEL, "backend": BACKEND, "compiled": kernels.COMPILED,
+                         "results": results})
+
+    report(results, baseline)
+    print("Ergebnisse: {}".format(RESULTS_FILE))
+
+main()
@@ -0,0 +1,64 @@
+# Helligkeit mit Lookup-Tabellen statt Float-Rechnung
+#
+# Helligkeit ist überall eine ganze Zahl 0-255 (wahrgenommene Helligkeit).
+# GAMMA rechnet sie in den LED-Wert um, damit Fades auch im dunklen Bereich
+# gleichmäßig wirken. Floats sind auf MicroPython Heap-Objekte, deshalb wird
+# pro Frame nur mit Integern und Tabellen gerechnet.
+
+GAMMA_EXPONENT = 2.2
+
+# Frequenzbereich für das Helligkeit-Mapping
+MIN_FREQ = 262  # C4
+MAX_FREQ = 784  # G5
+
+# Helligkeitsbereich für Töne: 10% bis 100% LED-Wert (wahrgenommen 89-255)
+MIN_FREQ_LEVEL = 89
+
+def _gamma_table():
+    table = bytearray(256)
+    for i in range(256):
+        table[i] = int(255 * (i / 255) ** GAMMA_EXPONENT + 0.5)
+    return bytes(table)
+
+def _freq_curve_table():
+    # Quadratische Kurve verstärkt Unterschiede: tiefe Töne dunkler, hohe heller.
+    # Sie gilt für den LED-Wert, abgelegt wird die wahrgenommene Helligkeit,
+    # weil beim Zeichnen noch GAMMA angewendet wird.
+    low = (MIN_FREQ_LEVEL / 255) ** GAMMA_EXPONENT
+    table = bytearray(256)
+    for i in range(256):
+        led = low + (1 - low) * (i * i) / (255 * 255)
+        table[i] = int(255 * led ** (1 / GAMMA_EXPONENT) + 0.5)
+    return bytes(table)
+
+# Wahrgenommene Helligkeit (0-255) -> LED-Wert (0-255)
+GAMMA = _gamma_table()
+
+# Position im Frequenzbereich (0-255) -> wahrgenommene Helligkeit (MIN_FREQ_LEVEL-255)
+FREQ_CURVE = _freq_curve_table()
+
+def scale(value, level):
+    """Skaliert einen Wert 0-255 mit einer Helligkeit 0-255 (nur Integer)"""
+    return (value * (level + 1)) >> 8
+
+def freq_level(frequency):
+    """Mappt eine Frequenz auf eine Helligkeit 0-255 (0 bei Pause)"""
+    if frequency == 0:
+        return 0
+
+    # Position im Frequenzbereich 0-255 (begrenzt)
+    if frequency <= MIN_FREQ:
+        return FREQ_CURVE[0]
+    if frequency >= MAX_FREQ:
+        return FREQ_CURVE[255]
+    return FREQ_CURVE[(frequency - MIN_FREQ) * 255 // (MAX_FREQ - MIN_FREQ)]
+
+def scale_color(color, level):
+    """Skaliert eine RGB-Farbe mit Helligkeit 0-255 inkl. Gamma-Korrektur
+
+    Returns:
+        Tupel (r, g, b) mit LED-Werten
+    """
+    return (GAMMA[scale(color[0], level)],
+            GAMMA[scale(color[1], level)],
+            GAMMA[scale(color[2], level)])
@@ -0,0 +1,202 @@
+from machine import Pin, disable_irq, enable_irq
+from time import ticks_ms, ticks_diff
+from array import array
+
+import profiler
+
+# Button-Events per Pin-Interrupt statt Polling
+#
+# Der Interrupt-Handler speichert nur entprellte Flanken mit Zeitstempel in
+# einem Ringpuffer fester Größe (keine Allokation im ISR). update() wertet
+# die Flanken im Hauptprogramm aus und erzeugt daraus Gesten-Events.
+
+# Event-Typen
+NONE = 0
+PRESS = 1
+RELEASE = 2
+LONG_PRESS = 3
+DOUBLE_PRESS = 4
+
+EVENT_NAMES = ("NONE", "PRESS", "RELEASE", "LONG_PRESS", "DOUBLE_PRESS")
+
+# Zeiten in Millisekunden
+DEBOUNCE_MS = 30        # Flanken innerhalb dieser Zeit gelten als Prellen
+LONG_PRESS_MS = 800     # Gedrückt halten ab dieser Dauer -> LONG_PRESS
+DOUBLE_PRESS_MS = 350   # Zweiter Druck innerhalb dieser Zeit -> DOUBLE_PRESS
+
+QUEUE_SIZE = 16
+
+class ButtonEvents:
+    """Interrupt-gesteuerter Button mit Event-Warteschlange
+
+    Der Button ist aktiv-low (Pull-Up, Taster gegen GND).
+    """
+
+    def __init__(self, pin, queue_size=QUEUE_SIZE):
+        self.pin = pin
+        self.size = queue_size
+
+        # Rohe Flanken aus dem ISR (Pegel + Zeitstempel)
+        self._edge_level = bytearray(queue_size)
+        self._edge_time = array('i', [0] * queue_size)
+        self._edge_head = 0
+        self._edge_tail = 0
+
+        # Erkannte Gesten für das Hauptprogramm
+        self._event_type = bytearray(queue_size)
+        self._event_time = array('i', [0] * queue_size)
+        self._event_head = 0
+        self._event_tail = 0
+
+        # Zeitstempel des zuletzt mit get() gelesenen Events
+        self.last_time = 0
+        # Verworfene Flanken/Events wegen voller Warteschlange
+        self.dropped = 0
+
+        # Zustand im ISR
+        self._level = pin.value()
+        self._last_edge_ms = ticks_ms()
+
+        # Zustand der Gestenerkennung
+        self._pressed = self._level == 0
+        self._press_ms = self._last_edge_ms
+        self._release_ms = self._last_edge_ms
+        self._long_sent = False
+        self._double_armed = False
+
+        pin.irq(handler=self._irq, trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING, hard=True)
+
+    def _irq(self, pin):
+        """Interrupt-Handler: nur entprellen und Flanke ablegen (keine Allokation)"""
+        now = ticks_ms()
+        level = pin.value()
+
+        # Kein Pegelwechsel oder Prellen kurz nach der letzten Flanke
+        if level == self._level or ticks_diff(now, self._last_edge_ms) < DEBOUNCE_MS:
+            return
+
+        self._level = level
+        self._last_edge_ms = now
+
+        head = self._edge_head
+        next_head = (head + 1) % self.size
+        if next_head == self._edge_tail:
+            self.dropped += 1
+            return
+
+        self._edge_level[head] = level
+        self._edge_time[head] = now
+        self._edge_head = next_head
+
+    def _push(self, event_type, timestamp):
+        """Legt ein Gesten-Event in die Warteschlange"""
+        head = self._event_head
+        next_head = (head + 1) % self.size
+        if next_head == self._event_tail:
+            self.dropped += 1
+            return
+
+        self._event_type[head] = event_type
+        self._event_time[head] = timestamp
+        self._event_head = next_head
+
+    def _handle_edge(self, level, timestamp):
+        """Wertet eine entprellte Flanke aus (Gestenerkennung)"""
+        if level == 0:
+            # Drücken
+            self._pressed = True
+            self._long_sent = False
+            self._push(PRESS, timestamp)
+
+            if self._double_armed and ticks_diff(timestamp, self._release_ms) <= DOUBLE_PRESS_MS:
+                self._push(DOUBLE_PRESS, timestamp)
+                self._double_armed = False
+            else:
+                self._double_armed = True
+
+            self._press_ms = timestamp
+        else:
+            # Loslassen
+            self._pressed = False
+            self._release_ms = timestamp
+            self._push(RELEASE, timestamp)
+
+            # Nach langem Druck zählt der nächste Druck nicht als Doppeldruck
+            if self._long_sent:
+                self._double_armed = False
+
+    def update(self):
+        """Überträgt Flanken aus dem ISR in Gesten-Events
+
+        Wird automatisch von get() und was_pressed() aufgerufen.
+        """
+        while self._edge_tail != self._edge_head:
+            tail = self._edge_tail
+            self._handle_edge(self._edge_level[tail], self._edge_time[tail])
+            self._edge_tail = (tail + 1) % self.size
+
+        now = ticks_ms()
+
+        # Flanke während der Entprellzeit verpasst? Pegel nachträglich abgleichen
+        if ticks_diff(now, self._last_edge_ms) >= DEBOUNCE_MS:
+            irq_state = disable_irq()
+            level = self.pin.value()
+            changed = level != self._level
+            if changed:
+                self._level = level
+                self._last_edge_ms = now
+            enable_irq(irq_state)
+
+            if changed:
+                self._handle_edge(level, now)
+
+        # Langer Druck wird schon während des Haltens gemeldet
+        if self._pressed and not self._long_sent:
+            if ticks_diff(now, self._press_ms) >= LONG_PRESS_MS:
+                self._long_sent = True
+                self._push(LONG_PRESS, now)
+
+        # Doppeldruck-Fenster abgelaufen
+        if self._double_armed and not self._pressed:
+            if ticks_diff(now, self._release_ms) > DOUBLE_PRESS_MS:
+                self._double_armed = False
+
+    def get(self):
+        """Holt das nächste Event aus der Warteschlange
+
+        Returns:
+            Event-Typ (PRESS, RELEASE, ...) oder NONE wenn leer.
+            Der Zeitstempel (ticks_ms) steht danach in self.last_time.
+        """
+        self.update()
+
+        tail = self._event_tail
+        if tail == self._event_head:
+            return NONE
+
+        self.last_time = self._event_time[tail]
+        self._event_tail = (tail + 1) % self.size
+        event_type = self._event_type[tail]
+        if profiler.ENABLED and event_type == PRESS:
+            profiler.INPUT.add(ticks_diff(ticks_ms(), self.last_time) * 1000)
+        return event_type
+
+    def was_pressed(self):
+        """Prüft ob seit dem letzten Aufruf gedrückt wurde (für Interrupt-Checks)
+
+        Verbraucht alle anstehenden Events bis einschließlich zum ersten PRESS.
+
+        Returns:
+            True wenn ein PRESS-Event anstand, False sonst
+        """
+        while True:
+            event = self.get()
+            if event == NONE:
+                return False
+            if event == PRESS:
+                return True
+
+    def clear(self):
+        """Verwirft alle anstehenden Events (z.B. nach einem Lied)"""
+        self.update()
+        self._event_tail = self._event_head
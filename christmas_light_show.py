@@ -1,35 +1,56 @@
-from machine import Pin, PWM
-from neopixel import NeoPixel
 from time import sleep
 
-# Verfügbare Melodien importieren
-import melody_jingle_bells
-import melody_we_wish_you
-import melody_silent_night
-
-# Hardware-Konfiguration
-NUM_LEDS = 12  # Anzahl LEDs im Ring anpassen!
+import hardware
+import log
+import memory
+import profiler
+import render
+import brightness
+import color_wheel
+import segments
+from envelope import Envelope
+from timing import Scheduler, DriftLog
+from tone_sequencer import ToneSequencer
+import song_format
+import song_stream
+
+# Hardware-Konfiguration (Pins und LED-Anzahl stehen in hardware.py)
+NUM_LEDS = hardware.NUM_LEDS
 
 # Hardware-Objekte - MÜSSEN vor Verwendung durch init_hardware() initialisiert werden
 # Die type: ignore Kommentare unterdrücken IDE-Warnungen, da zur Laufzeit garantiert ist,
 # dass init_hardware() aufgerufen wird bevor eine Funktion die Hardware verwendet
 np = None  # type: ignore
 buzzer = None  # type: ignore
+sequencer = None  # type: ignore
+
+# True: Töne per Hardware-Timer (ToneSequencer), die Lichter folgen nur der
+# Position. False: Töne und Lichter gemeinsam in einer Schleife.
+USE_TIMER_SEQUENCER = True
+
+# True: Licht-Shows werden im Leerlauf vorberechnet und aus cache/ abgespielt
+# (siehe show_cache.py), beim Abspielen wird dann nichts mehr gerechnet
+USE_SHOW_CACHE = True
+
+# So lange darf precompile() pro Pause zwischen Augen-Animationen rechnen
+# (verzögert höchstens einen Button-Druck um diese Zeit)
+PRECOMPILE_MS = 100
 
 def init_hardware(neopixel_obj=None, buzzer_obj=None):
-    """Initialisiert Hardware oder übernimmt übergebene Objekte"""
-    global np, buzzer
+    """Übernimmt übergebene Objekte, sonst die aus hardware.get()"""
+    global np, buzzer, sequencer
 
     if neopixel_obj is not None:
         np = neopixel_obj
     else:
-        neopixel_pin = Pin(1, Pin.OUT)
-        np = NeoPixel(neopixel_pin, NUM_LEDS)
+        np = hardware.get().np
 
     if buzzer_obj is not None:
         buzzer = buzzer_obj
     else:
-        buzzer = PWM(Pin(8))
+        buzzer = hardware.get().buzzer
+
+    sequencer = ToneSequencer(buzzer, VOLUME, gap_ms=NOTE_GAP_MS, onset_log=drift_log)
 
 # Lautstärke-Einstellungen
 VOLUME_LOW = 16384      # 25% Duty Cycle
@@ -59,121 +80,179 @@ NOTES = {
     'REST': 0
 }
 
+# Zeitsteuerung (Millisekunden)
+FRAME_MS = 20       # 50 Updates pro Sekunde während eines Tons
+FADE_FRAME_MS = 10  # 100 Updates pro Sekunde beim Abdimmen
+NOTE_GAP_MS = 50    # Pause zwischen den Noten (Teil der Notendauer)
+
+# Höchstens so lange darf eine Garbage Collection in der Pause zwischen
+# zwei Noten dauern (der Rest bleibt für die Fade-Frames)
+GC_BUDGET_US = NOTE_GAP_MS * 1000 // 2
+
 # Frequenzbereich für Helligkeit-Mapping
-MIN_FREQ = 262  # C4
-MAX_FREQ = 784  # G5
-
-# Melodie-Auswahl
-MELODIES = {
-    1: ("Jingle Bells", melody_jingle_bells.melody),
-    2: ("We Wish You a Merry Christmas", melody_we_wish_you.melody),
-    3: ("Silent Night", melody_silent_night.melody),
-}
+MIN_FREQ = brightness.MIN_FREQ  # C4
+MAX_FREQ = brightness.MAX_FREQ  # G5
+
+# Übergänge in 1/256 pro Frame (Integer statt Float)
+FOLLOW_SPEED = 77       # ~0.3: Annäherung an die Helligkeit des Tons
+END_FADE_SPEED = 51     # ~0.2: Ausblenden am Liedende
+FADE_RATE = 38          # ~0.15: Abdimmen pro 10ms zwischen den Noten (0.85 bleibt)
+FADE_RATE_20MS = 71     # ~1-0.85²: dasselbe Abdimmen bei 20ms pro Frame
+
+# Farbe pro Auge, wenn die Augen einzeln adressierbar sind (links, rechts)
+EYE_COLORS = ((255, 0, 0), (255, 0, 0))
+
+# True: Farbe folgt der Tonhöhe (tief = Rot, hoch = Blau) statt EYE_COLORS
+NOTE_COLORS = False
+# Farbton-Bereich über den Ring bei NOTE_COLORS (0 = alle LEDs gleich)
+NOTE_SPREAD = 24
+
+# Hüllkurve der Helligkeit (ersetzt den globalen Float-Wert)
+light = Envelope()
 
 # Globale Variablen für weiche Übergänge
-current_brightness = 0
 current_hue = 0
-last_played_song_index = None  # Merkt sich das zuletzt gespielte Lied
+last_played_song = None  # Pfad des zuletzt gespielten Lieds
+
+# Frame mit voller Helligkeit, den _fill_current() pro Frame skaliert
+_base = None  # (n, bpp, ORDER, EYE_LAYOUT, EYE_COLORS, Puffer)
+
+# Zeitbasis für Noten und Frames, Drift-Protokoll des letzten Lieds
+scheduler = Scheduler()
+drift_log = DriftLog()
 
 def hsv_to_rgb(h, s, v):
-    """Konvertiert HSV zu RGB (h: 0-360, s: 0-1, v: 0-1)"""
-    h = h % 360
-    c = v * s
-    x = c * (1 - abs((h / 60) % 2 - 1))
-    m = v - c
-
-    if h < 60:
-        r, g, b = c, x, 0
-    elif h < 120:
-        r, g, b = x, c, 0
-    elif h < 180:
-        r, g, b = 0, c, x
-    elif h < 240:
-        r, g, b = 0, x, c
-    elif h < 300:
-        r, g, b = x, 0, c
-    else:
-        r, g, b = c, 0, x
+    """Konvertiert HSV zu RGB (h: 0-360, s: 0-1, v: 0-1)
 
-    return (int((r + m) * 255), int((g + m) * 255), int((b + m) * 255))
+    Für Frames besser direkt color_wheel.hsv() mit Integern 0-255 nehmen.
+    """
+    return color_wheel.hsv(int(h % 360) * 256 // 360, int(s * 255), int(v * 255))
 
 def freq_to_brightness(frequency):
-    """Mappt Frequenz auf Helligkeit (0.1 bis 1.0) mit stärkerer Spreizung"""
-    if frequency == 0:
-        return 0.0
+    """Mappt Frequenz auf Helligkeit (10% bis 100%, als 0-255) mit stärkerer Spreizung
+
+    Niedrige Töne werden dunkler, hohe Töne heller (quadratische Kurve aus
+    der Tabelle brightness.FREQ_CURVE). Pause -> 0.
+    """
+    return brightness.freq_level(frequency)
 
-    # Normalisiere Frequenz zwischen MIN_FREQ und MAX_FREQ
-    normalized = (frequency - MIN_FREQ) / (MAX_FREQ - MIN_FREQ)
-    normalized = max(0.0, min(1.0, normalized))  # Clamp auf 0-1
+def note_target(frequency):
+    """Ziel-Helligkeit für einen Ton, merkt sich bei NOTE_COLORS seinen Farbton
 
-    # Exponentialfunktion für stärkere Kontraste
-    # Niedrige Töne werden dunkler, hohe Töne heller
-    normalized = normalized ** 2  # Quadratische Funktion verstärkt Unterschiede
+    Bei einer Pause bleibt der Farbton des letzten Tons (zum Ausblenden).
+    """
+    global current_hue
+    if NOTE_COLORS and frequency:
+        current_hue = color_wheel.note_hue(frequency)
+    return brightness.freq_level(frequency)
 
-    # Skaliere auf Helligkeitsbereich 0.1-1.0 (mindestens 10% Helligkeit)
-    return 0.1 + (normalized * 0.9)
+def _base_frame():
+    """Liefert den Frame mit voller Helligkeit (zwischengespeichert)
 
-def smooth_transition(current, target, speed=0.05):
-    """Weicher Übergang zwischen Werten"""
-    diff = target - current
-    return current + (diff * speed)
+    Rot auf allen LEDs, bei einzeln adressierten Augen die Farbe aus
+    EYE_COLORS pro Auge. Wird nur neu angelegt, wenn sich Strip, Aufteilung
+    oder Farben ändern.
+    """
+    global _base
+    layout = segments.EYE_LAYOUT
+    entry = _base
+    if (entry is not None and entry[0] == np.n and entry[1] == np.bpp and entry[2] == np.ORDER
+            and entry[3] is layout and entry[4] is EYE_COLORS):
+        return entry[5]
+
+    frame = render.PixelBuffer(np.n, np.bpp, np.ORDER)
+    if layout is None:
+        render.fill(frame, 255, 0, 0)
+    else:
+        for eye, color in zip(segments.eye_views(frame, layout), EYE_COLORS):
+            render.fill(eye, color[0], color[1], color[2])
+    _base = (np.n, np.bpp, np.ORDER, layout, EYE_COLORS, frame.buf)
+    return frame.buf
 
-def fade_to_black(fade_duration):
-    """Dimmt die LEDs sanft auf schwarz herunter
+def _fill_current():
+    """Schreibt die aktuelle Helligkeit (gamma-korrigiert) als Rot in den Puffer
+
+    Bei einzeln adressierten Augen (segments.EYE_LAYOUT) bekommt jedes Auge
+    seine Farbe aus EYE_COLORS. Mit NOTE_COLORS kommt die Farbe aus dem
+    Farbrad (Farbton des aktuellen Tons, leichter Verlauf über den Ring).
+    """
+    level = brightness.GAMMA[light.step()]
+
+    if NOTE_COLORS:
+        hue = current_hue - NOTE_SPREAD // 2
+        eyes = segments.eye_views(np)
+        if eyes is None:
+            color_wheel.gradient(np, hue, NOTE_SPREAD, level)
+        else:
+            for eye in eyes:
+                color_wheel.gradient(eye, hue, NOTE_SPREAD, level)
+        return
+
+    # Ein Kernel-Aufruf für den ganzen Strip statt Farbe pro Auge skalieren
+    render.scale(np.buf, _base_frame(), level)
+
+def fade_step(rate=FADE_RATE):
+    """Ein Frame exponentielles Abdimmen (schnell am Anfang, langsamer am Ende)
+
+    Schreibt nur in den Puffer, np.write() macht der Aufrufer.
 
     Args:
-        fade_duration: Gesamtdauer des Fade-Effekts in Sekunden
+        rate: Abnahme pro Schritt in 1/256 der aktuellen Helligkeit
     """
-    global current_brightness
+    # Unter einer Stufe wird direkt schwarz (Envelope rastet aufs Ziel ein)
+    light.exponential(0, rate)
+    _fill_current()
 
-    # Mehr Schritte für weicheres Fading
-    steps = max(5, int(fade_duration * 100))  # 100 Updates pro Sekunde für sehr weiches Fading
-    step_duration = fade_duration / steps
+def follow_step(target_brightness, speed=FOLLOW_SPEED):
+    """Ein Frame weicher Übergang zur Ziel-Helligkeit (0-255)
 
-    for _ in range(steps):
-        # Exponentielles Abdimmen (schnell am Anfang, langsamer am Ende)
-        current_brightness = current_brightness * 0.85
+    Schreibt nur in den Puffer, np.write() macht der Aufrufer.
+    """
+    light.exponential(target_brightness, speed)
 
-        # Stoppe bei sehr niedriger Helligkeit
-        if current_brightness < 0.01:
-            current_brightness = 0.0
-            break
+    # Feste rote Farbe mit variabler Helligkeit, alle LEDs gleich
+    _fill_current()
+
+def fade_to_black(end):
+    """Dimmt die LEDs sanft auf schwarz herunter
 
-        r = int(255 * current_brightness)
-        for i in range(NUM_LEDS):
-            np[i] = (r, 0, 0)  # type: ignore
+    Args:
+        end: Zeitpunkt (ms auf scheduler), an dem der Fade endet
+    """
+    frame_time = scheduler.now()
+    while frame_time < end:
+        fade_step()
         np.write()  # type: ignore
-        sleep(step_duration)
 
-def update_neopixel(frequency, duration):
-    """Aktualisiert NeoPixel mit weichen Übergängen"""
-    global current_brightness
+        # 100 Updates pro Sekunde für sehr weiches Fading
+        frame_time = scheduler.next_frame(frame_time, FADE_FRAME_MS, end)
 
-    # Ziel-Helligkeit basierend auf Frequenz
-    target_brightness = freq_to_brightness(frequency)
+def update_neopixel(frequency, end):
+    """Aktualisiert NeoPixel mit weichen Übergängen
 
-    # Anzahl der Update-Schritte für weiche Übergänge
-    steps = max(5, int(duration * 50))  # 50 Updates pro Sekunde
-    step_duration = duration / steps
+    Args:
+        frequency: Frequenz des aktuellen Tons (bestimmt die Helligkeit)
+        end: Zeitpunkt (ms auf scheduler), bis zu dem gerendert wird
+    """
+    # Ziel-Helligkeit basierend auf Frequenz
+    target_brightness = note_target(frequency)
 
-    for step in range(steps):
-        # Weicher Helligkeits-Übergang
-        current_brightness = smooth_transition(current_brightness, target_brightness, 0.3)
+    frame_time = scheduler.now()
+    while frame_time < end:
+        follow_step(target_brightness)
+        np.write()  # type: ignore
 
-        # Feste rote Farbe mit variabler Helligkeit
-        r = int(255 * current_brightness)
-        g = 0
-        b = 0
+        # 50 Updates pro Sekunde, verpasste Frames werden übersprungen
+        frame_time = scheduler.next_frame(frame_time, FRAME_MS, end)
 
-        # Alle LEDs auf die gleiche Farbe setzen
-        for i in range(NUM_LEDS):
-            np[i] = (r, g, b)  # type: ignore
-        np.write()  # type: ignore
+def play_note(frequency, start, end):
+    """Spielt einen Ton im Zeitfenster [start, end) auf dem scheduler
 
-        sleep(step_duration)
+    Die Pause zwischen den Noten liegt innerhalb des Zeitfensters,
+    damit die Gesamtdauer genau den Melodiedaten entspricht.
+    """
+    gap = min(NOTE_GAP_MS, (end - start) // 4)
 
-def play_tone(frequency, duration):
-    """Spielt einen Ton mit gegebener Frequenz und Dauer"""
     if frequency == 0:
         buzzer.duty_u16(0)  # type: ignore
     else:
@@ -181,65 +260,188 @@ def play_tone(frequency, duration):
         buzzer.duty_u16(VOLUME)  # type: ignore
 
     # NeoPixel parallel aktualisieren
-    update_neopixel(frequency, duration)
+    update_neopixel(frequency, end - gap)
 
     buzzer.duty_u16(0)  # type: ignore
 
+    # Aufräumen, solange kein Ton klingt (statt zufällig mitten in einer Note)
+    memory.maybe_collect(gap * 1000 // 2)
+
     # Schnelles Abdimmen zwischen Tönen für stärkeren Pulsierungseffekt
-    fade_to_black(0.05)  # 50ms Fade-Pause zwischen Noten
+    fade_to_black(end)
+
+def play_tone(frequency, duration):
+    """Spielt einen einzelnen Ton mit gegebener Frequenz und Dauer (Sekunden)"""
+    scheduler.reset()
+    play_note(frequency, 0, int(duration * 1000))
+
+def play_melody(notes):
+    """Spielt eine komplette Melodie
+
+    Je nach USE_TIMER_SEQUENCER per Hardware-Timer oder in einer Schleife.
+    Die Abweichung jeder Note landet in drift_log.
+
+    Args:
+        notes: Noten-Events, z.B. song.events() oder melody_notes(melody)
+    """
+    if USE_TIMER_SEQUENCER:
+        play_melody_sequenced(notes)
+    else:
+        play_melody_scheduled(notes)
+
+def play_melody_scheduled(notes):
+    """Spielt eine Melodie mit absoluten Deadlines in einer Schleife
+
+    Jede Note startet zu ihrem Sollzeitpunkt (Summe der vorherigen Dauern).
+    """
+    drift_log.reset()
+    scheduler.reset()
 
-def play_melody(melody):
-    """Spielt eine komplette Melodie"""
+    note_start = 0
+    for event in notes:
+        note_end = note_start + event[song_format.DURATION]
+
+        drift_log.record(scheduler.sleep_until(note_start))
+        play_note(event[song_format.FREQ], note_start, note_end)
+        note_start = note_end
+
+    scheduler.sleep_until(note_start)
+    drift_log.finish(note_start, scheduler.now())
+
+def melody_notes(melody):
+    """Liefert Noten-Events für eine Melodie im Listenformat [('E4', 0.3), ...]"""
+    event = song_format.new_event()
     for note, duration in melody:
-        frequency = NOTES[note]
-        play_tone(frequency, duration)
+        event[song_format.FREQ] = NOTES[note]
+        event[song_format.DURATION] = int(duration * 1000)
+        yield event
+
+class SequencerLights:
+    """Lichter zu einem laufenden ToneSequencer
+
+    Gemeinsam für play_melody_sequenced(), die asyncio-Laufzeit (runtime.py)
+    und dual_core.py: poll() füllt den Sequencer nach, übernimmt Ziel-
+    Helligkeit und Farbton der aktuellen Note und räumt in Tonpausen auf,
+    step() rechnet daraus einen Frame. poll() ändert keine globalen Werte,
+    damit es auch auf dem anderen Kern als das Zeichnen laufen kann.
+    """
+
+    def __init__(self, sequencer):
+        self.sequencer = sequencer
+        self.reset()
+
+    def reset(self):
+        self.position = -1
+        self.target = 0
+        self.hue = current_hue
+
+    def poll(self):
+        """Regelmäßig während des Lieds aufrufen
+
+        Returns:
+            True solange ein Ton klingt
+        """
+        sequencer = self.sequencer
+        sequencer.feed()
+
+        if sequencer.position != self.position:
+            self.position = sequencer.position
+            frequency = sequencer.frequency
+            self.target = brightness.freq_level(frequency)
+            # Bei einer Pause bleibt der Farbton des letzten Tons
+            if NOTE_COLORS and frequency:
+                self.hue = color_wheel.note_hue(frequency)
+
+        if sequencer.sounding:
+            return True
+        memory.maybe_collect(GC_BUDGET_US)
+        return False
+
+    def step(self, sounding, fade_rate=FADE_RATE):
+        """Ein Frame: der Note folgen oder in der Pause abdimmen (nur Puffer)"""
+        global current_hue
+        current_hue = self.hue
+        if sounding:
+            follow_step(self.target)
+        else:
+            fade_step(fade_rate)
+
+def play_melody_sequenced(notes):
+    """Spielt eine Melodie per ToneSequencer, die LEDs folgen der Position
+
+    Die Töne schaltet der Timer-Interrupt. Diese Schleife rendert nur die
+    Lichter passend zur aktuellen Note, ein langsames np.write() verlängert
+    also keine Note mehr.
+    """
+    lights = SequencerLights(sequencer)
+    sequencer.start(notes)  # type: ignore
+    scheduler.reset()
+
+    frame_time = 0
+    while sequencer.running:  # type: ignore
+        sounding = lights.poll()
+        lights.step(sounding)
+        np.write()  # type: ignore
+
+        frame_time = scheduler.next_frame(frame_time, FRAME_MS if sounding else FADE_FRAME_MS)
 
 def clear_neopixel():
     """Schaltet alle NeoPixel aus"""
-    for i in range(NUM_LEDS):
-        np[i] = (0, 0, 0)  # type: ignore
+    render.clear(np)
     np.write()  # type: ignore
 
-def play_random_song():
-    """Spielt das nächste Weihnachtslied in der Reihenfolge (abwechselnd)"""
-    global current_brightness, last_played_song_index
+def next_song():
+    """Wählt das nächste Weihnachtslied in der Reihenfolge (abwechselnd)
+
+    Die Lieder werden bei jedem Aufruf im Ordner songs/ gesucht.
 
-    # Alle verfügbaren Song-Indices
-    melody_keys = sorted(MELODIES.keys())
+    Returns:
+        Lied mit name und events() (siehe song_stream.open_song)
+    """
+    global last_played_song
+
+    # Alle verfügbaren Lieder (sortiert nach Dateiname)
+    songs = song_stream.list_songs()
 
     # Nächsten Song auswählen (abwechselnd)
-    if last_played_song_index is None:
-        # Beim ersten Mal: Beginne mit dem ersten Lied
-        key = melody_keys[0]
+    if last_played_song in songs:
+        # Nächster Song (mit Wrap-Around)
+        path = songs[(songs.index(last_played_song) + 1) % len(songs)]
     else:
-        # Finde Index des zuletzt gespielten Lieds
-        try:
-            current_index = melody_keys.index(last_played_song_index)
-            # Nächster Song (mit Wrap-Around)
-            next_index = (current_index + 1) % len(melody_keys)
-            key = melody_keys[next_index]
-        except ValueError:
-            # Falls der Index nicht gefunden wird, starte von vorne
-            key = melody_keys[0]
+        # Beim ersten Mal (oder wenn das Lied gelöscht wurde): von vorne
+        path = songs[0]
 
     # Merke dir den aktuellen Song für das nächste Mal
-    last_played_song_index = key
+    last_played_song = path
 
-    name, melody = MELODIES[key]  # type: ignore
+    return song_stream.open_song(path)
 
-    print(f"Spiele: {name}")
+def play_random_song():
+    """Spielt das nächste Weihnachtslied in der Reihenfolge (abwechselnd)"""
+    song = next_song()
+
+    log.info("Spiele: {}", song.name)
+
+    # Vor dem Lied aufräumen, damit während der Noten keine GC nötig wird
+    memory.collect()
 
     # Melodie abspielen
-    play_melody(melody)
+    # Vorberechnete Show, sonst live (bis precompile() sie im Leerlauf erstellt hat)
+    show_path = None
+    if USE_SHOW_CACHE:
+        import show_cache
+        show_path = show_cache.cached_show(last_played_song, np.n)  # type: ignore
+    if show_path is not None:
+        show_cache.play_show(show_path, np, sequencer, scheduler)
+    else:
+        play_melody(song.events())
+    drift_log.report()
 
     # Sanftes Ausblenden am Ende
     for _ in range(10):
-        current_brightness = smooth_transition(current_brightness, 0, 0.2)
-        r = int(255 * current_brightness)
-        for i in range(NUM_LEDS):
-            np[i] = (r, 0, 0)  # type: ignore
+        follow_step(0, END_FADE_SPEED)
         np.write()  # type: ignore
-        sleep(0.1)
+        profiler.sleep_ms(100)
 
     clear_neopixel()
 
@@ -254,30 +456,31 @@ if __name__ == "__main__":
     print("NeoPixel: GP1 ({} LEDs)".format(NUM_LEDS))
     print("Buzzer: GP8")
     print("Helligkeit ~ Tonhöhe")
-    print("Farbe: Rot")
+    print("Farbe: Tonhöhe" if NOTE_COLORS else "Farbe: Rot")
     print("Drücke Strg+C zum Beenden")
     print("="*40 + "\n")
 
     try:
         while True:
-            for num, (name, melody) in MELODIES.items():
-                print(f"Spiele: {name}")
-                play_melody(melody)
+            for path in song_stream.list_songs():
+                song = song_stream.open_song(path)
+                log.info("Spiele: {}", song.name)
+                play_melody(song.events())
 
                 # Sanftes Ausblenden am Ende
                 for _ in range(10):
-                    current_brightness = smooth_transition(current_brightness, 0, 0.2)
-                    r = int(255 * current_brightness)
-                    for i in range(NUM_LEDS):
-                        np[i] = (r, 0, 0)  # type: ignore
+                    follow_step(0, END_FADE_SPEED)
                     np.write()  # type: ignore
                     sleep(0.1)
 
                 clear_neopixel()
+                log.flush()
                 sleep(2)  # Pause zwischen verschiedenen Liedern
 
     except KeyboardInterrupt:
+        sequencer.stop()  # type: ignore
         buzzer.duty_u16(0)  # type: ignore
         buzzer.deinit()  # type: ignore
         clear_neopixel()
+        log.flush()
         print("\n\nBeendet - Frohe Weihnachten!")
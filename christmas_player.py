@@ -1,10 +1,8 @@
-from machine import Pin, PWM
 from time import sleep
 
-# Verfügbare Melodien importieren
-import melody_jingle_bells
-import melody_we_wish_you
-import melody_silent_night
+import hardware
+import song_format
+import song_stream
 
 # Lautstärke-Einstellungen
 VOLUME_LOW = 16384      # 25% Duty Cycle
@@ -15,93 +13,68 @@ VOLUME_MAX = 65535      # 100% Duty Cycle
 # Aktuelle Lautstärke
 VOLUME = VOLUME_MEDIUM
 
-# Passiver Buzzer an GP8
-buzzer = PWM(Pin(8))
-
-# Notendefinitionen (Frequenzen in Hz)
-NOTES = {
-    'C4': 262,
-    'C#4': 277,
-    'D4': 294,
-    'E4': 330,
-    'F4': 349,
-    'F#4': 370,
-    'G4': 392,
-    'G#4': 415,
-    'A4': 440,
-    'B4': 494,
-    'C5': 523,
-    'C#5': 554,
-    'D5': 587,
-    'E5': 659,
-    'F5': 698,
-    'G5': 784,
-    'REST': 0
-}
-
-# Melodie-Auswahl
-MELODIES = {
-    1: ("Jingle Bells", melody_jingle_bells.melody),
-    2: ("We Wish You a Merry Christmas", melody_we_wish_you.melody),
-    3: ("Silent Night", melody_silent_night.melody),
-}
+# Passiver Buzzer (wird beim Start aus hardware.py geholt)
+buzzer = None  # type: ignore
 
 # ==========================================
 # TEST-KONFIGURATION
 # ==========================================
-# Wähle ein Lied zum Testen (None = alle Lieder nacheinander)
-# Optionen: None, 1, 2, 3
-#   1 = "Jingle Bells"
-#   2 = "We Wish You a Merry Christmas"
-#   3 = "Silent Night"
-TEST_SONG = 3  # Ändere auf 1, 2 oder 3 um nur ein Lied zu testen
+# Wähle ein Lied zum Testen (None = alle Lieder im Ordner songs/ nacheinander)
+# Optionen: None oder ein Dateipfad, z.B.
+#   "songs/jingle_bells.pns"
+#   "songs/we_wish_you.pns"
+#   "songs/silent_night.pns"
+#   "songs/deck_the_halls.rtttl"
+TEST_SONG = "songs/silent_night.pns"  # Pfad eines Lieds um nur dieses zu testen
 # ==========================================
 
 def play_tone(frequency, duration):
     """Spielt einen Ton mit gegebener Frequenz und Dauer"""
     if frequency == 0:
-        buzzer.duty_u16(0)  # Pause
+        buzzer.duty_u16(0)  # type: ignore  # Pause
     else:
-        buzzer.freq(frequency)
-        buzzer.duty_u16(VOLUME)
+        buzzer.freq(frequency)  # type: ignore
+        buzzer.duty_u16(VOLUME)  # type: ignore
     sleep(duration)
-    buzzer.duty_u16(0)  # Ton aus
+    buzzer.duty_u16(0)  # type: ignore  # Ton aus
     sleep(0.05)  # Kurze Pause zwischen Noten
 
-def play_melody(melody):
-    """Spielt eine komplette Melodie"""
-    for note, duration in melody:
-        frequency = NOTES[note]
-        play_tone(frequency, duration)
+def play_melody(song):
+    """Spielt eine komplette Melodie (siehe song_stream.open_song)"""
+    for event in song.events():
+        play_tone(event[song_format.FREQ], event[song_format.DURATION] / 1000)
 
-# Hauptprogramm
-print("\n" + "="*40)
-print("  WEIHNACHTS-MELODIEN PLAYER")
-print("="*40)
-print("Buzzer an GP15")
-if TEST_SONG is not None:
-    print(f"TEST-MODUS: Nur Lied #{TEST_SONG}")
-else:
-    print("Spiele alle Melodien nacheinander...")
-print("Drücke Strg+C zum Beenden")
-print("="*40 + "\n")
+# Hauptprogramm (nur wenn direkt ausgeführt)
+if __name__ == "__main__":
+    buzzer = hardware.init().buzzer
+
+    print("\n" + "="*40)
+    print("  WEIHNACHTS-MELODIEN PLAYER")
+    print("="*40)
+    print("Buzzer an GP{}".format(hardware.BUZZER_PIN))
+    if TEST_SONG is not None:
+        print(f"TEST-MODUS: Nur {TEST_SONG}")
+    else:
+        print("Spiele alle Melodien nacheinander...")
+    print("Drücke Strg+C zum Beenden")
+    print("="*40 + "\n")
 
-try:
-    while True:
-        # Wähle Lieder basierend auf TEST_SONG Konfiguration
-        if TEST_SONG is not None:
-            # Nur ein bestimmtes Lied testen
-            songs_to_play = [(TEST_SONG, MELODIES[TEST_SONG])]
-        else:
-            # Alle Lieder nacheinander
-            songs_to_play = MELODIES.items()
+    try:
+        while True:
+            # Wähle Lieder basierend auf TEST_SONG Konfiguration
+            if TEST_SONG is not None:
+                # Nur ein bestimmtes Lied testen
+                songs_to_play = [TEST_SONG]
+            else:
+                # Alle Lieder nacheinander
+                songs_to_play = song_stream.list_songs()
 
-        for num, (name, melody) in songs_to_play:
-            print(f"Spiele: {name}")
-            play_melody(melody)
-            sleep(3)  # Pause zwischen verschiedenen Liedern
+            for path in songs_to_play:
+                song = song_stream.open_song(path)
+                print(f"Spiele: {song.name}")
+                play_melody(song)
+                sleep(3)  # Pause zwischen verschiedenen Liedern
 
-except KeyboardInterrupt:
-    buzzer.duty_u16(0)
-    buzzer.deinit()
-    print("\n\nBeendet - Frohe Weihnachten!")
+    except KeyboardInterrupt:
+        hardware.deinit()
+        print("\n\nBeendet - Frohe Weihnachten!")
@@ -0,0 +1,91 @@
+import kernels
+import brightness
+
+# Farbrad mit vorberechneter Tabelle statt HSV-Rechnung pro Pixel
+#
+# Ein Farbton ist eine ganze Zahl 0-255 (einmal rund ums Farbrad, 0 = Rot,
+# 85 = Grün, 170 = Blau). WHEEL enthält für jeden Farbton die Bytes R, G, B
+# bei voller Sättigung und Helligkeit. Sättigung und Helligkeit werden mit
+# Integer-Multiplikation angewendet, pro Pixel gibt es also weder Floats
+# noch Fallunterscheidungen. gradient() füllt einen ganzen Ring in einem
+# Aufruf (Kernel in kernels.py, auf dem RP2040 kompiliert).
+
+# Farbton-Bereich für Töne: tiefe Töne Rot, hohe Töne Blau
+NOTE_HUE_LOW = 0
+NOTE_HUE_HIGH = 170
+
+def wheel_table(saturation=255):
+    """Farbrad-Tabelle (256 Farbtöne x R, G, B) für eine Sättigung 0-255"""
+    table = bytearray(768)
+    hsv = kernels.hsv_to_rgb_py
+    for h in range(256):
+        r, g, b = hsv(h, saturation, 255)
+        table[h * 3] = r
+        table[h * 3 + 1] = g
+        table[h * 3 + 2] = b
+    return bytes(table)
+
+def _note_hue_table():
+    # Position im Frequenzbereich (0-255) -> Farbton
+    table = bytearray(256)
+    for i in range(256):
+        table[i] = NOTE_HUE_LOW + i * (NOTE_HUE_HIGH - NOTE_HUE_LOW) // 255
+    return bytes(table)
+
+# Farbton (0-255) -> R, G, B bei voller Sättigung
+WHEEL = wheel_table()
+
+# Position im Frequenzbereich (0-255) -> Farbton
+NOTE_HUES = _note_hue_table()
+
+def hsv(h, s=255, v=255):
+    """Farbe aus Farbton, Sättigung und Helligkeit (je 0-255, nur Integer)
+
+    Returns:
+        Tupel (r, g, b)
+    """
+    k = (h & 255) * 3
+    r = WHEEL[k]
+    g = WHEEL[k + 1]
+    b = WHEEL[k + 2]
+    if s < 255:
+        # Richtung Weiß ziehen
+        m = s + 1
+        r = 255 - (((255 - r) * m) >> 8)
+        g = 255 - (((255 - g) * m) >> 8)
+        b = 255 - (((255 - b) * m) >> 8)
+    if v < 255:
+        m = v + 1
+        r = (r * m) >> 8
+        g = (g * m) >> 8
+        b = (b * m) >> 8
+    return (r, g, b)
+
+def note_hue(frequency):
+    """Mappt eine Frequenz auf einen Farbton (tief = Rot, hoch = Blau)"""
+    if frequency <= brightness.MIN_FREQ:
+        return NOTE_HUES[0]
+    if frequency >= brightness.MAX_FREQ:
+        return NOTE_HUES[255]
+    return NOTE_HUES[(frequency - brightness.MIN_FREQ) * 255
+                     // (brightness.MAX_FREQ - brightness.MIN_FREQ)]
+
+def gradient(np, offset, spread=256, level=255, table=WHEEL):
+    """Füllt den ganzen Ring mit einem Farbverlauf (ohne write())
+
+    Args:
+        np: NeoPixel-kompatibles Objekt (buf, bpp, ORDER), bei einem
+            segments.Segment läuft der Verlauf in logischer Reihenfolge
+            (Drehung und Spiegelung wie Segment.map)
+        offset: Farbton der logisch ersten LED (0-255), hochzählen lässt
+            den Verlauf rotieren
+        spread: Farbton-Bereich über den Ring (256 = ganzes Farbrad,
+            0 = alle LEDs gleich)
+        level: Helligkeit 0-255
+        table: Farbrad, z.B. wheel_table(128) für Pastellfarben
+    """
+    order = np.ORDER
+    bpp = np.bpp
+    kernels.gradient(np.buf, len(np.buf) // bpp, bpp, table, offset, spread, level,
+                     order[0], order[1], order[2],
+                     getattr(np, "first", 0), getattr(np, "step", 1))
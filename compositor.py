@@ -0,0 +1,100 @@
+import render
+from envelope import Envelope
+
+# Ebenen-Compositor für Augen, Lichtshow und Einblendungen
+#
+# Jede Ebene hat einen eigenen, vorab angelegten Puffer (NeoPixel-kompatibel,
+# die Module zeichnen also wie gewohnt hinein) und eine Deckkraft als
+# Envelope. render() mischt alle Ebenen von unten nach oben mit Integer-
+# Rechnung in einen Hintergrundpuffer und tauscht ihn dann gegen np.buf
+# (nur die Referenzen, keine Kopie), bevor np.write() ihn sendet. Der
+# zuletzt gesendete Frame wird zum nächsten Hintergrundpuffer. Halb
+# gezeichnete Frames sind dadurch nie sichtbar. np muss buf deshalb erst
+# in write() lesen (NeoPixel, FrameBuffer, ws2812_pio tun das). Moduswechsel werden zu Überblendungen
+# der Deckkraft statt schwarzer Pausen.
+#
+# Mischarten:
+#   MIX  Überblenden: Ergebnis = darunter * (1 - Deckkraft) + Ebene * Deckkraft
+#   ADD  Aufhellen (für Einblendungen): Ergebnis = darunter + Ebene * Deckkraft
+
+MIX = 0
+ADD = 1
+
+# Standarddauer einer Überblendung in Frames (bei 20ms pro Frame: 400ms)
+CROSSFADE_STEPS = 20
+
+class Layer(render.PixelBuffer):
+    """Ebene mit eigenem Puffer und Deckkraft
+
+    write() rendert den ganzen Compositor, Module, die np.write() aufrufen,
+    funktionieren also unverändert mit einer Ebene als np.
+    """
+
+    def __init__(self, compositor, mode=MIX, opacity=0):
+        np = compositor.np
+        super().__init__(np.n, np.bpp, np.ORDER)
+        self.compositor = compositor
+        self.mode = mode
+        self.opacity = Envelope(opacity)
+
+    def fade_to(self, opacity, steps=CROSSFADE_STEPS):
+        """Blendet die Ebene linear auf eine Deckkraft 0-255"""
+        self.opacity.linear(opacity, steps)
+
+    def write(self):
+        self.compositor.render()
+
+class Compositor:
+    """Mischt Ebenen in einen Hintergrundpuffer und sendet ihn an np"""
+
+    def __init__(self, np):
+        self.np = np
+        self.layers = []
+        self.back = bytearray(len(np.buf))
+        self._black = bytes(len(np.buf))
+
+    def add_layer(self, mode=MIX, opacity=0):
+        """Legt eine neue Ebene über den bisherigen an"""
+        layer = Layer(self, mode, opacity)
+        self.layers.append(layer)
+        return layer
+
+    def crossfade(self, visible, steps=CROSSFADE_STEPS):
+        """Blendet auf eine MIX-Ebene über, alle anderen MIX-Ebenen aus"""
+        for layer in self.layers:
+            if layer.mode == MIX:
+                layer.fade_to(255 if layer is visible else 0, steps)
+
+    def fading(self):
+        """True solange eine Deckkraft noch nicht am Ziel ist"""
+        for layer in self.layers:
+            if not layer.opacity.done():
+                return True
+        return False
+
+    def compose(self):
+        """Mischt alle Ebenen in den Hintergrundpuffer (ein Envelope-Schritt)"""
+        back = self.back
+        back[:] = self._black
+        for layer in self.layers:
+            opacity = layer.opacity.step()
+            if opacity == 0:
+                continue
+            if layer.mode == ADD:
+                render.add(back, layer.buf, opacity)
+            else:
+                render.blend(back, back, layer.buf, opacity)
+
+    def render(self):
+        """Mischt die Ebenen und sendet den fertigen Frame (Puffer tauschen)"""
+        self.compose()
+        np = self.np
+        self.back, np.buf = np.buf, self.back
+        np.write()
+
+    def finish(self, frame_ms, sleep_ms):
+        """Rendert blockierend, bis alle Überblendungen abgeschlossen sind"""
+        while self.fading():
+            self.render()
+            sleep_ms(frame_ms)
+        self.render()
@@ -0,0 +1,27 @@
+import song_format
+
+# Wandelt die melody_*.py Module in das Binärformat (.pns) um.
+# Auf dem PC ausführen (python convert_melodies.py) und den Ordner songs/
+# zusammen mit dem Programm auf den Pico kopieren.
+
+# (Modul, Liedname, Zieldatei)
+MELODY_MODULES = (
+    ("melody_jingle_bells", "Jingle Bells", "songs/jingle_bells.pns"),
+    ("melody_we_wish_you", "We Wish You a Merry Christmas", "songs/we_wish_you.pns"),
+    ("melody_silent_night", "Silent Night", "songs/silent_night.pns"),
+)
+
+def convert():
+    """Schreibt alle Lieder aus MELODY_MODULES nach songs/"""
+    for module_name, name, path in MELODY_MODULES:
+        module = __import__(module_name)
+        data = song_format.encode(name, module.melody)
+
+        with open(path, 'wb') as f:
+            f.write(data)
+
+        print("{}: {} Noten -> {} ({} Bytes)".format(name, len(module.melody), path, len(data)))
+
+# Nur wenn direkt ausgeführt (ein Import darf songs/ nicht überschreiben)
+if __name__ == "__main__":
+    convert()
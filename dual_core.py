@@ -0,0 +1,340 @@
+import sys
+if sys.implementation.name == "micropython":
+    import _thread
+else:
+    # CPython hat zwar _thread, aber ohne Bezug zur virtuellen Uhr des Simulators
+    import thread_standin as _thread  # type: ignore
+from time import ticks_ms, ticks_us, ticks_add, ticks_diff, sleep_ms
+from array import array
+
+import log
+import memory
+import neopixel_eyes
+import christmas_light_show
+import button_events
+from compositor import Compositor
+
+# Rendern auf dem zweiten Kern des RP2040
+#
+# Kern 1 (Worker aus _thread) besitzt das NeoPixel: er rechnet die Augen-
+# Animationen und die Lichtshow in die Ebenen des Compositors, mischt sie
+# und ruft als einziger np.write() auf. Kern 0 spielt die Melodie (Tone-
+# Sequencer), liest den Button und schickt dem Renderer kurze Kommandos
+# über eine Warteschlange. Der fertige Frame liegt in einem Doppelpuffer:
+# Kern 1 mischt in den hinteren Puffer und tauscht ihn unter einem Lock
+# nach vorne, snapshot() liefert Kern 0 jederzeit einen vollständigen Frame.
+#
+# Die Zustände der Lichtshow (light, current_hue) gehören Kern 1, Kern 0
+# ändert sie nur über Kommandos.
+#
+# Auf dem PC wird immer thread_standin verwendet. busy_report()
+# zeigt, wie viel Zeit jeder Kern tatsächlich arbeitet.
+
+TICK_MS = christmas_light_show.FRAME_MS  # Render-Tick auf Kern 1
+POLL_MS = 5                              # Schleife auf Kern 0
+EYE_PAUSE_MS = 500                       # Pause zwischen Augen-Animationen
+CROSSFADE_STEPS = 20                     # Überblenden zwischen den Modi
+REPORT_MS = 10000                        # Abstand der Auslastungs-Ausgabe
+
+QUEUE_SIZE = 8
+
+# Kommandos von Kern 0 an den Renderer
+CMD_EYES = 1    # Augen-Modus
+CMD_MUSIC = 2   # Musik-Modus
+CMD_LIGHT = 3   # Ziel-Helligkeit der Lichtshow (arg: 0-255)
+CMD_FADE = 4    # Lichtshow abdimmen (Pause zwischen Noten)
+CMD_STOP = 5    # Renderer beenden
+CMD_HUE = 6     # Farbton der Lichtshow bei NOTE_COLORS (arg: 0-255)
+
+class CommandQueue:
+    """Kleine Warteschlange (Kommando + Argument) zwischen den Kernen"""
+
+    def __init__(self, lock, size=QUEUE_SIZE):
+        self.lock = lock
+        self.size = size
+        self._cmd = bytearray(size)
+        self._arg = array('h', [0] * size)
+        self._head = 0
+        self._tail = 0
+        self.arg = 0
+        self.dropped = 0
+
+    def put(self, cmd, arg=0):
+        """Stellt ein Kommando ein (False wenn die Warteschlange voll ist)"""
+        self.lock.acquire()
+        head = self._head
+        nxt = (head + 1) % self.size
+        if nxt == self._tail:
+            self.dropped += 1
+            self.lock.release()
+            return False
+        self._cmd[head] = cmd
+        self._arg[head] = arg
+        self._head = nxt
+        self.lock.release()
+        return True
+
+    def get(self):
+        """Nächstes Kommando (0 wenn leer), das Argument steht danach in arg"""
+        self.lock.acquire()
+        tail = self._tail
+        if tail == self._head:
+            self.lock.release()
+            return 0
+        cmd = self._cmd[tail]
+        self.arg = self._arg[tail]
+        self._tail = (tail + 1) % self.size
+        self.lock.release()
+        return cmd
+
+class BusyTime:
+    """Arbeitszeit eines Kerns in µs (ohne Wartezeiten)"""
+
+    def __init__(self):
+        self.busy_us = 0
+        self.window_start = ticks_ms()
+        self._start = 0
+
+    def begin(self):
+        self._start = ticks_us()
+
+    def end(self):
+        self.busy_us += ticks_diff(ticks_us(), self._start)
+
+    def percent(self):
+        """Auslastung seit dem letzten reset() in Prozent"""
+        window_ms = ticks_diff(ticks_ms(), self.window_start)
+        if window_ms <= 0:
+            return 0
+        return self.busy_us / (window_ms * 10)
+
+    def reset(self):
+        self.busy_us = 0
+        self.window_start = ticks_ms()
+
+class CoreRenderer:
+    """Renderer für Kern 1: Augen, Lichtshow und np.write()"""
+
+    def __init__(self, np, thread=_thread):
+        self.np = np
+        self.thread = thread
+
+        self.compositor = Compositor(np)
+        self.eye_layer = self.compositor.add_layer(opacity=255)
+        self.music_layer = self.compositor.add_layer()
+
+        # Doppelpuffer: Kern 1 mischt hinten, vorne liegt der gesendete Frame
+        self.frame_lock = thread.allocate_lock()
+        self.front = bytearray(len(np.buf))
+
+        self.queue = CommandQueue(thread.allocate_lock())
+        self.busy = BusyTime()
+
+        self.mode = CMD_EYES
+        self.light_target = 0
+        self.light_fading = True
+        self.frames = 0
+        self.running = False
+        self._stop = False
+        self._saved_np = None
+
+    def start(self):
+        """Startet den Renderer auf dem zweiten Kern"""
+        self._saved_np = (neopixel_eyes.np, christmas_light_show.np)
+        neopixel_eyes.np = self.eye_layer
+        christmas_light_show.np = self.music_layer
+        self._stop = False
+        self.running = True
+        self.thread.start_new_thread(self._worker, ())
+
+    def stop(self):
+        """Beendet den Renderer, wartet auf Kern 1 und gibt die Ziele von vor start() zurück"""
+        while not self.queue.put(CMD_STOP):
+            sleep_ms(1)
+        while self.running:
+            sleep_ms(1)
+        if self._saved_np is not None:
+            neopixel_eyes.np, christmas_light_show.np = self._saved_np
+            self._saved_np = None
+
+    def post(self, cmd, arg=0):
+        """Kommando an den Renderer (von Kern 0)"""
+        return self.queue.put(cmd, arg)
+
+    def snapshot(self, dst):
+        """Kopiert den zuletzt gesendeten Frame nach dst (von Kern 0)"""
+        self.frame_lock.acquire()
+        dst[:] = self.front
+        self.frame_lock.release()
+
+    def _commands(self):
+        """Kommandos aus der Warteschlange übernehmen"""
+        queue = self.queue
+        cmd = queue.get()
+        while cmd:
+            if cmd == CMD_EYES:
+                self.mode = CMD_EYES
+                self.light_target = 0
+                self.light_fading = True
+                self.compositor.crossfade(self.eye_layer, CROSSFADE_STEPS)
+            elif cmd == CMD_MUSIC:
+                self.mode = CMD_MUSIC
+                self.light_target = 0
+                self.light_fading = True
+                self.compositor.crossfade(self.music_layer, CROSSFADE_STEPS)
+            elif cmd == CMD_LIGHT:
+                self.light_target = queue.arg
+                self.light_fading = False
+            elif cmd == CMD_FADE:
+                self.light_fading = True
+            elif cmd == CMD_HUE:
+                christmas_light_show.current_hue = queue.arg
+            elif cmd == CMD_STOP:
+                self._stop = True
+            cmd = queue.get()
+
+    def _worker(self):
+        """Render-Schleife auf Kern 1"""
+        show = christmas_light_show
+        compositor = self.compositor
+        busy = self.busy
+        eyes = None
+        eye_due = ticks_ms()
+        next_tick = ticks_ms()
+
+        try:
+            while not self._stop:
+                busy.begin()
+                self._commands()
+
+                # Augen-Animation weiterschalten, wenn ihr nächster Schritt fällig ist
+                if self.mode == CMD_EYES:
+                    while ticks_diff(ticks_ms(), eye_due) >= 0:
+                        if eyes is None:
+                            eyes = neopixel_eyes.animation_frames()
+                        try:
+                            eye_due = ticks_add(eye_due, next(eyes))
+                        except StopIteration:
+                            eyes = None
+                            eye_due = ticks_add(eye_due, EYE_PAUSE_MS)
+                else:
+                    eyes = None
+                    eye_due = ticks_ms()
+
+                # Lichtshow, solange sie sichtbar ist
+                if self.mode == CMD_MUSIC or self.music_layer.opacity.level() > 0:
+                    if self.light_fading:
+                        show.fade_step(show.FADE_RATE_20MS)
+                    else:
+                        show.follow_step(self.light_target)
+
+                # Mischen und hinteren Puffer nach vorne tauschen
+                compositor.compose()
+                self.frame_lock.acquire()
+                self.front, compositor.back = compositor.back, self.front
+                self.frame_lock.release()
+
+                self.np.buf[:] = self.front
+                self.np.write()
+                self.frames += 1
+                busy.end()
+
+                next_tick = ticks_add(next_tick, TICK_MS)
+                delay = ticks_diff(next_tick, ticks_ms())
+                if delay < 0:
+                    next_tick = ticks_ms()
+                    delay = 0
+                sleep_ms(delay)
+        finally:
+            self.running = False
+
+def play_song(renderer, sequencer, buttons, busy):
+    """Spielt das nächste Lied auf Kern 0, die Lichter folgen auf Kern 1
+
+    Returns:
+        True wenn per Button abgebrochen
+    """
+    show = christmas_light_show
+    song = show.next_song()
+    log.info("Spiele: {}", song.name)
+    memory.collect()
+
+    renderer.post(CMD_MUSIC)
+    lights = show.SequencerLights(sequencer)
+    sequencer.start(song.events())
+
+    position = -1
+    hue = -1
+    sounding = False
+    interrupted = False
+    while sequencer.running:
+        busy.begin()
+        now_sounding = lights.poll()
+
+        if lights.hue != hue:
+            hue = lights.hue
+            renderer.post(CMD_HUE, hue)
+
+        if lights.position != position or now_sounding != sounding:
+            position = lights.position
+            sounding = now_sounding
+            if sounding:
+                renderer.post(CMD_LIGHT, lights.target)
+            else:
+                renderer.post(CMD_FADE)
+
+        if buttons.get() == button_events.PRESS:
+            sequencer.stop()
+            interrupted = True
+        busy.end()
+        sleep_ms(POLL_MS)
+
+    renderer.post(CMD_EYES)
+    return interrupted
+
+def busy_report(renderer, busy):
+    """Gibt die Auslastung beider Kerne aus und setzt sie zurück"""
+    log.info("Auslastung: Kern 0 {:.1f}%, Kern 1 {:.1f}% ({} Frames)",
+             busy.percent(), renderer.busy.percent(), renderer.frames)
+    busy.reset()
+    renderer.busy.reset()
+    renderer.frames = 0
+
+def run(np, buzzer, buttons):
+    """Startet den Renderer auf Kern 1 und die Steuerung auf Kern 0 (blockiert)
+
+    Args:
+        np: gemeinsames NeoPixel-Objekt (aus main.py)
+        buzzer: gemeinsames PWM-Objekt (aus main.py)
+        buttons: ButtonEvents für GP21
+    """
+    show = christmas_light_show
+    renderer = CoreRenderer(np)
+    busy = BusyTime()
+    report_due = ticks_add(ticks_ms(), REPORT_MS)
+
+    renderer.start()
+    try:
+        while True:
+            busy.begin()
+            pressed = buttons.get() == button_events.PRESS
+            busy.end()
+
+            if pressed:
+                log.info(">>> Button gedrückt! Wechsel zu Musik-Modus <<<")
+                play_song(renderer, show.sequencer, buttons, busy)
+                log.info("Zurück zum Augen-Modus")
+            else:
+                # Leerlauf: ausstehende Meldungen stückweise ausgeben
+                log.idle_flush()
+
+            if ticks_diff(ticks_ms(), report_due) >= 0:
+                busy_report(renderer, busy)
+                report_due = ticks_add(ticks_ms(), REPORT_MS)
+
+            sleep_ms(POLL_MS)
+    finally:
+        show.sequencer.stop()
+        buzzer.duty_u16(0)
+        renderer.stop()
+    return renderer
@@ -0,0 +1,114 @@
+# Hüllkurven für Helligkeit und Überblendungen (nur Integer)
+#
+# Der Wert wird als Festkomma mit 8 Nachkommabits gespeichert (Stufe * 256),
+# damit auch langsame Übergänge nicht an Rundung hängen bleiben. step()
+# rechnet nur mit kleinen Integern, fordert also keinen Speicher an, und
+# liefert bei gleicher Eingabe immer dieselbe Folge (bit-genau, z.B. für
+# Vergleiche mit aufgezeichneten Frames).
+#
+# Kurven:
+#   LINEAR       fester Schritt pro Tick, erreicht das Ziel nach n Ticks
+#   EXPONENTIAL  pro Tick rate/256 des Abstands zum Ziel (schnell am Anfang)
+# attack_decay() verbindet beide: linearer Anstieg, danach exponentielles
+# Abklingen auf einen Haltewert.
+
+LINEAR = 0
+EXPONENTIAL = 1
+
+# Kein weiterer Abschnitt geplant
+_NONE = -1
+
+class Envelope:
+    """Hüllkurve mit Stufen 0-255, ein Schritt pro Frame"""
+
+    def __init__(self, level=0):
+        self.value = level << 8
+        self.target = self.value
+        self.curve = LINEAR
+        self.rate = 0
+
+        # Abschnitt nach dem aktuellen (für attack_decay)
+        self.next_target = _NONE
+        self.next_rate = 0
+
+    def level(self):
+        """Aktuelle Stufe 0-255"""
+        return self.value >> 8
+
+    def done(self):
+        """True wenn das Ziel erreicht und kein Abschnitt mehr offen ist"""
+        return self.value == self.target and self.next_target == _NONE
+
+    def set(self, level):
+        """Springt sofort auf eine Stufe"""
+        self.value = level << 8
+        self.target = self.value
+        self.next_target = _NONE
+
+    def linear(self, level, steps):
+        """Linearer Übergang zur Stufe in steps Schritten"""
+        self.target = level << 8
+        self.curve = LINEAR
+        self.next_target = _NONE
+
+        diff = self.target - self.value
+        if diff < 0:
+            diff = -diff
+        if steps <= 0:
+            self.rate = diff
+        else:
+            # Aufrunden, damit das Ziel spätestens nach steps Schritten erreicht ist
+            self.rate = (diff + steps - 1) // steps
+
+    def exponential(self, level, rate):
+        """Exponentieller Übergang zur Stufe
+
+        Args:
+            level: Ziel-Stufe 0-255
+            rate: Anteil des Abstands pro Schritt in 1/256 (1-256)
+        """
+        self.target = level << 8
+        self.curve = EXPONENTIAL
+        self.rate = rate
+        self.next_target = _NONE
+
+    def attack_decay(self, peak, attack_steps, sustain, decay_rate):
+        """Linearer Anstieg auf peak, danach exponentielles Abklingen auf sustain"""
+        self.linear(peak, attack_steps)
+        self.next_target = sustain << 8
+        self.next_rate = decay_rate
+
+    def step(self):
+        """Einen Schritt weiter
+
+        Returns:
+            neue Stufe 0-255
+        """
+        value = self.value
+        target = self.target
+
+        if value != target:
+            if self.curve == LINEAR:
+                if value < target:
+                    value += self.rate
+                    if value > target:
+                        value = target
+                else:
+                    value -= self.rate
+                    if value < target:
+                        value = target
+            else:
+                value += ((target - value) * self.rate) >> 8
+                # Unter einer Stufe Abstand direkt aufs Ziel
+                if -256 < target - value < 256:
+                    value = target
+            self.value = value
+
+        if value == target and self.next_target != _NONE:
+            # Nächster Abschnitt beginnt mit dem folgenden Schritt
+            self.target = self.next_target
+            self.curve = EXPONENTIAL
+            self.rate = self.next_rate
+            self.next_target = _NONE
+
+        return value >> 8
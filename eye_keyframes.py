@@ -0,0 +1,197 @@
+import random
+
+import render
+
+# Keyframe-Animationen für die Augen, unabhängig von der Ringgröße
+#
+# Posen werden als Bitmasken über den Ring beschrieben (Bit i = LED i an),
+# relativ zur Geometrie: LED 0 ist unten (6 Uhr, Ring 180° gedreht), die
+# LED in der Mitte des Rings oben (12 Uhr). compile_frames() rechnet eine
+# Folge von Posen einmal in Änderungslisten um: pro Keyframe nur die LEDs,
+# die an- bzw. ausgehen. play() spielt diese Listen ab und schreibt dabei
+# nur die geänderten Pixel in den Puffer.
+#
+# Die Animationen werden pro Ringgröße (und Einbaulage, siehe segments.py)
+# einmal berechnet und zwischengespeichert (animations()). Wartezeiten pro
+# Schritt werden so skaliert, dass eine Animation auf jedem Ring gleich
+# lang dauert wie auf 12 LEDs.
+
+# Unterstützte Ringgrößen
+RING_SIZES = (12, 16, 24, 60)
+
+# Schrittzeiten für einen 12er-Ring (ms)
+BLINK_STEP_MS = 50
+BLINK_CLOSED_MS = 150
+LOOK_STEP_MS = 80
+LOOK_HOLD_MS = (1000, 3000)  # zufällige Verweildauer in der Endposition
+
+# Zwischengespeicherte Animationen pro Ringgröße
+_cache = {}
+
+def arc(n, start, end):
+    """Bitmaske für die LEDs start bis end (inklusive, mit Umlauf)"""
+    mask = 0
+    i = start % n
+    while True:
+        mask |= 1 << i
+        if i == end % n:
+            return mask
+        i = (i + 1) % n
+
+def mirror(n, mask):
+    """Spiegelt eine Maske an der senkrechten Achse (links <-> rechts)"""
+    top = n // 2
+    result = 0
+    for i in range(n):
+        if mask & (1 << i):
+            result |= 1 << ((2 * top - i) % n)
+    return result
+
+def _bits(mask, mapping=None):
+    """LED-Indizes einer Maske als bytes (optional übersetzt mit mapping)"""
+    indices = bytearray()
+    i = 0
+    while mask:
+        if mask & 1:
+            indices.append(mapping[i] if mapping is not None else i)
+        mask >>= 1
+        i += 1
+    return bytes(indices)
+
+def compile_frames(start_mask, keyframes, mapping=None):
+    """Rechnet Posen in Änderungslisten um
+
+    Args:
+        start_mask: Pose vor dem ersten Keyframe
+        keyframes: Liste von (maske, wartezeit_ms) - wartezeit_ms kann auch
+            ein Tupel (min, max) für eine zufällige Wartezeit sein
+        mapping: logischer -> physischer Index (z.B. Segment.map, optional)
+
+    Returns:
+        Liste von (an, aus, wartezeit_ms), an/aus als bytes mit LED-Indizes
+    """
+    frames = []
+    previous = start_mask
+    for mask, wait_ms in keyframes:
+        changed = previous ^ mask
+        frames.append((_bits(changed & mask, mapping), _bits(changed & ~mask, mapping), wait_ms))
+        previous = mask
+    return frames
+
+class EyeAnimations:
+    """Alle Augen-Animationen für eine Ringgröße (vorberechnet)"""
+
+    def __init__(self, n, mapping=None):
+        if n not in RING_SIZES:
+            raise ValueError("Ringgröße nicht unterstützt: {}".format(n))
+
+        self.n = n
+        quarter = n // 4
+        top = n // 2
+        full = (1 << n) - 1
+
+        def scaled(ms):
+            # Gleiche Gesamtdauer wie auf einem 12er-Ring (Viertel = 3 LEDs)
+            return ms * 3 // quarter
+
+        # Auge offen: obere Hälfte (bei 12 LEDs: 3 bis 9)
+        self.open_mask = arc(n, quarter, top + quarter)
+
+        # Geradeaus: alle LEDs setzen, da der Puffer vorher beliebig sein kann
+        self.straight = compile_frames(full & ~self.open_mask, [(self.open_mask, 0)], mapping)
+
+        # Blinzeln: von der Mitte (oben) nach außen schließen, dann von
+        # außen nach innen wieder öffnen
+        closing = []
+        for step in range(quarter + 1):
+            closing.append((self.open_mask & ~arc(n, top - step, top + step), scaled(BLINK_STEP_MS)))
+        # Vollständig geschlossen halten
+        closing.append((0, BLINK_CLOSED_MS))
+
+        opening = []
+        for step in range(quarter, -1, -1):
+            if step > 0:
+                mask = self.open_mask & ~arc(n, top - step + 1, top + step - 1)
+            else:
+                mask = self.open_mask
+            opening.append((mask, scaled(BLINK_STEP_MS)))
+
+        self.blink = compile_frames(self.open_mask, closing + opening, mapping)
+
+        # Nach links schauen: der offene Bogen rollt Richtung LED 0, die
+        # neue LED unten geht einen Schritt nach der alten oben an
+        left = []
+        for step in range(1, quarter + 2):
+            left.append(arc(n, quarter + 1 - step, max(top, top + quarter - step)))
+
+        look_left = [(mask, scaled(LOOK_STEP_MS)) for mask in left]
+        # In der Endposition verweilen
+        look_left.append((left[-1], LOOK_HOLD_MS))
+        # Rückweg in umgekehrter Reihenfolge bis zur offenen Pose
+        for mask in reversed(left[:-1]):
+            look_left.append((mask, scaled(LOOK_STEP_MS)))
+        look_left.append((self.open_mask, scaled(LOOK_STEP_MS)))
+
+        self.look_left = compile_frames(self.open_mask, look_left, mapping)
+        self.look_right = compile_frames(
+            self.open_mask, [(mirror(n, mask), wait_ms) for mask, wait_ms in look_left], mapping)
+
+def animations(n, mapping=None):
+    """Liefert die (zwischengespeicherten) Animationen für n LEDs
+
+    Args:
+        n: Ringgröße
+        mapping: Segment.map bei einzeln adressierten Augen (optional)
+    """
+    key = (n, mapping)
+    anims = _cache.get(key)
+    if anims is None:
+        anims = EyeAnimations(n, mapping)
+        _cache[key] = anims
+    return anims
+
+def play(np, frames, on_color, off_color):
+    """Spielt vorberechnete Keyframes ab (Generator wie in neopixel_eyes)
+
+    Schreibt pro Keyframe nur die geänderten Pixel in den Puffer und
+    liefert danach die Wartezeit in ms.
+
+    Args:
+        np: NeoPixel-kompatibles Objekt
+        frames: Ergebnis von compile_frames()
+        on_color, off_color: Farben aus render.color()
+    """
+    for on, off, wait_ms in frames:
+        for i in off:
+            render.set_color(np, i, off_color)
+        for i in on:
+            render.set_color(np, i, on_color)
+
+        if type(wait_ms) is tuple:
+            wait_ms = random.randint(wait_ms[0], wait_ms[1])
+        yield wait_ms
+
+def play_together(targets, on_color, off_color):
+    """Spielt Keyframes auf mehreren Augen im Gleichschritt ab
+
+    Alle Folgen müssen gleich viele Keyframes haben (gleiche Ringgröße,
+    z.B. blink/blink oder look_left/look_right). Die Wartezeit kommt aus der
+    ersten Folge, eine zufällige Wartezeit gilt also für alle Augen.
+
+    Args:
+        targets: Liste von (np, frames) pro Auge
+        on_color, off_color: Farben aus render.color()
+    """
+    count = len(targets[0][1])
+    for k in range(count):
+        for np, frames in targets:
+            on, off, _ = frames[k]
+            for i in off:
+                render.set_color(np, i, off_color)
+            for i in on:
+                render.set_color(np, i, on_color)
+
+        wait_ms = targets[0][1][k][2]
+        if type(wait_ms) is tuple:
+            wait_ms = random.randint(wait_ms[0], wait_ms[1])
+        yield wait_ms
@@ -0,0 +1,172 @@
+from time import ticks_ms
+
+import render
+
+# Hardware-Abstraktion: Pins, LED-Anzahl und Backends an einer Stelle
+#
+# init() legt NeoPixel, Buzzer und Button genau einmal an, die Module holen
+# sich die Objekte mit get(). Beim Import entsteht noch keine Hardware, die
+# Module lassen sich also auch ohne Pico laden (machine und neopixel werden
+# erst vom Backend REAL importiert).
+#
+# Backends (gleiche API, austauschbar):
+#   REAL    NeoPixel (oder ws2812_pio bei pio=True), PWM-Buzzer, Button-Pin
+#   NULL    Ausgabe kostet nichts: write() und Töne zählen nur mit, so
+#           lässt sich die reine Render-Zeit messen
+#   RECORD  wie NULL, zeichnet aber Frames und Töne mit Zeitstempel auf
+
+# Pins und LED-Anzahl
+NEOPIXEL_PIN = 1    # GP1, Datenleitung der Ringe
+BUZZER_PIN = 8      # GP8, passiver Buzzer
+BUTTON_PIN = 21     # GP21, Taster gegen GND (interner Pull-Up)
+NUM_LEDS = 12       # LEDs pro Ring (beide Ringe parallel)
+NUM_LEDS_CHAINED = 24  # beide Ringe hintereinander (segments.CHAINED_24)
+
+# Backends
+REAL = "real"
+NULL = "null"
+RECORD = "record"
+
+# Höchstens so viele Frames/Töne speichert RECORD
+MAX_RECORDED = 500
+
+class NullPixels(render.PixelBuffer):
+    """NeoPixel ohne Ausgabe, write() zählt nur"""
+
+    def __init__(self, n, bpp=3):
+        super().__init__(n, bpp)
+        self.writes = 0
+
+    def write(self):
+        self.writes += 1
+
+class RecordingPixels(NullPixels):
+    """NeoPixel ohne Ausgabe, speichert jeden Frame als (ticks_ms, bytes)"""
+
+    def __init__(self, n, bpp=3, limit=MAX_RECORDED):
+        super().__init__(n, bpp)
+        self.limit = limit
+        self.frames = []
+
+    def write(self):
+        self.writes += 1
+        if len(self.frames) < self.limit:
+            self.frames.append((ticks_ms(), bytes(self.buf)))
+
+class NullBuzzer:
+    """PWM-Ersatz ohne Ton (freq/duty_u16 wie machine.PWM)"""
+
+    def __init__(self):
+        self._freq = 0
+        self._duty = 0
+
+    def freq(self, value=None):
+        if value is None:
+            return self._freq
+        self._freq = value
+        self._changed()
+
+    def duty_u16(self, value=None):
+        if value is None:
+            return self._duty
+        self._duty = value
+        self._changed()
+
+    def _changed(self):
+        pass
+
+    def deinit(self):
+        self._duty = 0
+
+class RecordingBuzzer(NullBuzzer):
+    """PWM-Ersatz, speichert jeden Tonwechsel als (ticks_ms, frequenz)
+
+    Frequenz 0 bedeutet still (duty 0).
+    """
+
+    def __init__(self, limit=MAX_RECORDED):
+        super().__init__()
+        self.limit = limit
+        self.tones = []
+        self._last = 0
+
+    def _changed(self):
+        frequency = self._freq if self._duty else 0
+        if frequency != self._last and len(self.tones) < self.limit:
+            self.tones.append((ticks_ms(), frequency))
+        self._last = frequency
+
+class NullButton:
+    """Button-Pin, der nie gedrückt wird (value() und irq() wie machine.Pin)"""
+
+    def value(self):
+        return 1
+
+    def irq(self, handler=None, trigger=0, hard=False):
+        pass
+
+class Hardware:
+    """Die einmal angelegten Geräte (np, buzzer, button) eines Backends"""
+
+    def __init__(self, backend, np, buzzer, button):
+        self.backend = backend
+        self.np = np
+        self.buzzer = buzzer
+        self.button = button
+
+_hardware = None
+
+def init(backend=REAL, num_leds=NUM_LEDS, pio=False):
+    """Legt die Hardware einmalig an (weitere Aufrufe liefern dieselbe)
+
+    Args:
+        backend: REAL, NULL oder RECORD
+        num_leds: LEDs am Strip (NUM_LEDS oder NUM_LEDS_CHAINED)
+        pio: bei REAL WS2812 per PIO und DMA (ws2812_pio) statt neopixel
+
+    Returns:
+        Hardware mit np, buzzer und button
+    """
+    global _hardware
+    if _hardware is not None:
+        return _hardware
+
+    if backend == REAL:
+        from machine import Pin, PWM
+        neopixel_pin = Pin(NEOPIXEL_PIN, Pin.OUT)
+        if pio:
+            import ws2812_pio
+            np = ws2812_pio.create(neopixel_pin, num_leds)
+        else:
+            from neopixel import NeoPixel
+            np = NeoPixel(neopixel_pin, num_leds)
+        buzzer = PWM(Pin(BUZZER_PIN))
+        button = Pin(BUTTON_PIN, Pin.IN, Pin.PULL_UP)
+    elif backend == NULL:
+        np = NullPixels(num_leds)
+        buzzer = NullBuzzer()
+        button = NullButton()
+    elif backend == RECORD:
+        np = RecordingPixels(num_leds)
+        buzzer = RecordingBuzzer()
+        button = NullButton()
+    else:
+        raise ValueError("Unbekanntes Backend: {}".format(backend))
+
+    _hardware = Hardware(backend, np, buzzer, button)
+    return _hardware
+
+def get():
+    """Die angelegte Hardware (beim ersten Aufruf init() mit Standardwerten)"""
+    if _hardware is None:
+        return init()
+    return _hardware
+
+def deinit():
+    """Schaltet den Buzzer ab und gibt die Hardware frei (danach neues init() möglich)"""
+    global _hardware
+    if _hardware is None:
+        return
+    _hardware.buzzer.duty_u16(0)
+    _hardware.buzzer.deinit()
+    _hardware = None
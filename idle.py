@@ -0,0 +1,137 @@
+from time import ticks_ms, ticks_diff, sleep_ms
+
+import log
+import profiler
+from timing import remaining_ms
+
+# Stromsparender Leerlauf zwischen Augen-Animationen
+#
+# Statt bis zur nächsten Deadline in 10-ms-Schritten zu pollen, schläft
+# Idle.wait_until() mit machine.lightsleep() bis zur Deadline durch. Ein
+# Button-Druck an GP21 weckt früher auf: der Pin-Interrupt von ButtonEvents
+# ist aktiv und beendet lightsleep. Kurze Wartezeiten (unter MIN_SLEEP_MS)
+# und ausstehende Log-Meldungen werden weiter normal abgewartet.
+#
+# Backends:
+#   LIGHTSLEEP  machine.lightsleep (RP2040; USB-Konsole setzt dabei aus)
+#   POLL        sleep_ms in kleinen Schritten (bisheriges Verhalten)
+#   SIMULATED   wie lightsleep, aber mit sleep_ms in 1-ms-Schritten, die
+#               ein gedrückter Button beendet (zum Testen ohne Pico oder
+#               mit hardware.NULL)
+#
+# stats zählt wache und schlafende Zeit, Schlafphasen, vorzeitiges Wecken
+# und die Weck-Latenz (Button-Flanke bis zur Auswertung).
+
+LIGHTSLEEP = "lightsleep"
+POLL = "poll"
+SIMULATED = "simulated"
+
+MIN_SLEEP_MS = 20       # kürzere Wartezeiten lohnen keinen Schlaf
+POLL_MS = 10            # Schritt beim normalen Warten
+
+class IdleStats:
+    """Wache/schlafende Zeit und Weck-Latenz seit reset()"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.start = ticks_ms()
+        self.slept_ms = 0
+        self.sleeps = 0
+        self.early_wakes = 0
+        self.wakes = 0
+        self.max_wake_ms = 0
+        self.sum_wake_ms = 0
+
+    def awake_ms(self):
+        return ticks_diff(ticks_ms(), self.start) - self.slept_ms
+
+    def record_wake(self, latency_ms):
+        self.wakes += 1
+        self.sum_wake_ms += latency_ms
+        if latency_ms > self.max_wake_ms:
+            self.max_wake_ms = latency_ms
+
+    def report(self):
+        total = ticks_diff(ticks_ms(), self.start)
+        mean = self.sum_wake_ms / self.wakes if self.wakes else 0
+        log.info("Leerlauf: wach {} ms, Schlaf {} ms ({}%), {} Schlafphasen, {} früh geweckt",
+                 self.awake_ms(), self.slept_ms, self.slept_ms * 100 // total if total else 0,
+                 self.sleeps, self.early_wakes)
+        log.info("Weck-Latenz: max {} ms, Mittel {:.1f} ms ({} Drücke)",
+                 self.max_wake_ms, mean, self.wakes)
+
+class Idle:
+    """Wartet stromsparend bis zu einer Deadline oder einem Button-Druck
+
+    Args:
+        backend: LIGHTSLEEP, POLL oder SIMULATED
+        buttons: ButtonEvents (für die Weck-Latenz und SIMULATED)
+        pixels: Ausgabe mit wait() (ws2812_pio), wird vor dem Schlafen
+            abgewartet, damit kein Frame abgeschnitten wird
+    """
+
+    def __init__(self, backend=POLL, buttons=None, pixels=None):
+        self.backend = backend
+        self.buttons = buttons
+        self.pixels = pixels
+        self.stats = IdleStats()
+        if backend == LIGHTSLEEP:
+            from machine import lightsleep
+            self._lightsleep = lightsleep
+        elif backend not in (POLL, SIMULATED):
+            raise ValueError("Unbekanntes Backend: {}".format(backend))
+
+    def _pressed(self):
+        buttons = self.buttons
+        return buttons is not None and buttons.pin.value() == 0
+
+    def _sleep(self, ms):
+        """Schläft höchstens ms, Button weckt früher
+
+        Returns:
+            tatsächlich geschlafene ms
+        """
+        pixels = self.pixels
+        if pixels is not None and hasattr(pixels, "wait"):
+            pixels.wait()
+
+        start = ticks_ms()
+        if self.backend == LIGHTSLEEP:
+            self._lightsleep(ms)
+        else:
+            while ticks_diff(ticks_ms(), start) < ms and not self._pressed():
+                sleep_ms(1)
+        slept = ticks_diff(ticks_ms(), start)
+
+        stats = self.stats
+        stats.sleeps += 1
+        stats.slept_ms += slept
+        if slept < ms - 1:
+            stats.early_wakes += 1
+        return slept
+
+    def wait_until(self, deadline, interrupt_check=None):
+        """Wartet bis zur Deadline (ticks_ms) oder bis interrupt_check() True liefert
+
+        Returns:
+            True wenn unterbrochen, False wenn die Zeit abgelaufen ist
+        """
+        while True:
+            if interrupt_check is not None and interrupt_check():
+                if self.buttons is not None:
+                    self.stats.record_wake(ticks_diff(ticks_ms(), self.buttons.last_time))
+                return True
+
+            remaining = remaining_ms(deadline)
+            if remaining <= 0:
+                return False
+
+            # Erst Meldungen ausgeben, im Schlaf steht die USB-Konsole
+            log.idle_flush()
+            if self.backend == POLL or remaining < MIN_SLEEP_MS or log.pending():
+                profiler.sleep_ms(min(remaining, POLL_MS))
+            else:
+                self._sleep(remaining)
+                profiler.mark()
@@ -0,0 +1,100 @@
+# Render-Kernel mit automatischer Auswahl
+#
+# Die rechenintensiven Schleifen (Helligkeit skalieren, mischen, HSV,
+# Farbverlauf) gibt es zweimal: kompiliert mit Viper/Native
+# in kernels_viper.py und als reines Python hier. Ist der Native-Emitter
+# verfügbar (RP2040), werden die kompilierten Versionen benutzt, sonst
+# (CPython, Ports ohne Emitter) die Python-Versionen. Beide rechnen gleich.
+#
+# Alle Kernel arbeiten direkt auf bytearray-Puffern, Farben sind Integer
+# 0-255, h beim HSV ist ein Farbwinkel 0-255.
+#
+# Einen Kernel zum Füllen mit einer Farbe gibt es absichtlich nicht:
+# render.fill() verdoppelt den ersten Pixel per Slice-Zuweisung (memcpy in
+# C) und ist damit schneller als jede Schleife pro Pixel, auch mit Viper.
+
+def scale_py(dst, src, length, level):
+    """dst = src * Helligkeit (level 0-255)"""
+    m = level + 1
+    for i in range(length):
+        dst[i] = (src[i] * m) >> 8
+
+def blend_py(dst, a, b, length, mix):
+    """dst = a * (1 - mix) + b * mix (mix 0-255)"""
+    m = mix + 1
+    for i in range(length):
+        x = a[i]
+        dst[i] = x + (((b[i] - x) * m) >> 8)
+
+def add_py(dst, src, length, level):
+    """dst += src * Helligkeit, begrenzt auf 255"""
+    m = level + 1
+    for i in range(length):
+        value = src[i]
+        if value:
+            value = dst[i] + ((value * m) >> 8)
+            dst[i] = value if value < 255 else 255
+
+def hsv_to_rgb_py(h, s, v):
+    """HSV (je 0-255) nach RGB-Tupel, nur Integer"""
+    region = h // 43
+    rem = (h - region * 43) * 6
+    p = (v * (255 - s)) >> 8
+    q = (v * (255 - ((s * rem) >> 8))) >> 8
+    t = (v * (255 - ((s * (255 - rem)) >> 8))) >> 8
+    if region == 0:
+        return (v, t, p)
+    if region == 1:
+        return (q, v, p)
+    if region == 2:
+        return (p, v, t)
+    if region == 3:
+        return (p, q, v)
+    if region == 4:
+        return (t, p, v)
+    return (v, p, q)
+
+def gradient_py(buf, n, bpp, table, offset, spread, level, o0, o1, o2, first, step):
+    """Farbverlauf aus einer Farbrad-Tabelle über n LEDs
+
+    table: 256 Farbtöne x R, G, B (color_wheel.WHEEL)
+    offset: Farbton der logisch ersten LED, spread: Farbton-Bereich über alle LEDs
+    level: Helligkeit 0-255
+    o0, o1, o2: Byte-Position von Rot, Grün, Blau (np.ORDER)
+    first, step: logischer Index der physisch ersten LED und Laufrichtung
+        (+1 oder -1, gespiegelter Ring)
+    """
+    m = level + 1
+    i = first
+    for p in range(n):
+        h = (((i * spread) // n + offset) & 255) * 3
+        k = p * bpp
+        buf[k + o0] = (table[h] * m) >> 8
+        buf[k + o1] = (table[h + 1] * m) >> 8
+        buf[k + o2] = (table[h + 2] * m) >> 8
+        i += step
+        if i >= n:
+            i = 0
+        elif i < 0:
+            i = n - 1
+
+try:
+    import kernels_viper as _compiled
+except (ImportError, SyntaxError, NotImplementedError, ValueError):
+    _compiled = None
+
+# True wenn die Viper/Native-Versionen aktiv sind
+COMPILED = _compiled is not None
+
+if COMPILED:
+    scale = _compiled.scale
+    blend = _compiled.blend
+    add = _compiled.add
+    hsv_to_rgb = _compiled.hsv_to_rgb
+    gradient = _compiled.gradient
+else:
+    scale = scale_py
+    blend = blend_py
+    add = add_py
+    hsv_to_rgb = hsv_to_rgb_py
+    gradient = gradient_py
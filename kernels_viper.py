@@ -0,0 +1,75 @@
+import micropython
+
+# Kompilierte Render-Kernel (Viper/Native), nur über kernels.py verwenden
+#
+# Auf Ports ohne Native-Emitter schlägt schon der Import fehl, kernels.py
+# nimmt dann die Python-Versionen. Die Rechnung ist in beiden Versionen
+# identisch, die Ergebnisse also bitgleich. Füllen übernimmt render.fill()
+# (siehe kernels.py).
+
+@micropython.viper
+def scale(dst, src, length: int, level: int):
+    d = ptr8(dst)
+    s = ptr8(src)
+    m = level + 1
+    for i in range(length):
+        d[i] = (s[i] * m) >> 8
+
+@micropython.viper
+def blend(dst, a, b, length: int, mix: int):
+    d = ptr8(dst)
+    pa = ptr8(a)
+    pb = ptr8(b)
+    m = mix + 1
+    for i in range(length):
+        x = pa[i]
+        d[i] = x + (((pb[i] - x) * m) >> 8)
+
+@micropython.viper
+def add(dst, src, length: int, level: int):
+    d = ptr8(dst)
+    s = ptr8(src)
+    m = level + 1
+    for i in range(length):
+        value = s[i]
+        if value:
+            value = d[i] + ((value * m) >> 8)
+            d[i] = value if value < 255 else 255
+
+@micropython.native
+def hsv_to_rgb(h, s, v):
+    region = h // 43
+    rem = (h - region * 43) * 6
+    p = (v * (255 - s)) >> 8
+    q = (v * (255 - ((s * rem) >> 8))) >> 8
+    t = (v * (255 - ((s * (255 - rem)) >> 8))) >> 8
+    if region == 0:
+        return (v, t, p)
+    if region == 1:
+        return (q, v, p)
+    if region == 2:
+        return (p, v, t)
+    if region == 3:
+        return (p, q, v)
+    if region == 4:
+        return (t, p, v)
+    return (v, p, q)
+
+@micropython.viper
+def gradient(buf, n: int, bpp: int, table, offset: int, spread: int, level: int,
+             o0: int, o1: int, o2: int, first: int, step: int):
+    dst = ptr8(buf)
+    src = ptr8(table)
+    m = level + 1
+    i = first
+    for p in range(n):
+        h = (((i * spread) // n + offset) & 255) * 3
+        k = p * bpp
+        dst[k + o0] = (src[h] * m) >> 8
+        dst[k + o1] = (src[h + 1] * m) >> 8
+        dst[k + o2] = (src[h + 2] * m) >> 8
+        i += step
+        if i >= n:
+            i = 0
+        elif i < 0:
+            i = n - 1
@@ -0,0 +1,133 @@
+import sys
+from time import ticks_ms, ticks_diff
+
+# Meldungen über einen Ringpuffer statt direkt mit print()
+#
+# print() schreibt sofort auf die USB-Konsole und blockiert, wenn der PC
+# die Daten nicht abholt. Während Noten und Frames laufen, landen Meldungen
+# deshalb nur in einem vorbelegten Puffer. Ausgegeben wird erst in
+# Leerlaufzeiten (flush() beim Warten zwischen Augen-Animationen) oder auf
+# Anforderung, jeweils höchstens FLUSH_CHUNK Bytes am Stück. Ist der
+# Puffer voll, wird die Meldung verworfen und nur gezählt (dropped), es
+# wird nie gewartet.
+#
+#     log.info("Spiele: {}", song.name)
+#     log.flush()          # im REPL: alles Ausstehende ausgeben
+
+DEBUG = 0
+INFO = 1
+WARN = 2
+ERROR = 3
+
+# Meldungen unter dieser Stufe werden gar nicht erst formatiert
+LEVEL = INFO
+
+BUFFER_SIZE = 2048     # Bytes im Ringpuffer
+FLUSH_CHUNK = 128      # höchstens so viele Bytes pro Leerlauf-flush()
+
+_PREFIX = (b"DEBUG ", b"", b"WARNUNG ", b"FEHLER ")
+
+_buf = bytearray(BUFFER_SIZE)
+_mv = memoryview(_buf)
+_head = 0              # Schreibposition
+_tail = 0              # Leseposition
+_used = 0
+
+# Verworfene Meldungen seit der letzten Ausgabe
+dropped = 0
+# Zeitpunkt (ticks_ms) der ersten verworfenen Meldung
+dropped_since = 0
+
+def _put(data):
+    global _head, _used
+    n = len(data)
+    first = min(n, BUFFER_SIZE - _head)
+    _buf[_head:_head + first] = data[:first]
+    if first < n:
+        _buf[0:n - first] = data[first:]
+    _head = (_head + n) % BUFFER_SIZE
+    _used += n
+
+def log(level, text, *args):
+    """Legt eine Meldung im Puffer ab (blockiert nie)
+
+    Args:
+        level: DEBUG, INFO, WARN oder ERROR
+        text: Text, bei args mit str.format-Platzhaltern
+    """
+    global dropped, dropped_since
+    if level < LEVEL:
+        return
+    if args:
+        text = text.format(*args)
+    data = text.encode()
+    prefix = _PREFIX[level]
+    if len(prefix) + len(data) + 1 > BUFFER_SIZE - _used:
+        if not dropped:
+            dropped_since = ticks_ms()
+        dropped += 1
+        return
+    if prefix:
+        _put(prefix)
+    _put(data)
+    _put(b"\n")
+
+def debug(text, *args):
+    log(DEBUG, text, *args)
+
+def info(text, *args):
+    log(INFO, text, *args)
+
+def warn(text, *args):
+    log(WARN, text, *args)
+
+def error(text, *args):
+    log(ERROR, text, *args)
+
+def pending():
+    """Anzahl noch nicht ausgegebener Bytes"""
+    return _used
+
+def _output():
+    # Rohe Bytes ohne Umwandlung in str (MicroPython: sys.stdout.buffer)
+    out = getattr(sys.stdout, "buffer", None)
+    if out is None:
+        return sys.stdout
+    # Gepufferten Text vorher ausgeben (fehlt auf manchen Ports)
+    if hasattr(sys.stdout, "flush"):
+        sys.stdout.flush()
+    return out
+
+def flush(limit=None):
+    """Gibt ausstehende Meldungen aus
+
+    Args:
+        limit: höchstens so viele Bytes (z.B. FLUSH_CHUNK im Leerlauf),
+            None = alles
+
+    Returns:
+        Anzahl ausgegebener Bytes
+    """
+    global _tail, _used, dropped
+    n = _used if limit is None else min(limit, _used)
+    if n:
+        out = _output()
+        first = min(n, BUFFER_SIZE - _tail)
+        out.write(_mv[_tail:_tail + first])
+        if first < n:
+            out.write(_mv[0:n - first])
+        _tail = (_tail + n) % BUFFER_SIZE
+        _used -= n
+
+    # Hinweis auf verworfene Meldungen erst, wenn der Puffer leer ist
+    if dropped and not _used:
+        count = dropped
+        dropped = 0
+        log(WARN, "{} Meldungen verworfen (Puffer voll seit {} ms)", count,
+            ticks_diff(ticks_ms(), dropped_since))
+    return n
+
+def idle_flush():
+    """Ein Stück ausgeben, wenn gerade Leerlauf ist (Augen-Modus)"""
+    if _used:
+        flush(FLUSH_CHUNK)
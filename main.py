@@ -1,115 +1,180 @@
-from machine import Pin, PWM
-from neopixel import NeoPixel
-from time import sleep
+from time import sleep, ticks_ms, ticks_diff
 
 # Module importieren
+import hardware
+import idle
+import log
+import memory
+import profiler
 import neopixel_eyes
 import christmas_light_show
+import render
+import segments
+from compositor import Compositor
+from button_events import ButtonEvents
 
-# Hardware initialisieren (beide Module teilen sich das NeoPixel)
-neopixel_pin = Pin(1, Pin.OUT)
-np = NeoPixel(neopixel_pin, 12)
-buzzer_obj = PWM(Pin(8))
+# Laufzeitumgebung: False = blockierende Schleife, True = asyncio-Tasks
+# (Augen, Musik, Licht und Button laufen parallel, Button bricht Lieder ab)
+USE_ASYNC_RUNTIME = False
+
+# True = Rendern und np.write() auf dem zweiten Kern (dual_core.py),
+# Melodie und Button auf Kern 0
+USE_DUAL_CORE = False
+
+# Augen: False = beide 12er-Ringe parallel an GP1 (zeigen dasselbe),
+# True = Ringe hintereinander als ein Strip mit 24 LEDs (Augen einzeln)
+EYES_CHAINED = False
+
+# True = WS2812-Ausgabe per PIO und DMA (write() blockiert nicht)
+USE_PIO_DRIVER = False
+
+# Gesendete/übersprungene Frames nach jeder Animation und jedem Lied ausgeben
+REPORT_WRITES = False
+
+# Laufzeit-Histogramme (Render, write(), Schlaf-Überschreitung, Tonbeginn,
+# Button-Latenz) messen und nach jedem Lied ausgeben (siehe profiler.py)
+PROFILE = False
+profiler.ENABLED = PROFILE
 
-# Hardware an beide Module übergeben
-neopixel_eyes.np = np
-christmas_light_show.init_hardware(neopixel_obj=np, buzzer_obj=buzzer_obj)
+# True = zwischen Augen-Animationen mit machine.lightsleep schlafen statt
+# zu pollen, der Button an GP21 weckt auf (spart Strom im Akkubetrieb, die
+# USB-Konsole setzt im Schlaf aus)
+LOW_POWER_IDLE = False
+
+# Hardware-Backend: hardware.REAL, hardware.NULL (Ausgabe kostet nichts,
+# misst nur das Rendern) oder hardware.RECORD (zeichnet Frames und Töne auf)
+HARDWARE_BACKEND = hardware.REAL
+
+# Hardware initialisieren (beide Module teilen sich das NeoPixel)
+num_leds = hardware.NUM_LEDS_CHAINED if EYES_CHAINED else hardware.NUM_LEDS
+if EYES_CHAINED:
+    segments.EYE_LAYOUT = segments.CHAINED_24
+hw = hardware.init(HARDWARE_BACKEND, num_leds, pio=USE_PIO_DRIVER)
+# FrameBuffer sendet unveränderte Frames nicht erneut (zählt geänderte
+# Pixel nur für REPORT_WRITES, das kostet Zeit pro Frame)
+np = render.FrameBuffer(hw.np, count_changes=REPORT_WRITES)
+buzzer_obj = hw.buzzer
+
+# Augen und Lichtshow zeichnen in eigene Ebenen, der Compositor mischt
+# sie und sendet das Ergebnis (Moduswechsel als Überblendung)
+compositor = Compositor(np)
+eye_layer = compositor.add_layer(opacity=255)
+music_layer = compositor.add_layer()
+
+# Ebenen an beide Module übergeben
+neopixel_eyes.np = eye_layer
+christmas_light_show.init_hardware(neopixel_obj=music_layer, buzzer_obj=buzzer_obj)
 
 # Sicherstellen, dass alle LEDs aus sind und brightness zurückgesetzt ist
-christmas_light_show.current_brightness = 0
-for i in range(12):
-    np[i] = (0, 0, 0)
+christmas_light_show.light.set(0)
+render.clear(np)
 np.write()
 
-# Button-Konfiguration
-button = Pin(21, Pin.IN, Pin.PULL_UP)  # GP21 mit internem Pull-Up
+# Button: GP21 mit internem Pull-Up, Events per Interrupt
+buttons = ButtonEvents(hw.button)
 
 print("\n" + "="*40)
 print("  WEIHNACHTS-ROBOTER")
 print("="*40)
-print("NeoPixel: GP1 (2x 12 LEDs)")
-print("Buzzer: GP8")
-print("Button: GP21")
+print("NeoPixel: GP{} (2x {} LEDs, {})".format(
+    hardware.NEOPIXEL_PIN, hardware.NUM_LEDS, "verkettet" if EYES_CHAINED else "parallel"))
+print("Buzzer: GP{}".format(hardware.BUZZER_PIN))
+print("Button: GP{}".format(hardware.BUTTON_PIN))
 print("")
 print("Modus: Augen-Animation")
 print("Button drücken -> Zufälliges Lied")
 print("Drücke Strg+C zum Beenden")
 print("="*40 + "\n")
 
-def is_button_pressed():
-    """Prüft ob Button gerade gedrückt ist (für schnelle Interrupt-Checks)
-
-    Returns:
-        True wenn Button gedrückt ist, False sonst
-    """
-    global last_button_state
-    button_state = button.value()
-
-    # Button wurde gedrückt (Flanke 1 -> 0)
-    if last_button_state == 1 and button_state == 0:
-        last_button_state = button_state
-        return True
-
-    last_button_state = button_state
-    return False
-
 def handle_button_press():
     """Behandelt Button-Druck und spielt Musik"""
-    print("\n>>> Button gedrückt! <<<")
-    print("Wechsel zu Musik-Modus...\n")
+    log.info(">>> Button gedrückt! <<<")
+    log.info("Wechsel zu Musik-Modus...")
 
-    # Augen ausschalten
-    neopixel_eyes.clear_all()
-    sleep(0.2)
+    # Augen ausblenden, während das Lied beginnt (läuft mit den Frames des Lieds)
+    compositor.crossfade(music_layer)
 
     # Zufälliges Lied abspielen
     christmas_light_show.play_random_song()
-
-    # Kleine Pause
-    sleep(1)
-
-    # Zurück zum Augen-Modus
-    print("\nZurück zum Augen-Modus\n")
+    if REPORT_WRITES:
+        np.report("Musik")
+    if PROFILE:
+        memory.report()
+        if neopixel_eyes.idle_scheduler is not None:
+            neopixel_eyes.idle_scheduler.stats.report()
+            neopixel_eyes.idle_scheduler.stats.reset()
+        # Alles über log, ausgegeben wird im Leerlauf zwischen den Animationen
+        profiler.report(christmas_light_show.FRAME_MS)
+        profiler.reset()
+
+    # Zurück zum Augen-Modus: Augen geradeaus einblenden
+    log.info("Zurück zum Augen-Modus")
+    neopixel_eyes.look_straight()
+    compositor.crossfade(eye_layer)
+    compositor.finish(christmas_light_show.FRAME_MS, profiler.sleep_ms)
 
 try:
     # Initialisierung
     neopixel_eyes.clear_all()
     sleep(0.5)
+    profiler.reset()
+
+    # Automatische GC abschalten, gesammelt wird an Lied- und Animationsgrenzen
+    memory.setup()
+
+    # Events aus der Initialisierung verwerfen
+    print(f"Initialer Button-Status: {buttons.pin.value()}")
+    buttons.clear()
 
-    # Button-Status einlesen (nicht annehmen!)
-    last_button_state = button.value()
-    print(f"Initialer Button-Status: {last_button_state}")
-    sleep(0.1)  # Kurz warten für Stabilisierung
+    if USE_ASYNC_RUNTIME:
+        import runtime
+        runtime.run(compositor, eye_layer, music_layer, buzzer_obj, buttons)
+
+    if USE_DUAL_CORE:
+        import dual_core
+        dual_core.run(np, buzzer_obj, buttons)
 
     # Interrupt-Check-Funktion an neopixel_eyes übergeben
-    neopixel_eyes.interrupt_check = is_button_pressed
+    neopixel_eyes.interrupt_check = buttons.was_pressed
+
+    if LOW_POWER_IDLE:
+        # Ohne echte Hardware wird der Schlaf nur nachgestellt
+        backend = idle.LIGHTSLEEP if HARDWARE_BACKEND == hardware.REAL else idle.SIMULATED
+        neopixel_eyes.idle_scheduler = idle.Idle(backend, buttons, hw.np)
 
     while True:
         # Führe Animation aus (wird automatisch unterbrochen bei Button-Druck)
         interrupted = neopixel_eyes.do_animation()
+        if REPORT_WRITES:
+            np.report("Augen")
 
-        # Wenn Animation durch Button unterbrochen wurde
+        # Wenn Animation durch Button unterbrochen wurde (play_random_song
+        # räumt vor dem Lied selbst auf)
         if interrupted:
             handle_button_press()
-            # Button-Status neu einlesen nach Musik
-            last_button_state = button.value()
+            # Während der Musik gedrückte Buttons ignorieren
+            buttons.clear()
             continue
 
-        # Kurze Pause zwischen Animationen (auch interruptible)
-        pause_duration = 0.5
-        interval = 0.05
-        elapsed = 0.0
-
-        while elapsed < pause_duration:
-            if is_button_pressed():
-                handle_button_press()
-                last_button_state = button.value()
-                break
-            sleep(interval)
-            elapsed += interval
+        # Aufräumen zwischen zwei Animationen (Augen stehen gerade still)
+        memory.collect()
+
+        # Kurze Pause zwischen Animationen (auch interruptible), zuerst
+        # fehlende Licht-Shows stückweise vorberechnen
+        pause_ms = 500
+        if christmas_light_show.USE_SHOW_CACHE:
+            import show_cache
+            start = ticks_ms()
+            show_cache.precompile(music_layer.n, christmas_light_show.PRECOMPILE_MS)
+            pause_ms = max(0, pause_ms - ticks_diff(ticks_ms(), start))
+        if neopixel_eyes.interruptible_sleep(pause_ms / 1000):
+            handle_button_press()
+            buttons.clear()
 
 except KeyboardInterrupt:
     buzzer_obj.duty_u16(0)
     buzzer_obj.deinit()
-    neopixel_eyes.clear_all()
+    render.clear(np)
+    np.write()
+    log.flush()
     print("\n\nBeendet - Frohe Weihnachten!")
@@ -0,0 +1,140 @@
+import gc
+from time import ticks_us, ticks_diff
+
+import log
+
+# Garbage Collection an planbaren Stellen statt mitten in einer Note
+#
+# MicroPython sammelt, sobald eine Allokation keinen Platz mehr findet.
+# Diese Pause (einige ms) fällt sonst zufällig in eine Note oder einen
+# Frame und ist als verlängerter Ton bzw. Ruckler sichtbar. Deshalb:
+#   setup()          gc.threshold abschalten: automatisch wird dann nur
+#                    gesammelt, wenn der Heap voll ist (Sicherheitsnetz)
+#   collect()        gezielt sammeln an Grenzen: vor einem Lied, nach einer
+#                    Augen-Animation
+#   maybe_collect()  in einer Pause zwischen zwei Noten sammeln, wenn genug
+#                    belegt wurde und die bisher längste Pause hineinpasst
+# stats zählt geplante und ungeplante Sammlungen (ungeplant = gc.mem_alloc
+# ist ohne collect() gefallen) und die Dauer jeder Pause. report() gibt
+# zusätzlich die Fragmentierung des Heaps aus.
+
+# Zwischen zwei Noten nur sammeln, wenn seitdem so viel belegt wurde
+MIN_COLLECT_BYTES = 4096
+
+# Angenommene Pause, solange noch keine gemessen wurde (µs)
+DEFAULT_PAUSE_US = 3000
+
+# Auf CPython (Simulator) gibt es mem_alloc/threshold nicht
+HAVE_MEM = hasattr(gc, "mem_alloc")
+
+class GCStats:
+    """Zähler und Pausen der Garbage Collections"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.planned = 0
+        self.unplanned = 0
+        self.last_us = 0
+        self.max_us = 0
+        self.sum_us = 0
+        self.free_after = 0
+
+    def record(self, pause_us):
+        self.planned += 1
+        self.last_us = pause_us
+        self.sum_us += pause_us
+        if pause_us > self.max_us:
+            self.max_us = pause_us
+
+stats = GCStats()
+
+# gc.mem_alloc() nach der letzten Sammlung bzw. beim letzten check()
+_after_collect = 0
+_last_alloc = 0
+
+def _alloc():
+    return gc.mem_alloc() if HAVE_MEM else 0
+
+def setup():
+    """Schaltet gc.threshold ab und räumt einmal auf (beim Start)
+
+    gc.threshold(n) sammelt, sobald seit der letzten Sammlung n Bytes belegt
+    wurden, also nur früher als ohne Schwelle. Mit -1 sammelt MicroPython
+    erst, wenn eine Allokation keinen Platz mehr findet.
+    """
+    collect()
+    if HAVE_MEM:
+        gc.threshold(-1)
+
+def check():
+    """Erkennt automatische Sammlungen seit dem letzten Aufruf"""
+    global _last_alloc
+    alloc = _alloc()
+    if alloc < _last_alloc:
+        stats.unplanned += 1
+    _last_alloc = alloc
+
+def collect():
+    """Sammelt jetzt (an einer Grenze, z.B. vor einem Lied) und misst die Pause
+
+    Returns:
+        Dauer der Pause in µs
+    """
+    global _after_collect, _last_alloc
+    check()
+    start = ticks_us()
+    gc.collect()
+    pause = ticks_diff(ticks_us(), start)
+    stats.record(pause)
+    _after_collect = _last_alloc = _alloc()
+    if HAVE_MEM:
+        stats.free_after = gc.mem_free()
+    return pause
+
+def maybe_collect(budget_us):
+    """Sammelt in einer Pause (z.B. zwischen zwei Noten), wenn es sich lohnt
+
+    Args:
+        budget_us: verfügbare Zeit; gesammelt wird nur, wenn die bisher
+            längste Pause hineinpasst
+
+    Returns:
+        True wenn gesammelt wurde
+    """
+    check()
+    if _last_alloc - _after_collect < MIN_COLLECT_BYTES:
+        return False
+    if (stats.max_us or DEFAULT_PAUSE_US) > budget_us:
+        return False
+    collect()
+    return True
+
+def largest_free():
+    """Größter zusammenhängend belegbarer Block in Bytes (belegt kurz Speicher)"""
+    if not HAVE_MEM:
+        return 0
+    low = 0
+    high = gc.mem_free()
+    while low < high:
+        size = (low + high + 1) // 2
+        try:
+            block = bytearray(size)
+            del block
+            low = size
+        except MemoryError:
+            high = size - 1
+    return low
+
+def report():
+    """Gibt Sammlungen, Pausen und Fragmentierung aus (über log)"""
+    mean = stats.sum_us // stats.planned if stats.planned else 0
+    log.info("GC: {} geplant, {} ungeplant, Pause max {} µs, Mittel {} µs",
+             stats.planned, stats.unplanned, stats.max_us, mean)
+    if HAVE_MEM:
+        gc.collect()
+        free = gc.mem_free()
+        largest = largest_free()
+        log.info("Heap: {} B frei, größter Block {} B ({}% fragmentiert)",
+                 free, largest, 100 - largest * 100 // free if free else 0)
@@ -1,23 +1,33 @@
-from machine import Pin
-from neopixel import NeoPixel
 from time import sleep
 import random
 
-# Hardware-Konfiguration
-NUM_LEDS = 12  # Anzahl LEDs pro Ring (beide Ringe parallel geschaltet)
+import hardware
+import log
+import profiler
+import render
+import eye_keyframes
+import segments
+import brightness
+from timing import deadline_after, remaining_ms
+
+# Hardware-Konfiguration (Pins und LED-Anzahl stehen in hardware.py)
+NUM_LEDS = hardware.NUM_LEDS  # LEDs pro Ring (12, 16, 24 oder 60, beide Ringe parallel geschaltet)
 np = None  # type: ignore  # Wird von main.py oder beim direkten Start initialisiert
 
 # Farbe für die Augen (weiß für offenes Auge)
 EYE_COLOR = (255, 255, 255)  # RGB Weiß
-EYE_BRIGHTNESS = 0.01  # 1% Helligkeit
+EYE_LEVEL = 28  # Wahrgenommene Helligkeit 0-255 (ergibt ~1% LED-Wert)
 OFF = (0, 0, 0)
 
 # Callback-Funktion für Interrupt-Checks (wird von main.py gesetzt)
 interrupt_check = None  # type: ignore
 
-def scale_color(color, brightness):
-    """Skaliert eine Farbe mit Helligkeitsfaktor"""
-    return tuple(int(c * brightness) for c in color)
+# Stromsparendes Warten (idle.Idle, wird von main.py gesetzt, None = pollen)
+idle_scheduler = None  # type: ignore
+
+def scale_color(color, level):
+    """Skaliert eine Farbe mit Helligkeit 0-255 (Integer, gamma-korrigiert)"""
+    return brightness.scale_color(color, level)
 
 def interruptible_sleep(duration):
     """Sleep-Funktion die durch Button-Callback unterbrochen werden kann
@@ -33,344 +43,217 @@ def interruptible_sleep(duration):
         sleep(duration)
         return False
 
-    # Teile die Wartezeit in kleine Intervalle auf (50ms)
-    interval = 0.05
-    elapsed = 0.0
+    # Bis zur absoluten Deadline in kleinen Intervallen (max. 10ms) warten.
+    # Der Button-Check liest nur die Event-Warteschlange, Drücke gehen also
+    # nicht verloren.
+    deadline = deadline_after(int(duration * 1000))
+
+    # Mit idle_scheduler bis zur Deadline oder zum Button-Druck schlafen
+    if idle_scheduler is not None:
+        return idle_scheduler.wait_until(deadline, interrupt_check)
 
-    while elapsed < duration:
+    while True:
         # Prüfe ob unterbrochen werden soll
         if interrupt_check():
             return True
 
-        # Schlafe für ein kleines Intervall
-        sleep(interval)
-        elapsed += interval
+        remaining = remaining_ms(deadline)
+        if remaining <= 0:
+            return False
 
-    return False
+        # Leerlauf: ausstehende Meldungen stückweise ausgeben
+        log.idle_flush()
+        profiler.sleep_ms(min(remaining, 10))
 
 def clear_all():
     """Schaltet alle LEDs aus"""
-    for i in range(NUM_LEDS):
-        np[i] = OFF  # type: ignore
+    render.clear(np)
     np.write()  # type: ignore
 
-def get_upper_half():
-    """Gibt die LED-Indizes für die obere Hälfte zurück (Auge offen)"""
-    # Bei 12 LEDs und 180° Drehung: LED 6 ist oben, dann im Uhrzeigersinn
-    # Obere Hälfte: LEDs 3, 4, 5, 6, 7, 8, 9
-    quarter = NUM_LEDS // 4
-    half = NUM_LEDS // 2
-
-    # Von links-oben über oben nach rechts-oben (180° gedreht)
-    upper = []
-    for i in range(NUM_LEDS):
-        # Obere Hälfte: von quarter bis three_quarter (bei 12 LEDs: 3 bis 9)
-        if i >= quarter and i <= half + quarter:
-            upper.append(i)
-    return upper
-
-def get_lower_half():
-    """Gibt die LED-Indizes für die untere Hälfte zurück"""
-    # 180° gedreht: Untere Hälfte: LEDs 10, 11, 0, 1, 2
-    quarter = NUM_LEDS // 4
-    three_quarter = NUM_LEDS * 3 // 4
-
-    lower = []
-    for i in range(NUM_LEDS):
-        # Untere Hälfte: von three_quarter bis quarter (wrap around)
-        if i >= three_quarter or i < quarter:
-            lower.append(i)
-    return lower
-
-def get_left_quarter():
-    """LEDs für linkes Viertel (oben links) - die beim Links-Schauen ausgehen"""
-    # 180° gedreht: Bei 12 LEDs: 3, 4, 5 (3 LEDs)
-    quarter = NUM_LEDS // 4
-    return list(range(quarter, quarter * 2))
-
-def get_right_quarter():
-    """LEDs für rechtes Viertel (oben rechts) - die beim Rechts-Schauen ausgehen"""
-    # 180° gedreht: Bei 12 LEDs: 7, 8, 9 (3 LEDs) - LED 6 bleibt immer an
-    quarter = NUM_LEDS // 4
-    half = NUM_LEDS // 2
-    return list(range(half + 1, half + quarter + 1))
-
-def get_lower_left_quarter():
-    """LEDs für unten links - die beim Rechts-Schauen angehen"""
-    # 180° gedreht: Bei 12 LEDs: 0, 1, 2 (3 LEDs)
-    quarter = NUM_LEDS // 4
-    return list(range(0, quarter))
-
-def get_lower_right_quarter():
-    """LEDs für unten rechts - die beim Links-Schauen angehen"""
-    # 180° gedreht: Bei 12 LEDs: 10, 11 (nur 2 LEDs wegen wrap-around)
-    three_quarter = NUM_LEDS * 3 // 4
-    # Wir geben die letzten LEDs zurück: 10, 11
-    return list(range(three_quarter, NUM_LEDS))
-
-def look_straight():
-    """Auge schaut geradeaus (obere Hälfte an)"""
-    clear_all()
-    color = scale_color(EYE_COLOR, EYE_BRIGHTNESS)
-
-    for led in get_upper_half():
-        np[led] = color  # type: ignore
-    np.write()  # type: ignore
-
-def blink():
-    """Blinzel-Animation: LEDs gehen von der Mitte nach außen aus (Augenlid schließt sich)"""
-    color = scale_color(EYE_COLOR, EYE_BRIGHTNESS)
-    upper = get_upper_half()  # [3, 4, 5, 6, 7, 8, 9]
-
-    # Phase 1: Auge schließt sich - von der Mitte (LED 6) nach außen
-    # Mitte finden
-    mid = len(upper) // 2  # Index 3 in der Liste -> LED 6
-
-    # Von der Mitte nach außen ausschalten
-    for step in range(mid + 1):
-        # Mittlere LED zuerst, dann symmetrisch nach außen
-        # step 0: LED 6 (Mitte)
-        # step 1: LED 5 und 7
-        # step 2: LED 4 und 8
-        # step 3: LED 3 und 9
-
-        # Mitte ausschalten
-        if step == 0:
-            np[upper[mid]] = OFF  # type: ignore
-        else:
-            # Links von der Mitte
-            left_idx = mid - step
-            if left_idx >= 0:
-                np[upper[left_idx]] = OFF  # type: ignore
-
-            # Rechts von der Mitte
-            right_idx = mid + step
-            if right_idx < len(upper):
-                np[upper[right_idx]] = OFF  # type: ignore
+# Die Animationen sind Generatoren: Sie verändern nur den Puffer von np und
+# liefern per yield die Wartezeit in ms bis zum nächsten Schritt. Vor jeder
+# Wartezeit wird der Puffer geschrieben. So lassen sich dieselben Animationen
+# blockierend (play_frames) oder kooperativ (runtime.py) abspielen.
 
-        np.write()  # type: ignore
-        sleep(0.05)
-
-    # Kurz komplett geschlossen halten (alle LEDs aus)
-    clear_all()
-    sleep(0.15)
-
-    # Phase 2: Auge öffnet sich wieder - von außen nach innen
-    # In umgekehrter Reihenfolge
-    for step in range(mid, -1, -1):
-        if step == 0:
-            # Mitte anschalten
-            np[upper[mid]] = color  # type: ignore
-        else:
-            # Äußere LEDs zuerst, dann nach innen
-            left_idx = mid - step
-            if left_idx >= 0:
-                np[upper[left_idx]] = color  # type: ignore
-
-            right_idx = mid + step
-            if right_idx < len(upper):
-                np[upper[right_idx]] = color  # type: ignore
-
-        np.write()  # type: ignore
-        sleep(0.05)
-
-    # Zurück zur normalen Position
-    look_straight()
+def play_frames(frames):
+    """Spielt einen Animations-Generator blockierend ab
 
-def look_left():
-    """Auge schaut nach links (9 o'clock Richtung)
+    Args:
+        frames: Generator, der Wartezeiten in ms liefert
 
     Returns:
         True wenn durch Button unterbrochen, False sonst
     """
-    color = scale_color(EYE_COLOR, EYE_BRIGHTNESS)
-
-    # Hinweg: Von 12-6 o'clock Position nach links rollen
-    # Schritt 1: LED 9 (3 o'clock) aus
-    np[9] = OFF  # type: ignore
-    np.write()  # type: ignore
-    sleep(0.08)
-
-    # Schritt 2: LED 8 aus, LED 2 an (swap)
-    np[8] = OFF  # type: ignore
-    np[2] = color  # type: ignore
-    np.write()  # type: ignore
-    sleep(0.08)
-
-    # Schritt 3: LED 7 aus, LED 1 an (swap)
-    np[7] = OFF  # type: ignore
-    np[1] = color  # type: ignore
-    np.write()  # type: ignore
-    sleep(0.08)
-
-    # Schritt 4: LED 0 (6 o'clock) an
-    np[0] = color  # type: ignore
-    np.write()  # type: ignore
-    sleep(0.08)
-
-    # In der Endposition verweilen (1-3 Sekunden, interruptible)
-    if interruptible_sleep(random.uniform(1.0, 3.0)):
-        return True
-
-    # Rückweg: Zurück zur Ausgangsposition (umgekehrt)
-    # Schritt 4 rückwärts: LED 0 aus
-    np[0] = OFF  # type: ignore
-    np.write()  # type: ignore
-    sleep(0.08)
-
-    # Schritt 3 rückwärts: LED 1 aus, LED 7 an
-    np[1] = OFF  # type: ignore
-    np[7] = color  # type: ignore
-    np.write()  # type: ignore
-    sleep(0.08)
-
-    # Schritt 2 rückwärts: LED 2 aus, LED 8 an
-    np[2] = OFF  # type: ignore
-    np[8] = color  # type: ignore
-    np.write()  # type: ignore
-    sleep(0.08)
+    for wait_ms in frames:
+        np.write()  # type: ignore
+        if wait_ms and interruptible_sleep(wait_ms / 1000):
+            return True
 
-    # Schritt 1 rückwärts: LED 9 an
-    np[9] = color  # type: ignore
     np.write()  # type: ignore
-    sleep(0.08)
-
     return False
 
-def look_right():
-    """Auge schaut nach rechts (3 o'clock Richtung)
+# Rechtes Auge spielt dieselbe Animation wie das linke
+_SAME = "same"
 
-    Returns:
-        True wenn durch Button unterbrochen, False sonst
-    """
-    color = scale_color(EYE_COLOR, EYE_BRIGHTNESS)
-
-    # Hinweg: Von 12-6 o'clock Position nach rechts rollen
-    # Schritt 1: LED 3 (9 o'clock) aus
-    np[3] = OFF  # type: ignore
-    np.write()  # type: ignore
-    sleep(0.08)
-
-    # Schritt 2: LED 4 aus, LED 10 an (swap)
-    np[4] = OFF  # type: ignore
-    np[10] = color  # type: ignore
-    np.write()  # type: ignore
-    sleep(0.08)
-
-    # Schritt 3: LED 5 aus, LED 11 an (swap)
-    np[5] = OFF  # type: ignore
-    np[11] = color  # type: ignore
-    np.write()  # type: ignore
-    sleep(0.08)
-
-    # Schritt 4: LED 0 (6 o'clock) an
-    np[0] = color  # type: ignore
-    np.write()  # type: ignore
-    sleep(0.08)
+def two_eyes():
+    """True wenn die Augen einzeln adressierbar sind (verketteter Strip)"""
+    return segments.eye_views(np) is not None
 
-    # In der Endposition verweilen (1-3 Sekunden, interruptible)
-    if interruptible_sleep(random.uniform(1.0, 3.0)):
-        return True
+def _eye_frames(name, right=_SAME):
+    """Spielt eine Animation aus eye_keyframes mit der Augenfarbe ab
 
-    # Rückweg: Zurück zur Ausgangsposition (umgekehrt)
-    # Schritt 4 rückwärts: LED 0 aus
-    np[0] = OFF  # type: ignore
-    np.write()  # type: ignore
-    sleep(0.08)
+    Args:
+        name: Animation (Attribut von EyeAnimations), z.B. "blink"
+        right: Animation für das rechte Auge, None = bleibt unverändert
+            (nur bei einzeln adressierten Augen, sonst gilt name für beide)
+    """
+    on = render.color(np, *scale_color(EYE_COLOR, EYE_LEVEL))
+    off = render.color(np, *OFF)
+
+    eyes = segments.eye_views(np)
+    if eyes is None:
+        return eye_keyframes.play(np, getattr(eye_keyframes.animations(NUM_LEDS), name), on, off)
+
+    names = (name, name if right is _SAME else right)
+    targets = []
+    for eye, eye_name in zip(eyes, names):
+        if eye_name is not None:
+            targets.append((eye, getattr(eye_keyframes.animations(eye.n, eye.map), eye_name)))
+    return eye_keyframes.play_together(targets, on, off)
+
+def look_straight_frames():
+    """Auge schaut geradeaus (obere Hälfte an) - nur Puffer, keine Wartezeit"""
+    for _ in _eye_frames("straight"):
+        pass
+
+    # Generator ohne Schritte
+    return
+    yield
+
+def blink_frames():
+    """Blinzel-Animation: LEDs gehen von der Mitte nach außen aus (Augenlid schließt sich)"""
+    yield from _eye_frames("blink")
 
-    # Schritt 3 rückwärts: LED 11 aus, LED 5 an
-    np[11] = OFF  # type: ignore
-    np[5] = color  # type: ignore
-    np.write()  # type: ignore
-    sleep(0.08)
+    # Zurück zur normalen Position
+    yield from look_straight_frames()
 
-    # Schritt 2 rückwärts: LED 10 aus, LED 4 an
-    np[10] = OFF  # type: ignore
-    np[4] = color  # type: ignore
-    np.write()  # type: ignore
-    sleep(0.08)
+def wink_frames():
+    """Zwinkern: nur das linke Auge blinzelt (bei parallelen Ringen: Blinzeln)"""
+    yield from _eye_frames("blink", None)
+    yield from look_straight_frames()
 
-    # Schritt 1 rückwärts: LED 3 an
-    np[3] = color  # type: ignore
-    np.write()  # type: ignore
-    sleep(0.08)
+def look_left_frames():
+    """Auge schaut nach links (9 o'clock Richtung)"""
+    yield from _eye_frames("look_left")
 
-    return False
+def look_right_frames():
+    """Auge schaut nach rechts (3 o'clock Richtung)"""
+    yield from _eye_frames("look_right")
 
-def do_animation():
-    """Führt eine zufällige Augen-Animation aus und kehrt danach zurück
+def cross_eyed_frames():
+    """Schielen: linkes Auge schaut nach rechts, rechtes nach links"""
+    yield from _eye_frames("look_right", "look_left")
 
-    Diese Funktion wird von main.py in einer Schleife aufgerufen.
-    Sie wählt zufällig eine Animation basierend auf Wahrscheinlichkeiten
-    und führt diese komplett aus, bevor sie zurückkehrt.
+def animation_frames():
+    """Wählt eine zufällige Augen-Animation und liefert ihre Schritte
 
-    Returns:
-        True wenn durch Button unterbrochen, False sonst
+    Die Auswahl erfolgt nach gewichteten Wahrscheinlichkeiten.
     """
     # Sicherstellen dass Auge gerade schaut
-    look_straight()
+    yield from look_straight_frames()
+    yield 0
 
     # Bestimme zufällige Aktion mit gewichteter Wahrscheinlichkeit
     action = random.randint(1, 100)
 
     if action <= 60:
         # 60% Chance: Nur blinzeln (häufigste Aktion)
-        blink()
-        if interruptible_sleep(random.uniform(0.3, 1.0)):
-            return True
+        # Bei einzeln adressierten Augen manchmal zwinkern
+        if two_eyes() and random.randint(1, 100) <= 20:
+            yield from wink_frames()
+        else:
+            yield from blink_frames()
+        yield random.randint(300, 1000)
 
         # Manchmal doppelt blinzeln
         if random.randint(1, 100) <= 30:  # 30% Chance
-            if interruptible_sleep(random.uniform(0.2, 0.5)):
-                return True
-            blink()
+            yield random.randint(200, 500)
+            yield from blink_frames()
 
     elif action <= 85:
         # 25% Chance: Blinzeln, dann in eine Richtung schauen
-        blink()
-        if interruptible_sleep(random.uniform(0.3, 0.6)):
-            return True
+        yield from blink_frames()
+        yield random.randint(300, 600)
 
         if random.randint(1, 2) == 1:
-            if look_left():
-                return True
+            yield from look_left_frames()
         else:
-            if look_right():
-                return True
+            yield from look_right_frames()
 
     elif action <= 95:
         # 10% Chance: Nur in eine Richtung schauen (ohne Blinzeln)
         if random.randint(1, 2) == 1:
-            if look_left():
-                return True
+            yield from look_left_frames()
         else:
-            if look_right():
-                return True
+            yield from look_right_frames()
 
     else:
         # 5% Chance: Links und rechts schauen (ohne Blinzeln dazwischen)
-        if random.randint(1, 2) == 1:
-            if look_left():
-                return True
-            if interruptible_sleep(random.uniform(0.2, 0.4)):
-                return True
-            if look_right():
-                return True
+        if two_eyes() and random.randint(1, 3) == 1:
+            yield from cross_eyed_frames()
+        elif random.randint(1, 2) == 1:
+            yield from look_left_frames()
+            yield random.randint(200, 400)
+            yield from look_right_frames()
         else:
-            if look_right():
-                return True
-            if interruptible_sleep(random.uniform(0.2, 0.4)):
-                return True
-            if look_left():
-                return True
+            yield from look_right_frames()
+            yield random.randint(200, 400)
+            yield from look_left_frames()
 
-    return False
+def look_straight():
+    """Auge schaut geradeaus (obere Hälfte an)"""
+    play_frames(look_straight_frames())
+
+def blink():
+    """Blinzel-Animation (blockierend)
+
+    Returns:
+        True wenn durch Button unterbrochen, False sonst
+    """
+    return play_frames(blink_frames())
+
+def look_left():
+    """Auge schaut nach links (blockierend)
+
+    Returns:
+        True wenn durch Button unterbrochen, False sonst
+    """
+    return play_frames(look_left_frames())
+
+def look_right():
+    """Auge schaut nach rechts (blockierend)
+
+    Returns:
+        True wenn durch Button unterbrochen, False sonst
+    """
+    return play_frames(look_right_frames())
+
+def do_animation():
+    """Führt eine zufällige Augen-Animation aus und kehrt danach zurück
+
+    Diese Funktion wird von main.py in einer Schleife aufgerufen.
+    Sie wählt zufällig eine Animation basierend auf Wahrscheinlichkeiten
+    und führt diese komplett aus, bevor sie zurückkehrt.
+
+    Returns:
+        True wenn durch Button unterbrochen, False sonst
+    """
+    return play_frames(animation_frames())
 
 # Hauptprogramm (nur wenn direkt ausgeführt)
 if __name__ == "__main__":
     # Hardware initialisieren wenn direkt ausgeführt
-    neopixel_pin = Pin(1, Pin.OUT)
-    np = NeoPixel(neopixel_pin, NUM_LEDS)
+    np = hardware.init().np
 
     print("\n" + "="*40)
     print("  NEOPIXEL AUGEN-ANIMATION")
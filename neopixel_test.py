@@ -2,6 +2,9 @@ from machine import Pin
 from neopixel import NeoPixel
 from time import sleep
 
+import render
+import color_wheel
+
 # NeoPixel Ring konfigurieren
 # GP1 als Datenleitung, Anzahl der LEDs im Ring anpassen (meist 8, 12, 16, 24 oder 60)
 NUM_LEDS = 12  # Ändere dies auf die Anzahl LEDs in deinem Ring
@@ -39,22 +42,18 @@ sleep(2)
 
 # Test 4: Lauflicht
 print("Test 4: Lauflicht (Strg+C zum Beenden)")
+
+# Regenbogenfarbe jeder LED einmal vorab berechnen
+rainbow = render.PixelBuffer(NUM_LEDS, np.bpp, np.ORDER)
+color_wheel.gradient(rainbow, 0)
+
 try:
     while True:
         for i in range(NUM_LEDS):
             clear()
             # Aktuelles LED in Regenbogenfarbe
-            hue = int((i / NUM_LEDS) * 255)
-            if hue < 85:
-                r, g, b = 255 - hue * 3, hue * 3, 0
-            elif hue < 170:
-                hue -= 85
-                r, g, b = 0, 255 - hue * 3, hue * 3
-            else:
-                hue -= 170
-                r, g, b = hue * 3, 0, 255 - hue * 3
-
-            np[i] = (r, g, b)
+            offset = i * np.bpp
+            np.buf[offset:offset + np.bpp] = rainbow.buf[offset:offset + np.bpp]
             np.write()
             sleep(0.1)
 except KeyboardInterrupt:
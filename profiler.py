@@ -0,0 +1,142 @@
+from time import ticks_us, ticks_diff, sleep_ms as _sleep_ms
+from array import array
+
+import log
+
+# Laufzeit-Messung der Echtzeit-Schleifen
+#
+# Histogramme mit festen Zeit-Bereichen (Zweierpotenzen in µs) in
+# vorbelegten Arrays, die Messung selbst belegt also keinen Speicher:
+#   RENDER   Puffer-Aufbau: vom Ende der letzten Wartezeit/Ausgabe bis write()
+#   WRITE    Dauer von np.write()
+#   SLEEP    wie viel länger sleep_ms() geschlafen hat als verlangt
+#   ONSET    Abweichung jedes Tonbeginns vom Sollzeitpunkt (DriftLog)
+#   INPUT    Wartezeit eines Button-Drucks bis zur Auswertung
+#
+# Alles ist nur aktiv, wenn ENABLED True ist (main.py: PROFILE). report()
+# legt eine kurze Zusammenfassung im Log ab (ausgegeben im Leerlauf), im
+# REPL sofort mit:
+#     >>> import profiler, log; profiler.report(); log.flush()
+
+ENABLED = False
+
+# Bereich i enthält Werte < 2**i µs (Bereich 0 nur 0), der letzte alles darüber
+NUM_BUCKETS = 21
+
+class Histogram:
+    """Verteilung von Zeiten in µs"""
+
+    def __init__(self, name):
+        self.name = name
+        self.counts = array('I', [0] * NUM_BUCKETS)
+        self.count = 0
+        self.max = 0
+
+    def reset(self):
+        counts = self.counts
+        for i in range(NUM_BUCKETS):
+            counts[i] = 0
+        self.count = 0
+        self.max = 0
+
+    def add(self, value):
+        """Zählt einen Wert in µs (negative Werte zählen als 0)"""
+        if value < 0:
+            value = 0
+        if value > self.max:
+            self.max = value
+        self.count += 1
+
+        i = 0
+        last = NUM_BUCKETS - 1
+        while value and i < last:
+            value >>= 1
+            i += 1
+        self.counts[i] += 1
+
+    def percentile(self, p):
+        """Obergrenze (µs) des Bereichs, in dem p Prozent der Werte liegen"""
+        if not self.count:
+            return 0
+        needed = (self.count * p + 99) // 100
+        seen = 0
+        for i in range(NUM_BUCKETS):
+            seen += self.counts[i]
+            if seen >= needed:
+                if i == NUM_BUCKETS - 1:
+                    return self.max
+                return min((1 << i) - 1, self.max)
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return "{:<7} -".format(self.name)
+        return "{:<7} n={:<6} p50<={:<6} p90<={:<6} p99<={:<6} max={} µs".format(
+            self.name, self.count, self.percentile(50), self.percentile(90),
+            self.percentile(99), self.max)
+
+RENDER = Histogram("render")
+WRITE = Histogram("write")
+SLEEP = Histogram("sleep")
+ONSET = Histogram("onset")
+INPUT = Histogram("input")
+
+HISTOGRAMS = (RENDER, WRITE, SLEEP, ONSET, INPUT)
+
+# Zeitpunkt, ab dem der nächste Frame aufgebaut wird
+_frame_start = ticks_us()
+
+def mark():
+    """Merkt den Beginn des Puffer-Aufbaus (nach Wartezeit oder Ausgabe)"""
+    global _frame_start
+    _frame_start = ticks_us()
+
+def write_begin():
+    """Vor np.write(): zählt die Render-Zeit, liefert den Startzeitpunkt"""
+    now = ticks_us()
+    RENDER.add(ticks_diff(now, _frame_start))
+    return now
+
+def write_end(start):
+    """Nach np.write(): zählt die Dauer der Ausgabe"""
+    global _frame_start
+    _frame_start = ticks_us()
+    WRITE.add(ticks_diff(_frame_start, start))
+
+def sleep_ms(ms):
+    """time.sleep_ms mit Messung, um wie viel die Wartezeit überschritten wird"""
+    if not ENABLED:
+        _sleep_ms(ms)
+        return
+    global _frame_start
+    start = ticks_us()
+    _sleep_ms(ms)
+    _frame_start = ticks_us()
+    SLEEP.add(ticks_diff(_frame_start, start) - ms * 1000)
+
+def reset():
+    """Löscht alle Histogramme"""
+    for histogram in HISTOGRAMS:
+        histogram.reset()
+    mark()
+
+def overhead_us(runs=1000):
+    """Mittlere Kosten einer Messung (ticks_us + add) in µs"""
+    histogram = Histogram("test")
+    start = ticks_us()
+    for i in range(runs):
+        histogram.add(ticks_diff(ticks_us(), start))
+    return ticks_diff(ticks_us(), start) / runs
+
+def report(frame_ms=20, per_frame=3):
+    """Gibt alle Histogramme und den geschätzten Mess-Aufwand aus (über log)
+
+    Args:
+        frame_ms: Frame-Dauer für die Aufwand-Schätzung
+        per_frame: Messungen pro Frame (render, write, sleep)
+    """
+    for histogram in HISTOGRAMS:
+        log.info(histogram.summary())
+    cost = overhead_us()
+    log.info("Aufwand: {:.1f} µs pro Messung, {:.2f}% bei {} Messungen pro {} ms",
+             cost, cost * per_frame * 100 / (frame_ms * 1000), per_frame, frame_ms)
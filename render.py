@@ -0,0 +1,255 @@
+# Render-Hilfen für NeoPixel-Framebuffer
+#
+# Schreibt Farben direkt in den Byte-Puffer (np.buf) statt über
+# np[i] = (r, g, b). Dadurch entsteht pro Frame kein neues Tupel und
+# MicroPython muss seltener den Garbage Collector starten.
+#
+# Funktioniert mit jedem Objekt, das wie neopixel.NeoPixel die Attribute
+# buf, bpp und ORDER besitzt.
+
+import kernels
+import log
+import profiler
+
+def _fill_plan(np, buf, bpp):
+    """Liefert den (zwischengespeicherten) Kopierplan für fill-Operationen
+
+    Der erste Pixel wird per Slice-Zuweisung verdoppelt (1 -> 2 -> 4 ...).
+    Die Quell-Memoryviews werden einmalig angelegt, damit das eigentliche
+    Füllen keinen Speicher mehr anfordert. Der Plan hängt am Objekt np und
+    wird mit ihm freigegeben.
+    """
+    entry = getattr(np, "_fill_plan", None)
+    if entry is not None and entry[0] is buf:
+        return entry[1]
+
+    mv = memoryview(buf)
+    length = len(buf)
+    plan = []
+    size = bpp
+    while size < length:
+        chunk = min(size, length - size)
+        plan.append((size, size + chunk, mv[0:chunk]))
+        size += chunk
+
+    try:
+        np._fill_plan = (buf, plan)
+    except AttributeError:
+        pass    # Objekt ohne Attribute: Plan wird jedes Mal neu angelegt
+    return plan
+
+def color(np, r, g, b):
+    """Legt eine Farbe als vorberechnete Bytes in Reihenfolge des Strips an
+
+    Args:
+        np: NeoPixel-Objekt (bestimmt Byte-Reihenfolge und bpp)
+        r, g, b: Farbwerte 0-255
+
+    Returns:
+        bytearray mit bpp Bytes, z.B. für fill_color() und set_color()
+    """
+    c = bytearray(np.bpp)
+    order = np.ORDER
+    c[order[0]] = r
+    c[order[1]] = g
+    c[order[2]] = b
+    return c
+
+def fill_color(np, c):
+    """Setzt alle LEDs auf eine mit color() vorberechnete Farbe"""
+    buf = np.buf
+    bpp = np.bpp
+    buf[0:bpp] = c
+    for start, end, src in _fill_plan(np, buf, bpp):
+        buf[start:end] = src
+
+def fill(np, r, g, b):
+    """Setzt alle LEDs auf eine Farbe (ohne Tupel pro Pixel)"""
+    buf = np.buf
+    bpp = np.bpp
+    order = np.ORDER
+    buf[order[0]] = r
+    buf[order[1]] = g
+    buf[order[2]] = b
+    if bpp == 4:
+        buf[order[3]] = 0
+    for start, end, src in _fill_plan(np, buf, bpp):
+        buf[start:end] = src
+
+def clear(np):
+    """Setzt alle LEDs im Puffer auf schwarz (ohne write())"""
+    fill(np, 0, 0, 0)
+
+def set_pixel(np, i, r, g, b):
+    """Setzt eine einzelne LED direkt im Puffer"""
+    buf = np.buf
+    order = np.ORDER
+    offset = i * np.bpp
+    buf[offset + order[0]] = r
+    buf[offset + order[1]] = g
+    buf[offset + order[2]] = b
+
+def set_color(np, i, c):
+    """Setzt eine einzelne LED auf eine mit color() vorberechnete Farbe"""
+    bpp = np.bpp
+    offset = i * bpp
+    np.buf[offset:offset + bpp] = c
+
+def blend(dst, a, b, mix):
+    """Mischt zwei Puffer gleicher Länge: dst = a * (1 - mix) + b * mix
+
+    Args:
+        dst: Ziel-Puffer (z.B. np.buf)
+        a, b: Quell-Puffer
+        mix: Anteil von b, 0-255 (0 = nur a, 255 = nur b)
+    """
+    if mix <= 0:
+        dst[:] = a
+    elif mix >= 255:
+        dst[:] = b
+    else:
+        kernels.blend(dst, a, b, len(dst), mix)
+
+def scale(dst, src, level):
+    """Kopiert src mit Helligkeit 0-255 nach dst (gleiche Länge)"""
+    kernels.scale(dst, src, len(dst), level)
+
+def add(dst, src, level):
+    """Addiert einen Puffer mit Helligkeit 0-255 auf dst (begrenzt auf 255)"""
+    kernels.add(dst, src, len(dst), level)
+
+class PixelBuffer:
+    """NeoPixel-kompatibler Puffer ohne Hardware (z.B. zum Vorberechnen)
+
+    Bietet buf, bpp, ORDER und n wie neopixel.NeoPixel, write() tut nichts.
+    Mit order=np.ORDER passt die Byte-Reihenfolge zu einem echten Strip.
+    """
+
+    ORDER = (1, 0, 2, 3)
+
+    def __init__(self, n, bpp=3, order=None):
+        self.n = n
+        self.bpp = bpp
+        self.buf = bytearray(n * bpp)
+        if order is not None:
+            self.ORDER = order
+
+    def __len__(self):
+        return self.n
+
+    def __setitem__(self, i, v):
+        set_pixel(self, i, v[0], v[1], v[2])
+
+    def __getitem__(self, i):
+        offset = i * self.bpp
+        order = self.ORDER
+        buf = self.buf
+        return (buf[offset + order[0]], buf[offset + order[1]], buf[offset + order[2]])
+
+    def write(self):
+        pass
+
+class FrameBuffer:
+    """Hülle um ein NeoPixel, die unveränderte Frames nicht erneut sendet
+
+    Jedes np.write() blockiert ca. 30 µs pro LED. write() vergleicht den
+    Puffer mit dem zuletzt gesendeten Frame und überspringt die Ausgabe,
+    wenn sich nichts geändert hat. Die Zähler (writes, skipped) zeigen die
+    Ersparnis, report() gibt sie aus und setzt sie zurück (z.B. einmal pro
+    Animation). changed_pixels wird nur mit count_changes=True gezählt,
+    weil der Vergleich pro Pixel jeden gesendeten Frame verlangsamt.
+
+    Bietet buf, bpp, ORDER und n wie neopixel.NeoPixel, die Render-Hilfen
+    schreiben also weiter direkt in den Puffer des NeoPixel. buf verweist
+    immer auf np.buf, auch wenn der Compositor den Puffer austauscht.
+    """
+
+    def __init__(self, np, count_changes=False):
+        self.np = np
+        self.count_changes = count_changes
+        self.bpp = np.bpp
+        self.ORDER = np.ORDER
+        self.n = len(np.buf) // np.bpp
+
+        # Zuletzt gesendeter Frame (ungültig bis zum ersten write())
+        self.shown = bytearray(len(np.buf))
+        self.valid = False
+
+        self.writes = 0
+        self.skipped = 0
+        self.changed_pixels = 0
+
+    @property
+    def buf(self):
+        return self.np.buf
+
+    @buf.setter
+    def buf(self, value):
+        self.np.buf = value
+
+    def __len__(self):
+        return self.n
+
+    def __setitem__(self, i, v):
+        set_pixel(self, i, v[0], v[1], v[2])
+
+    def __getitem__(self, i):
+        offset = i * self.bpp
+        order = self.ORDER
+        buf = self.buf
+        return (buf[offset + order[0]], buf[offset + order[1]], buf[offset + order[2]])
+
+    def changed(self):
+        """Anzahl der Pixel, die sich seit dem letzten gesendeten Frame geändert haben"""
+        if not self.valid:
+            return self.n
+        buf = self.buf
+        shown = self.shown
+        bpp = self.bpp
+        count = 0
+        for offset in range(0, len(buf), bpp):
+            for k in range(offset, offset + bpp):
+                if buf[k] != shown[k]:
+                    count += 1
+                    break
+        return count
+
+    def write(self):
+        """Sendet den Puffer nur, wenn er sich geändert hat
+
+        Returns:
+            True wenn gesendet wurde, False wenn übersprungen
+        """
+        if self.valid and self.buf == self.shown:
+            self.skipped += 1
+            return False
+
+        if self.count_changes:
+            self.changed_pixels += self.changed()
+        if profiler.ENABLED:
+            start = profiler.write_begin()
+            self.np.write()
+            profiler.write_end(start)
+        else:
+            self.np.write()
+        self.shown[:] = self.buf
+        self.valid = True
+        self.writes += 1
+        return True
+
+    def invalidate(self):
+        """Erzwingt die nächste Ausgabe (z.B. wenn die LEDs extern verändert wurden)"""
+        self.valid = False
+
+    def report(self, label):
+        """Gibt die Zähler aus und setzt sie zurück"""
+        total = self.writes + self.skipped
+        if self.count_changes:
+            log.info("{}: {} von {} Frames gesendet, {} übersprungen, {} Pixel geändert",
+                     label, self.writes, total, self.skipped, self.changed_pixels)
+        else:
+            log.info("{}: {} von {} Frames gesendet, {} übersprungen",
+                     label, self.writes, total, self.skipped)
+        self.writes = 0
+        self.skipped = 0
+        self.changed_pixels = 0
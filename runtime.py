@@ -0,0 +1,283 @@
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio  # type: ignore
+from time import ticks_ms, ticks_add, ticks_diff
+
+import log
+import memory
+import neopixel_eyes
+import christmas_light_show
+import button_events
+import render
+from compositor import ADD
+
+# Kooperative Laufzeitumgebung mit asyncio
+#
+# Augen, Melodie, LED-Ausgabe und Button laufen als eigene Tasks. Nur der
+# Render-Task ruft np.write() auf (ein gemeinsamer Render-Tick), die anderen
+# Tasks verändern nur den Puffer bzw. den Zustand der Lichtshow. Ein
+# Button-Druck bricht ein laufendes Lied spätestens nach einem Tick ab.
+#
+# Augen, Lichtshow und Einblendungen zeichnen in eigene Ebenen des
+# Compositors aus main.py. Der Render-Task mischt sie, Moduswechsel werden
+# überblendet. Die Töne spielt wie in der blockierenden Schleife der
+# ToneSequencer von christmas_light_show (Timer, Show-Cache, Aufräumen
+# zwischen den Noten), der Musik-Task übernimmt nur dessen Position.
+
+TICK_MS = christmas_light_show.FRAME_MS  # Render-Tick (50 Frames pro Sekunde)
+BUTTON_POLL_MS = 10                      # Abfrage der Button-Warteschlange
+MUSIC_POLL_MS = 10                       # Abfrage des ToneSequencer
+EYE_PAUSE_MS = 500                       # Pause zwischen Augen-Animationen
+SONG_END_FADE_MS = 1000                  # Ausblenden nach dem Lied
+CROSSFADE_MS = 400                       # Überblenden zwischen Augen und Musik
+CROSSFADE_STEPS = CROSSFADE_MS // TICK_MS
+NOTIFY_COLOR = (12, 12, 12)              # kurzes Aufleuchten bei Button-Druck
+NOTIFY_DECAY = 64                        # Abklingen pro Tick in 1/256
+
+MODE_EYES = 0
+MODE_MUSIC = 1
+
+try:
+    sleep_ms = asyncio.sleep_ms
+except AttributeError:
+    # CPython-asyncio kennt kein sleep_ms
+    def sleep_ms(ms):
+        return asyncio.sleep(ms / 1000)
+
+class SwitchLatency:
+    """Misst die Zeit vom Button-Event bis zum ersten Frame im neuen Modus"""
+
+    def __init__(self):
+        self.count = 0
+        self.last_ms = 0
+        self.max_ms = 0
+        self.sum_ms = 0
+
+    def record(self, latency_ms):
+        self.count += 1
+        self.last_ms = latency_ms
+        self.sum_ms += latency_ms
+        if latency_ms > self.max_ms:
+            self.max_ms = latency_ms
+
+    def report(self):
+        mean = self.sum_ms / self.count if self.count else 0
+        log.info("Moduswechsel: {} ms (max {} ms, Mittel {:.1f} ms, {} Wechsel)",
+                 self.last_ms, self.max_ms, mean, self.count)
+
+class Runtime:
+    """Gemeinsamer Zustand und Tasks für Augen, Musik, Licht und Button"""
+
+    def __init__(self, compositor, eye_layer, music_layer, buzzer, buttons):
+        self.np = compositor.np
+        self.buzzer = buzzer
+        self.buttons = buttons
+
+        self.mode = MODE_EYES
+        self.eye_task = None
+        self.music_task = None
+
+        # Vom Augen-Task gesetzt, wenn der Puffer geschrieben werden soll
+        self.eyes_dirty = False
+
+        # Zustand der Lichtshow für den Render-Task
+        self.light_target = 0
+        self.light_fading = True
+        self.lights = christmas_light_show.SequencerLights(christmas_light_show.sequencer)
+        # Vorberechnete Show des laufenden Lieds (show_cache.ShowFile) oder None
+        self.show_frames = None
+
+        # Ebenen: Augen, Lichtshow, darüber Einblendungen (aufhellend)
+        self.compositor = compositor
+        self.eye_layer = eye_layer
+        self.music_layer = music_layer
+        self.overlay = compositor.add_layer(ADD)
+
+        # ticks_ms des auslösenden Button-Events, bis der neue Modus sichtbar ist
+        self.switch_time = None
+        self.latency = SwitchLatency()
+
+    def start_eyes(self):
+        """Wechselt in den Augen-Modus (bricht ein laufendes Lied ab)"""
+        self.mode = MODE_EYES
+        self.eyes_dirty = False
+        self.light_target = 0
+        self.light_fading = True
+        self.compositor.crossfade(self.eye_layer, CROSSFADE_STEPS)
+
+        task = self.music_task
+        self.music_task = None
+        if task is not None:
+            task.cancel()
+
+        self.eye_task = asyncio.create_task(self.eye_loop())
+
+    def start_music(self):
+        """Wechselt in den Musik-Modus (beendet die Augen-Animation)"""
+        if self.eye_task is not None:
+            self.eye_task.cancel()
+            self.eye_task = None
+
+        self.light_target = 0
+        self.light_fading = True
+        self.compositor.crossfade(self.music_layer, CROSSFADE_STEPS)
+        self.mode = MODE_MUSIC
+        self.music_task = asyncio.create_task(self.music_loop())
+
+    def notify(self):
+        """Kurzes Aufleuchten über allen Ebenen (Rückmeldung für den Button)"""
+        render.fill(self.overlay, NOTIFY_COLOR[0], NOTIFY_COLOR[1], NOTIFY_COLOR[2])
+        self.overlay.opacity.attack_decay(255, 1, 0, NOTIFY_DECAY)
+
+    async def eye_loop(self):
+        """Task: Augen-Animationen in Endlosschleife"""
+        while True:
+            for wait_ms in neopixel_eyes.animation_frames():
+                self.eyes_dirty = True
+                await sleep_ms(wait_ms)
+
+            self.eyes_dirty = True
+
+            # Pause: fehlende Shows stückweise vorberechnen, dann warten
+            start = ticks_ms()
+            if christmas_light_show.USE_SHOW_CACHE:
+                import show_cache
+                show_cache.precompile(self.music_layer.n, christmas_light_show.PRECOMPILE_MS)
+            await sleep_ms(max(0, EYE_PAUSE_MS - ticks_diff(ticks_ms(), start)))
+
+    async def music_loop(self):
+        """Task: Lied über den ToneSequencer, Ziel-Helligkeit für den Render-Task"""
+        show = christmas_light_show
+        sequencer = show.sequencer
+        lights = self.lights
+
+        song = show.next_song()
+        log.info("Spiele: {}", song.name)
+        memory.collect()
+
+        notes = song.events()
+        if show.USE_SHOW_CACHE:
+            import show_cache
+            show_path = show_cache.cached_show(show.last_played_song, self.music_layer.n)
+            if show_path is not None:
+                self.show_frames = show_cache.ShowFile(show_path, self.music_layer)
+                notes = self.show_frames.notes()
+
+        try:
+            lights.reset()
+            sequencer.start(notes)
+            while sequencer.running:
+                self.light_fading = not lights.poll()
+                self.light_target = lights.target
+                show.current_hue = lights.hue
+                await sleep_ms(MUSIC_POLL_MS)
+            show.drift_log.report()
+
+            # Sanftes Ausblenden am Ende
+            self._close_show()
+            self.light_target = 0
+            self.light_fading = False
+            await sleep_ms(SONG_END_FADE_MS)
+        finally:
+            sequencer.stop()
+            self._close_show()
+
+        # Lied zu Ende: zurück zu den Augen
+        self.music_task = None
+        self.start_eyes()
+
+    def _close_show(self):
+        if self.show_frames is not None:
+            self.show_frames.close()
+            self.show_frames = None
+
+    async def button_loop(self):
+        """Task: Button-Events auswerten und Modus wechseln"""
+        buttons = self.buttons
+        while True:
+            event = buttons.get()
+            while event != button_events.NONE:
+                if event == button_events.PRESS:
+                    self.switch_time = buttons.last_time
+                    self.notify()
+                    if self.mode == MODE_EYES:
+                        log.info(">>> Button gedrückt! Wechsel zu Musik-Modus <<<")
+                        self.start_music()
+                    else:
+                        log.info(">>> Button gedrückt! Zurück zum Augen-Modus <<<")
+                        self.start_eyes()
+                event = buttons.get()
+
+            # Leerlauf im Augen-Modus: ausstehende Meldungen stückweise ausgeben
+            if self.mode == MODE_EYES:
+                log.idle_flush()
+            await sleep_ms(BUTTON_POLL_MS)
+
+    async def render_loop(self):
+        """Task: einziger Render-Tick, schreibt den Puffer mit np.write()"""
+        show = christmas_light_show
+        next_tick = ticks_ms()
+
+        while True:
+            # Lichtshow weiterrechnen, solange sie sichtbar ist (auch beim Ausblenden)
+            music_visible = self.mode == MODE_MUSIC or self.music_layer.opacity.level() > 0
+            if music_visible:
+                frames = self.show_frames
+                if frames is not None:
+                    # Vorberechneter Frame zur Position des Sequencers
+                    frame = show.sequencer.elapsed_ms() // frames.frame_ms
+                    frames.read(min(frame, frames.frame_count - 1), self.music_layer.buf)
+                elif self.light_fading:
+                    show.fade_step(show.FADE_RATE_20MS)
+                else:
+                    show.follow_step(self.light_target)
+
+            written = False
+            if music_visible or self.compositor.fading() or self.eyes_dirty:
+                self.eyes_dirty = False
+                self.compositor.render()
+                written = True
+
+            if written and self.switch_time is not None:
+                self.latency.record(ticks_diff(ticks_ms(), self.switch_time))
+                self.switch_time = None
+                self.latency.report()
+
+            # Nächster Tick mit absoluter Deadline, verpasste Ticks überspringen
+            next_tick = ticks_add(next_tick, TICK_MS)
+            delay = ticks_diff(next_tick, ticks_ms())
+            if delay < 0:
+                next_tick = ticks_ms()
+                delay = 0
+            await sleep_ms(delay)
+
+    async def main(self):
+        """Startet alle Tasks, läuft bis zum Abbruch"""
+        # Augen und Lichtshow zeichnen in ihre Ebenen statt direkt ins NeoPixel
+        neopixel_eyes.np = self.eye_layer
+        christmas_light_show.np = self.music_layer
+
+        self.start_eyes()
+        asyncio.create_task(self.button_loop())
+        await self.render_loop()
+
+def run(compositor, eye_layer, music_layer, buzzer, buttons):
+    """Startet die Laufzeitumgebung (blockiert bis Strg+C)
+
+    Args:
+        compositor: Compositor aus main.py (bekommt eine Ebene für Einblendungen)
+        eye_layer, music_layer: Ebenen für Augen und Lichtshow
+        buzzer: gemeinsames PWM-Objekt (aus main.py)
+        buttons: ButtonEvents für GP21
+    """
+    eyes_np = neopixel_eyes.np
+    show_np = christmas_light_show.np
+    runtime = Runtime(compositor, eye_layer, music_layer, buzzer, buttons)
+    try:
+        asyncio.run(runtime.main())
+    finally:
+        neopixel_eyes.np = eyes_np
+        christmas_light_show.np = show_np
+        asyncio.new_event_loop()
+    return runtime
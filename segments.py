@@ -0,0 +1,95 @@
+import render
+
+# Zwei Augen in einem verketteten Strip
+#
+# Standardmäßig sind beide 12er-Ringe parallel an GP1 angeschlossen und
+# zeigen dasselbe. Werden sie stattdessen hintereinander geschaltet (ein
+# Strip mit 24 LEDs), beschreibt EYE_LAYOUT, wo jedes Auge im Strip liegt
+# und wie es eingebaut ist. Jedes Auge bekommt dann einen eigenen logischen
+# Ring (Segment) mit LED 0 unten, der direkt in den gemeinsamen Puffer
+# schreibt. Beide Augen werden mit einem einzigen np.write() gesendet.
+#
+# EYE_LAYOUT wird wie np von main.py gesetzt:
+#   None       Ringe parallel (ein logischer Ring für beide Augen)
+#   CHAINED_24 linkes Auge LEDs 0-11, rechtes Auge LEDs 12-23
+# Pro Auge: (erste LED, Anzahl, Drehung in LEDs, gespiegelt)
+
+CHAINED_24 = ((0, 12, 0, False), (12, 12, 0, False))
+
+EYE_LAYOUT = None
+
+class Segment:
+    """Logischer Ring in einem Teil des gemeinsamen Puffers
+
+    Bietet buf, bpp, ORDER und n wie neopixel.NeoPixel. buf ist ein
+    memoryview auf den Puffer des Strips, die Render-Hilfen schreiben also
+    ohne Kopie in den Strip. map übersetzt logische in physische Indizes
+    (Drehung und Spiegelung beim Einbau), first und step beschreiben
+    dieselbe Abbildung rückwärts für Kernel, die den Puffer physisch
+    durchlaufen (logischer Index der LED 0, Laufrichtung).
+    """
+
+    def __init__(self, np, start, n, rotation=0, mirrored=False):
+        bpp = np.bpp
+        self.np = np
+        self.start = start
+        self.n = n
+        self.bpp = bpp
+        self.ORDER = np.ORDER
+        self.buf = memoryview(np.buf)[start * bpp:(start + n) * bpp]
+
+        mapping = bytearray(n)
+        for i in range(n):
+            j = (i + rotation) % n
+            if mirrored:
+                j = (n - j) % n
+            mapping[i] = j
+        self.map = bytes(mapping)
+        self.first = (n - rotation % n) % n
+        self.step = -1 if mirrored else 1
+
+    def __len__(self):
+        return self.n
+
+    def __setitem__(self, i, v):
+        render.set_pixel(self, self.map[i], v[0], v[1], v[2])
+
+    def __getitem__(self, i):
+        offset = self.map[i] * self.bpp
+        order = self.ORDER
+        buf = self.buf
+        return (buf[offset + order[0]], buf[offset + order[1]], buf[offset + order[2]])
+
+    def write(self):
+        """Sendet den ganzen Strip (beide Augen)"""
+        self.np.write()
+
+def eye_views(np, layout=None):
+    """Liefert die Segmente der Augen für np (zwischengespeichert)
+
+    Die Segmente hängen als (buf, layout, Segmente) am Objekt np und werden
+    mit ihm freigegeben (wie render._fill_plan).
+
+    Args:
+        np: NeoPixel-kompatibles Objekt mit dem ganzen Strip
+        layout: Aufteilung (Standard: EYE_LAYOUT)
+
+    Returns:
+        Liste der Segmente, oder None bei parallel geschalteten Ringen
+    """
+    if layout is None:
+        layout = EYE_LAYOUT
+        if layout is None:
+            return None
+
+    buf = np.buf
+    entry = getattr(np, "_eye_views", None)
+    if entry is not None and entry[0] is buf and entry[1] is layout:
+        return entry[2]
+
+    views = [Segment(np, start, n, rotation, mirrored) for start, n, rotation, mirrored in layout]
+    try:
+        np._eye_views = (buf, layout, views)
+    except AttributeError:
+        pass    # Objekt ohne Attribute: Segmente werden jedes Mal neu angelegt
+    return views
@@ -0,0 +1,398 @@
+import os
+import hashlib
+from binascii import hexlify
+from time import ticks_ms, ticks_diff
+
+import log
+import memory
+import brightness
+import song_format
+import song_stream
+import segments
+from song_format import FREQ, DURATION
+from render import PixelBuffer
+from envelope import Envelope
+
+# Vorberechnete Licht-Shows im Flash
+#
+# compile_show() rendert die komplette Zeitleiste eines Lieds einmal vorab:
+# für jeden Frame die LED-Bytes und dazu die Töne. Das Ergebnis landet in
+# cache/<lied>-<hash>.show. Der Hash deckt die Lieddatei und alle
+# Render-Parameter ab (inklusive Gamma- und Frequenz-Tabelle), ändert sich
+# etwas davon, wird neu berechnet und die alte Datei gelöscht. Beim
+# Abspielen werden die Frames nur noch direkt in den Puffer des NeoPixel
+# gelesen und geschrieben.
+#
+# Berechnet wird nie beim Button-Druck: fehlt die Datei noch, spielt das
+# Lied live (cached_show() liefert None), und precompile() rechnet die
+# fehlenden Shows stückweise in Leerlaufzeiten zwischen den Augen-Animationen.
+#
+# Dateiaufbau (little endian):
+#   0   3 Bytes  Kennung b'PNC'
+#   3   1 Byte   Version
+#   4   2 Bytes  Anzahl LEDs
+#   6   1 Byte   Bytes pro LED
+#   7   1 Byte   Frame-Abstand in ms
+#   8   4 Bytes  Anzahl Frames
+#   12  4 Bytes  Anzahl Noten
+#   16  je Note 4 Bytes: Frequenz (2), Dauer in ms (2)
+#   danach alle Frames (je Anzahl LEDs * Bytes pro LED)
+
+CACHE_DIR = "cache"
+MAGIC = b'PNC'
+VERSION = 3
+HEADER_SIZE = 16
+NOTE_SIZE = 4
+FRAME_MS = 20
+
+def _u16(value):
+    return bytes((value & 0xFF, value >> 8))
+
+def _u32(value):
+    return bytes((value & 0xFF, (value >> 8) & 0xFF, (value >> 16) & 0xFF, value >> 24))
+
+def _read_u32(data, offset):
+    return data[offset] | (data[offset + 1] << 8) | (data[offset + 2] << 16) | (data[offset + 3] << 24)
+
+def cache_key(path, num_leds):
+    """Hash über Lieddatei und Render-Parameter (8 Hex-Zeichen)"""
+    import christmas_light_show as show
+
+    h = hashlib.sha256()
+    buf = bytearray(song_stream.CHUNK_SIZE)
+    with open(path, 'rb') as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            h.update(buf[:n])
+
+    params = "{} {} {} {} {} {} {} {} {} {} {} {} {} {}".format(
+        VERSION, num_leds, FRAME_MS, show.FADE_RATE_20MS, show.FOLLOW_SPEED,
+        show.NOTE_GAP_MS, show.MIN_FREQ, show.MAX_FREQ,
+        segments.EYE_LAYOUT, show.EYE_COLORS, show.NOTE_COLORS, show.NOTE_SPREAD,
+        brightness.GAMMA_EXPONENT, brightness.MIN_FREQ_LEVEL)
+    h.update(params.encode())
+    h.update(brightness.GAMMA)
+    h.update(brightness.FREQ_CURVE)
+    return str(hexlify(h.digest()[:4]), 'ascii')
+
+def cache_path(path, num_leds):
+    """Pfad der Cache-Datei für ein Lied"""
+    return "{}/{}-{}.show".format(CACHE_DIR, song_stream.file_title(path), cache_key(path, num_leds))
+
+def _remove_stale(path, keep):
+    """Löscht veraltete Cache-Dateien desselben Lieds"""
+    prefix = song_stream.file_title(path) + "-"
+    for name in os.listdir(CACHE_DIR):
+        full = CACHE_DIR + "/" + name
+        if name.startswith(prefix) and name.endswith(".show") and full != keep:
+            os.remove(full)
+
+class ShowCompiler:
+    """Rendert die Licht-Show eines Lieds stückweise in eine Cache-Datei
+
+    Nutzt dieselben Schritte wie die Live-Show (follow_step/fade_step),
+    nur in einen Puffer ohne Hardware. step() rechnet eine begrenzte Zahl
+    Frames und gibt die Module danach unverändert zurück, dazwischen kann
+    also live gespielt werden.
+
+    Args:
+        path: Pfad der Lieddatei
+        num_leds: Anzahl LEDs
+        target: Pfad der Cache-Datei (Standard: cache_path())
+    """
+
+    def __init__(self, path, num_leds, target=None):
+        if target is None:
+            target = cache_path(path, num_leds)
+        self.path = path
+        self.num_leds = num_leds
+        self.target = target
+        self.done = False
+
+        try:
+            os.mkdir(CACHE_DIR)
+        except OSError:
+            pass
+
+        self.pixels = PixelBuffer(num_leds)
+        self.light = Envelope()
+        self.hue = 0
+
+        song = song_stream.open_song(path)
+        self._temp = target + ".tmp"
+        self.f = open(self._temp, 'wb')
+
+        # Kopf mit Platzhaltern, Noten-Tabelle
+        self.f.write(bytes(HEADER_SIZE))
+        self.note_count = 0
+        for event in song.events():
+            self.f.write(_u16(event[FREQ]))
+            self.f.write(_u16(event[DURATION]))
+            self.note_count += 1
+
+        self._events = song.events()
+        self.frame_count = 0
+        self._note_end = 0
+        self._sound_end = 0
+        self._target_brightness = 0
+
+    def step(self, max_frames):
+        """Rendert bis zu max_frames Frames
+
+        Returns:
+            True wenn die Show fertig und die Cache-Datei geschrieben ist
+        """
+        import christmas_light_show as show
+
+        if self.done:
+            return True
+
+        saved_np = show.np
+        saved_light = show.light
+        saved_hue = show.current_hue
+        show.np = self.pixels
+        show.light = self.light
+        show.current_hue = self.hue
+        try:
+            f = self.f
+            pixels = self.pixels
+            for _ in range(max_frames):
+                t = self.frame_count * FRAME_MS
+                while t >= self._note_end:
+                    event = next(self._events, None)
+                    if event is None:
+                        self._finish()
+                        return True
+                    duration = event[DURATION]
+                    self._sound_end = self._note_end + duration - min(show.NOTE_GAP_MS, duration // 4)
+                    self._note_end += duration
+                    self._target_brightness = show.note_target(event[FREQ])
+
+                if t < self._sound_end:
+                    show.follow_step(self._target_brightness)
+                else:
+                    show.fade_step(show.FADE_RATE_20MS)
+                f.write(pixels.buf)
+                self.frame_count += 1
+            return False
+        except BaseException:
+            self.abort()
+            raise
+        finally:
+            self.hue = show.current_hue
+            show.np = saved_np
+            show.light = saved_light
+            show.current_hue = saved_hue
+
+    def _finish(self):
+        # Kopf ausfüllen
+        f = self.f
+        f.seek(0)
+        f.write(MAGIC)
+        f.write(bytes((VERSION,)))
+        f.write(_u16(self.num_leds))
+        f.write(bytes((self.pixels.bpp, FRAME_MS)))
+        f.write(_u32(self.frame_count))
+        f.write(_u32(self.note_count))
+        f.close()
+
+        try:
+            os.remove(self.target)
+        except OSError:
+            pass
+        os.rename(self._temp, self.target)
+        _remove_stale(self.path, self.target)
+        self.done = True
+
+    def abort(self):
+        """Bricht ab und löscht die halbe Datei"""
+        if self.done:
+            return
+        self.done = True
+        self.f.close()
+        try:
+            os.remove(self._temp)
+        except OSError:
+            pass
+
+def compile_show(path, num_leds, target=None):
+    """Rendert die komplette Licht-Show eines Lieds in eine Cache-Datei (blockiert)
+
+    Returns:
+        Pfad der Cache-Datei
+    """
+    compiler = ShowCompiler(path, num_leds, target)
+    while not compiler.step(1000):
+        pass
+    return compiler.target
+
+def cached_show(path, num_leds):
+    """Liefert die Cache-Datei eines Lieds, oder None solange sie fehlt
+
+    Fehlt sie, wird sie beim nächsten precompile() berechnet.
+    """
+    global _missing
+    target = cache_path(path, num_leds)
+    try:
+        os.stat(target)
+    except OSError:
+        _missing = None  # neu suchen (z.B. Parameter geändert)
+        return None
+    return target
+
+def ensure_show(path, num_leds):
+    """Liefert die Cache-Datei eines Lieds, rendert sie bei Bedarf neu (blockiert)"""
+    target = cached_show(path, num_leds)
+    if target is None:
+        log.info("Berechne Show: {}", song_stream.file_title(path))
+        target = compile_show(path, num_leds)
+    return target
+
+# Lieder ohne Cache-Datei (None = noch nicht gesucht) und die laufende Berechnung
+_missing = None
+_compiler = None
+
+# Frames zwischen zwei Blicken auf die Uhr in precompile()
+PRECOMPILE_FRAMES = 8
+
+def precompile(num_leds, budget_ms):
+    """Rechnet fehlende Shows stückweise vor (in Leerlaufzeiten aufrufen)
+
+    Args:
+        num_leds: Anzahl LEDs
+        budget_ms: so lange rechnen (mindestens ein Schritt von
+            PRECOMPILE_FRAMES Frames, danach wird die Zeit geprüft)
+
+    Returns:
+        True solange noch Shows fehlen
+    """
+    global _missing, _compiler
+
+    start = ticks_ms()
+    if _missing is None:
+        _missing = []
+        keep = False
+        for path in song_stream.list_songs():
+            target = cache_path(path, num_leds)
+            if _compiler is not None and _compiler.target == target:
+                keep = True  # wird schon berechnet
+                continue
+            try:
+                os.stat(target)
+            except OSError:
+                _missing.append((path, target))
+        if _compiler is not None and not keep:
+            # Veraltet (Parameter geändert)
+            _compiler.abort()
+            _compiler = None
+
+    while True:
+        try:
+            if _compiler is None:
+                if not _missing:
+                    return False
+                path, target = _missing.pop(0)
+                log.info("Berechne Show: {}", song_stream.file_title(path))
+                _compiler = ShowCompiler(path, num_leds, target)
+            if _compiler.step(PRECOMPILE_FRAMES):
+                _compiler = None
+        except ValueError as e:
+            # Fehlerhaftes Lied: überspringen, es spielt dann live (und meldet sich dort)
+            log.error("Show nicht berechnet: {}", e)
+            _compiler = None
+        if ticks_diff(ticks_ms(), start) >= budget_ms:
+            return _compiler is not None or bool(_missing)
+
+def _cached_notes(show_path, note_count):
+    """Generator über die Noten-Tabelle einer Cache-Datei"""
+    event = song_format.new_event()
+    with open(show_path, 'rb') as f:
+        r = song_stream.ChunkReader(f, bytearray(song_stream.CHUNK_SIZE))
+        r.skip(HEADER_SIZE)
+        for _ in range(note_count):
+            event[FREQ] = r.byte() | (r.byte() << 8)
+            event[DURATION] = r.byte() | (r.byte() << 8)
+            yield event
+
+class ShowFile:
+    """Geöffnete Show-Datei: Noten für den ToneSequencer, Frames nach Nummer
+
+    Args:
+        show_path: Pfad der Cache-Datei
+        np: Ziel der Frames (NeoPixel-kompatibel, prüft LED-Anzahl und bpp)
+    """
+
+    def __init__(self, show_path, np):
+        self.path = show_path
+        self.f = open(show_path, 'rb')
+        header = self.f.read(HEADER_SIZE)
+        if header[0:3] != MAGIC or header[3] != VERSION:
+            self.f.close()
+            raise ValueError("Keine Show-Datei: " + show_path)
+        if header[4] | (header[5] << 8) != np.n or header[6] != np.bpp:
+            self.f.close()
+            raise ValueError("Show passt nicht zur LED-Anzahl")
+
+        self.frame_ms = header[7]
+        self.frame_count = _read_u32(header, 8)
+        self.note_count = _read_u32(header, 12)
+        self.frame_size = len(np.buf)
+        self._offset = HEADER_SIZE + self.note_count * NOTE_SIZE
+        self._next = -1
+
+    def notes(self):
+        """Noten-Events für ToneSequencer.start()"""
+        return _cached_notes(self.path, self.note_count)
+
+    def read(self, frame, buf):
+        """Liest Frame Nummer frame nach buf (springt nur, wenn nötig)"""
+        if frame != self._next:
+            self.f.seek(self._offset + frame * self.frame_size)
+        self.f.readinto(buf)
+        self._next = frame + 1
+
+    def close(self):
+        self.f.close()
+
+def play_show(show_path, np, sequencer, scheduler):
+    """Spielt eine vorberechnete Show ab
+
+    Die Töne laufen über den ToneSequencer, die Frames werden direkt in
+    np.buf gelesen. Hängt die Ausgabe hinterher, werden Frames übersprungen.
+    """
+    import christmas_light_show as show
+
+    show_file = ShowFile(show_path, np)
+    try:
+        frame_ms = show_file.frame_ms
+        frame_count = show_file.frame_count
+
+        sequencer.start(show_file.notes())
+        scheduler.reset()
+
+        frame = 0
+        while frame < frame_count:
+            sequencer.feed()
+
+            show_file.read(frame, np.buf)
+            np.write()
+
+            # Zwischen zwei Noten aufräumen (nie während ein Ton klingt)
+            if not sequencer.sounding:
+                memory.maybe_collect(show.GC_BUDGET_US)
+
+            # Nächster Frame laut Uhr, verpasste Frames überspringen
+            frame += 1
+            due = scheduler.now() // frame_ms
+            if due > frame:
+                scheduler.skipped_frames += due - frame
+                frame = due
+            scheduler.sleep_until(frame * frame_ms)
+
+        while sequencer.running:
+            sequencer.feed()
+            scheduler.sleep_until(scheduler.now() + frame_ms)
+    finally:
+        show_file.close()
@@ -0,0 +1,123 @@
+# Simulator für den PC (CPython)
+#
+# Stellt machine (Pin, PWM, Timer), neopixel.NeoPixel und eine virtuelle
+# Uhr bereit, damit main.py, neopixel_eyes, christmas_light_show und
+# christmas_player ohne Pico laufen. install() muss vor dem Import dieser
+# Module aufgerufen werden, weil sie sleep/ticks_* direkt aus time holen:
+#
+#     import sim
+#     sim.install(limit_ms=60000)
+#     import christmas_light_show
+#
+# Oder als Kommandozeile (siehe sim/__main__.py):
+#
+#     python3 -m sim main.py --seconds 3600 --press 5000 --trace main.trace
+#
+# Alle gesendeten Frames und Tonwechsel landen in trace (sim/tracefile.py),
+# auch die von ws2812_pio.MockPixels (USE_PIO_DRIVER). asyncio läuft auf
+# derselben Uhr (sim/eventloop.py), runtime.py also ebenfalls.
+
+import asyncio
+import io
+import random
+import sys
+import time
+
+from sim.timebase import VirtualClock, StopSimulation, ticks_add, ticks_diff
+from sim.tracefile import Trace
+from sim import machine, neopixel
+
+# Aktive Uhr und Aufzeichnung (gesetzt von install())
+clock = None
+trace = None
+
+# Die Uhr bleibt über mehrere install() hinweg dieselbe (siehe VirtualClock.reset)
+_clock = VirtualClock()
+_saved_policy = None
+
+_TIME_NAMES = ("sleep", "sleep_ms", "sleep_us", "ticks_ms", "ticks_us", "ticks_cpu",
+               "ticks_add", "ticks_diff")
+_saved_time = {}
+_saved_modules = {}
+
+def install(limit_ms=None, stream=None, seed=0):
+    """Ersetzt machine, neopixel und die Zeitfunktionen von time
+
+    Args:
+        limit_ms: simulierte Laufzeit, danach StopSimulation (wie Strg+C)
+        stream: Ziel der Aufzeichnung (Standard: io.BytesIO im Speicher)
+        seed: Startwert für random (zufällige Animationen), damit zwei
+            Läufe dieselbe Aufzeichnung ergeben
+
+    Returns:
+        (clock, trace)
+    """
+    global clock, trace, _saved_policy
+    if clock is not None:
+        uninstall()
+
+    clock = _clock
+    clock.reset(limit_ms)
+    trace = Trace(stream if stream is not None else io.BytesIO())
+    random.seed(seed)
+
+    for name in _TIME_NAMES:
+        if hasattr(time, name):
+            _saved_time[name] = getattr(time, name)
+    time.sleep = clock.sleep
+    time.sleep_ms = clock.sleep_ms
+    time.sleep_us = clock.sleep_us
+    time.ticks_ms = clock.ticks_ms
+    time.ticks_us = clock.ticks_us
+    time.ticks_cpu = clock.ticks_cpu
+    time.ticks_add = ticks_add
+    time.ticks_diff = ticks_diff
+
+    machine.reset_state()
+    for name, module in (("machine", machine), ("neopixel", neopixel)):
+        _saved_modules[name] = sys.modules.get(name)
+        sys.modules[name] = module
+
+    from sim.eventloop import VirtualEventLoopPolicy
+    _saved_policy = asyncio.get_event_loop_policy()
+    asyncio.set_event_loop_policy(VirtualEventLoopPolicy())
+
+    # Frames des PIO-Treibers (ohne rp2 gibt es dort nur MockPixels)
+    try:
+        import ws2812_pio
+    except ImportError:
+        pass
+    else:
+        ws2812_pio.monitor = _pio_frame
+
+    return clock, trace
+
+def _pio_frame(pin, buf):
+    trace.frame(now_ms(), machine._pin_id(pin), buf)
+
+def uninstall():
+    """Stellt time und die Module wieder her"""
+    global clock, trace, _saved_policy
+    ws2812_pio = sys.modules.get("ws2812_pio")
+    if ws2812_pio is not None:
+        ws2812_pio.monitor = None
+    if _saved_policy is not None:
+        asyncio.set_event_loop_policy(_saved_policy)
+        _saved_policy = None
+    for name in _TIME_NAMES:
+        if name in _saved_time:
+            setattr(time, name, _saved_time.pop(name))
+        elif hasattr(time, name):
+            delattr(time, name)
+    for name, module in _saved_modules.items():
+        if module is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = module
+    _saved_modules.clear()
+    clock = None
+    trace = None
+
+def now_ms():
+    """Simulierte Zeit in ms (für Aufzeichnungen)"""
+    return clock.us // 1000
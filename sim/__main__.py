@@ -0,0 +1,90 @@
+import argparse
+import os
+import re
+import sys
+import time
+
+import sim
+from sim import machine
+
+# Startet ein Skript des Projekts im Simulator
+#
+#     python3 -m sim main.py --seconds 600 --press 5000 --trace main.trace
+#
+# Das Skript läuft mit virtueller Uhr bis zum Zeitlimit (dann wie Strg+C)
+# und gibt am Ende simulierte Zeit, echte Zeit und die Aufzeichnung aus.
+# Schalter im Skript lassen sich ohne Änderung der Datei umstellen:
+#
+#     python3 -m sim main.py --set USE_ASYNC_RUNTIME=True --press 2000
+
+BUTTON_PIN = 21
+
+def override(source, setting):
+    """Ersetzt die Zuweisung NAME = ... auf oberster Ebene des Skripts
+
+    Args:
+        source: Quelltext des Skripts
+        setting: "NAME=WERT", WERT ist ein Python-Ausdruck
+
+    Returns:
+        geänderter Quelltext
+    """
+    name, sep, value = setting.partition("=")
+    name = name.strip()
+    if not sep or not name.isidentifier():
+        raise ValueError("--set erwartet NAME=WERT: " + setting)
+    pattern = re.compile(r"^{}[ \t]*=(?!=).*$".format(re.escape(name)), re.M)
+    source, count = pattern.subn(lambda m: "{} = {}".format(name, value.strip()), source, 1)
+    if not count:
+        raise ValueError("keine Zuweisung {} = ... im Skript".format(name))
+    return source
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m sim",
+                                     description="Skript mit virtueller Uhr ausführen")
+    parser.add_argument("script", help="z.B. main.py oder christmas_light_show.py")
+    parser.add_argument("--seconds", type=float, default=60,
+                        help="simulierte Laufzeit in Sekunden (Standard: 60)")
+    parser.add_argument("--press", type=int, action="append", default=[], metavar="MS",
+                        help="Button an GP{} zum Zeitpunkt MS drücken (mehrfach möglich)".format(BUTTON_PIN))
+    parser.add_argument("--seed", type=int, default=0, help="Startwert für random (Standard: 0)")
+    parser.add_argument("--trace", metavar="DATEI", help="Aufzeichnung in DATEI schreiben")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=WERT",
+                        help="Schalter im Skript überschreiben, z.B. USE_DUAL_CORE=True")
+    args = parser.parse_args(argv)
+
+    script = os.path.abspath(args.script)
+    with open(script) as f:
+        source = f.read()
+    for setting in args.set:
+        try:
+            source = override(source, setting)
+        except ValueError as e:
+            parser.error(str(e))
+    code = compile(source, script, "exec")
+
+    # Vor install(): install() lädt ws2812_pio aus dem Projektordner
+    sys.path.insert(0, os.path.dirname(script))
+    stream = open(args.trace, "wb") if args.trace else None
+    clock, trace = sim.install(int(args.seconds * 1000), stream, args.seed)
+
+    started = time.perf_counter()
+    for at_ms in args.press:
+        machine.press(BUTTON_PIN, at_ms)
+    try:
+        exec(code, {"__name__": "__main__", "__file__": script})
+    except sim.StopSimulation:
+        pass
+    elapsed = time.perf_counter() - started
+
+    simulated = clock.us / 1000000
+    print("\n[sim] {:.1f} s simuliert in {:.2f} s ({:.0f}x), {} Timer-Aufrufe".format(
+        simulated, elapsed, simulated / elapsed if elapsed else 0, clock.fired))
+    print("[sim] " + trace.summary())
+
+    if stream is not None:
+        stream.close()
+    sim.uninstall()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import asyncio
+import math
+import selectors
+
+import sim
+
+# asyncio auf der virtuellen Uhr
+#
+# Die Ereignisschleife von CPython wartet in selector.select(timeout) in
+# Echtzeit. VirtualSelector stellt stattdessen die virtuelle Uhr um timeout
+# vor (fällige Timer und Tastendrücke laufen dabei wie gewohnt) und
+# VirtualEventLoop.time() liest dieselbe Uhr. asyncio.sleep(), call_later()
+# und damit runtime.py laufen so genauso schnell und reproduzierbar wie die
+# blockierenden Schleifen. install() setzt die Policy, asyncio.run() legt
+# dann automatisch eine VirtualEventLoop an.
+
+class VirtualSelector:
+    """Selector, der Wartezeiten auf der virtuellen Uhr verbringt"""
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+
+    def select(self, timeout=None):
+        # Echte Ereignisse (z.B. call_soon_threadsafe) zuerst, ohne zu warten
+        ready = self._selector.select(0)
+        if ready:
+            return ready
+
+        clock = sim.clock
+        if timeout is None:
+            # Nichts mehr geplant: bis zum Zeitlimit warten (StopSimulation)
+            if clock.limit_us is None:
+                raise RuntimeError("asyncio wartet ohne Zeitlimit auf nichts")
+            clock.sleep_us(clock.limit_us - clock.us)
+        elif timeout > 0:
+            clock.sleep_us(math.ceil(timeout * 1000000))
+        return self._selector.select(0)
+
+    def __getattr__(self, name):
+        return getattr(self._selector, name)
+
+class VirtualEventLoop(asyncio.SelectorEventLoop):
+    """Ereignisschleife mit der virtuellen Uhr als Zeitbasis"""
+
+    def __init__(self):
+        super().__init__(VirtualSelector())
+
+    def time(self):
+        return sim.clock.us / 1000000
+
+class VirtualEventLoopPolicy(asyncio.DefaultEventLoopPolicy):
+    """Policy, über die asyncio.run() eine VirtualEventLoop bekommt"""
+
+    def new_event_loop(self):
+        return VirtualEventLoop()
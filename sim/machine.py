@@ -0,0 +1,180 @@
+import sim
+
+# Ersatz für das machine-Modul (nur was das Projekt benutzt)
+#
+# Timer laufen auf der virtuellen Uhr, PWM meldet jeden Tonwechsel an die
+# Aufzeichnung. Pins merken sich ihren Pegel, press() simuliert einen
+# Tastendruck inklusive Interrupt.
+
+# Alle angelegten Pins nach Nummer (für Tastendrücke aus dem Test)
+pins = {}
+
+# Ein Pin-Interrupt hat ausgelöst (beendet lightsleep wie auf dem RP2040)
+_woken = False
+
+# Simulierte Zeit in lightsleep (ms)
+slept_ms = 0
+
+def reset_state():
+    global slept_ms
+    pins.clear()
+    slept_ms = 0
+
+def _pin_id(pin):
+    return pin.id if isinstance(pin, Pin) else pin
+
+class Pin:
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self.mode = mode
+        self._value = 1 if pull == Pin.PULL_UP else 0
+        if value is not None:
+            self._value = 1 if value else 0
+        self._handler = None
+        self._trigger = 0
+        pins[id] = self
+
+    def value(self, v=None):
+        if v is None:
+            return self._value
+        v = 1 if v else 0
+        if v == self._value:
+            return
+        self._value = v
+        trigger = Pin.IRQ_RISING if v else Pin.IRQ_FALLING
+        if self._handler is not None and self._trigger & trigger:
+            global _woken
+            _woken = True
+            self._handler(self)
+
+    def __call__(self, v=None):
+        return self.value(v)
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+    def toggle(self):
+        self.value(1 - self._value)
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        self._handler = handler
+        self._trigger = trigger
+
+def press(pin_id, at_ms, hold_ms=100):
+    """Plant einen Tastendruck (aktiv-low) auf der virtuellen Uhr
+
+    Der Pin muss erst beim Druck existieren (ignoriert, falls nie angelegt).
+    """
+    def down():
+        if pin_id in pins:
+            pins[pin_id].value(0)
+
+    def up():
+        if pin_id in pins:
+            pins[pin_id].value(1)
+
+    delay_us = at_ms * 1000 - sim.clock.us
+    sim.clock.schedule(delay_us, down)
+    sim.clock.schedule(delay_us + hold_ms * 1000, up)
+
+class PWM:
+    def __init__(self, pin, freq=0, duty_u16=0):
+        self.pin = _pin_id(pin)
+        self._freq = freq
+        self._duty = duty_u16
+        self._report()
+
+    def _report(self):
+        sim.trace.tone(sim.now_ms(), self.pin, self._freq, self._duty)
+
+    def freq(self, value=None):
+        if value is None:
+            return self._freq
+        self._freq = int(value)
+        self._report()
+
+    def duty_u16(self, value=None):
+        if value is None:
+            return self._duty
+        self._duty = int(value)
+        self._report()
+
+    def deinit(self):
+        self._duty = 0
+        self._report()
+
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1, **kwargs):
+        self._entry = None
+        if kwargs:
+            self.init(**kwargs)
+
+    def init(self, mode=PERIODIC, freq=-1, period=-1, callback=None):
+        self.deinit()
+        if freq > 0:
+            period_us = 1000000 // freq
+        else:
+            period_us = max(1, period) * 1000
+
+        def fire():
+            if mode == Timer.ONE_SHOT:
+                self._entry = None
+            if callback is not None:
+                callback(self)
+
+        self._entry = sim.clock.schedule(period_us, fire,
+                                         period_us if mode == Timer.PERIODIC else 0)
+
+    def deinit(self):
+        if self._entry is not None:
+            sim.clock.cancel(self._entry)
+            self._entry = None
+
+def disable_irq():
+    return 0
+
+def enable_irq(state):
+    pass
+
+def freq(value=None):
+    return 125000000
+
+def lightsleep(ms=None):
+    """Schläft bis ms abgelaufen sind oder ein Pin-Interrupt auslöst
+
+    Ohne ms wird nur durch einen Interrupt geweckt, oder das Zeitlimit der
+    Simulation beendet den Schlaf (StopSimulation).
+    """
+    global _woken, slept_ms
+    _woken = False
+    clock = sim.clock
+    start = clock.us
+    try:
+        if ms is None:
+            while not _woken:
+                if clock.limit_us is None and not clock.pending():
+                    raise RuntimeError("lightsleep() ohne Zeitlimit wartet auf nichts")
+                clock.sleep_us(1000)
+        else:
+            end = start + ms * 1000
+            while clock.us < end and not _woken:
+                clock.sleep_us(min(1000, end - clock.us))
+    finally:
+        slept_ms += (clock.us - start) // 1000
+
+def idle():
+    pass
@@ -0,0 +1,41 @@
+import sim
+from sim.machine import _pin_id
+
+# Ersatz für neopixel.NeoPixel
+#
+# write() zeichnet den Puffer auf und stellt die Uhr um die Übertragungszeit
+# vor (10 µs pro Byte bei 800 kHz), weil np.write() auf dem Pico so lange
+# blockiert. Dadurch stimmen auch Framerate und Drift im Simulator.
+
+BYTE_US = 10
+
+class NeoPixel:
+    ORDER = (1, 0, 2, 3)
+
+    def __init__(self, pin, n, bpp=3, timing=1):
+        self.pin = _pin_id(pin)
+        self.n = n
+        self.bpp = bpp
+        self.buf = bytearray(n * bpp)
+        self.writes = 0
+
+    def __len__(self):
+        return self.n
+
+    def __setitem__(self, i, v):
+        offset = i * self.bpp
+        for k in range(self.bpp):
+            self.buf[offset + self.ORDER[k]] = v[k]
+
+    def __getitem__(self, i):
+        offset = i * self.bpp
+        return tuple(self.buf[offset + self.ORDER[k]] for k in range(self.bpp))
+
+    def fill(self, v):
+        for i in range(self.n):
+            self[i] = v
+
+    def write(self):
+        self.writes += 1
+        sim.trace.frame(sim.now_ms(), self.pin, self.buf)
+        sim.clock.sleep_us(len(self.buf) * BYTE_US)
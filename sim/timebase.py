@@ -0,0 +1,220 @@
+import threading
+
+# Virtuelle Uhr für den Simulator
+#
+# Ersetzt sleep*/ticks_* aus time. Schlafen wartet nicht wirklich, sondern
+# stellt die Uhr vor und führt dabei fällige Timer-Callbacks (machine.Timer)
+# zu ihrem Zeitpunkt aus. Ein Lied läuft dadurch in Sekundenbruchteilen,
+# zeitlich aber exakt wie auf dem Pico (Rechenzeit zählt nicht).
+#
+# Weitere Threads (zweiter Kern, siehe thread_standin.py) starten über
+# start_thread(). Es läuft dann immer genau ein Thread, bis er schläft:
+# die Uhr geht erst weiter, wenn alle schlafen, und weckt den mit der
+# frühesten Weckzeit (bei Gleichstand in Startreihenfolge). Das ist
+# reproduzierbar, und das Zeitlimit landet wie Strg+C im Haupt-Thread.
+
+# Wertebereich von ticks_ms/ticks_us wie auf dem RP2040 (30 Bit)
+TICKS_PERIOD = 1 << 30
+TICKS_MAX = TICKS_PERIOD - 1
+TICKS_HALF = TICKS_PERIOD // 2
+
+class StopSimulation(KeyboardInterrupt):
+    """Zeitlimit erreicht (wie Strg+C, damit Aufräumcode der Skripte läuft)"""
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & TICKS_MAX
+
+def ticks_diff(a, b):
+    diff = (a - b) & TICKS_MAX
+    return diff - TICKS_PERIOD if diff >= TICKS_HALF else diff
+
+class VirtualClock:
+    """Simulierte Zeit in µs seit Start
+
+    Args:
+        limit_ms: nach dieser simulierten Zeit wird StopSimulation
+            ausgelöst (None = unbegrenzt)
+    """
+
+    def __init__(self, limit_ms=None):
+        self.reset(limit_ms)
+
+    def reset(self, limit_ms=None):
+        """Zurück auf 0 (install() benutzt die Uhr weiter, weil die Module
+        ticks_ms usw. beim Import direkt aus time übernommen haben)"""
+        self.us = 0
+        self.limit_us = None if limit_ms is None else limit_ms * 1000
+        # Geplante Callbacks: [fällig_us, periode_us, callback]
+        self._timers = []
+        self.fired = 0
+
+        # Threads: ident -> [weckzeit_us oder None (läuft), reihenfolge]
+        self._cond = threading.Condition()
+        self._threads = {}
+        self._running = None
+        self._main = None
+        self._stop_pending = False
+
+    def ms(self):
+        return self.us // 1000
+
+    # --- Ersatz für time ---
+
+    def ticks_ms(self):
+        return (self.us // 1000) & TICKS_MAX
+
+    def ticks_us(self):
+        return self.us & TICKS_MAX
+
+    def ticks_cpu(self):
+        return self.us & TICKS_MAX
+
+    def sleep(self, seconds):
+        self.sleep_us(int(seconds * 1000000))
+
+    def sleep_ms(self, ms):
+        self.sleep_us(int(ms) * 1000)
+
+    def sleep_us(self, us):
+        if self._threads:
+            self._wait_until(self.us + max(0, int(us)))
+        else:
+            self.advance(int(us))
+
+    # --- Threads ---
+
+    def start_thread(self, function, args=(), kwargs=None):
+        """Startet function als Thread, der sich die Uhr mit den anderen teilt
+
+        Returns:
+            ident des Threads
+        """
+        cond = self._cond
+        with cond:
+            if not self._threads:
+                # Der Aufrufer (Haupt-Thread) nimmt ab jetzt auch teil
+                self._main = threading.get_ident()
+                self._threads[self._main] = [None, 0]
+                self._running = self._main
+            order = len(self._threads)
+
+        def run():
+            me = threading.get_ident()
+            with cond:
+                # Läuft erst, wenn der Starter das nächste Mal schläft
+                self._threads[me] = [self.us, order]
+                cond.notify_all()
+                while self._running != me:
+                    cond.wait()
+                self._threads[me][0] = None
+            try:
+                function(*args, **(kwargs or {}))
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+            finally:
+                with cond:
+                    del self._threads[me]
+                    self._switch()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        # Warten, bis der neue Thread eingetragen ist (sonst wäre die Reihenfolge offen)
+        with cond:
+            while len(self._threads) <= order:
+                cond.wait()
+        return thread.ident
+
+    def _switch(self):
+        """Gibt an den nächsten Thread ab (mit gesperrtem _cond aufrufen)"""
+        threads = self._threads
+        if not threads:
+            self._running = None
+            return
+        nxt = None
+        for ident, state in threads.items():
+            if state[0] is None:
+                return  # es läuft noch einer
+            if nxt is None or (state[0], state[1]) < (threads[nxt][0], threads[nxt][1]):
+                nxt = ident
+        wake = threads[nxt][0]
+        if wake > self.us:
+            try:
+                self.advance(wake - self.us)
+            except StopSimulation:
+                # Wie Strg+C: nur der Haupt-Thread bricht ab
+                self._stop_pending = True
+                if self._main in threads:
+                    nxt = self._main
+        self._running = nxt
+        self._cond.notify_all()
+
+    def _wait_until(self, wake_us):
+        cond = self._cond
+        me = threading.get_ident()
+        with cond:
+            state = self._threads.get(me)
+            if state is None:
+                # Kein teilnehmender Thread: wie ohne Threads
+                self.advance(wake_us - self.us)
+                return
+            state[0] = wake_us
+            self._switch()
+            while self._running != me:
+                cond.wait()
+            state[0] = None
+            if self._stop_pending and me == self._main:
+                self._stop_pending = False
+                raise StopSimulation()
+
+    # --- Timer ---
+
+    def schedule(self, delay_us, callback, period_us=0):
+        """Plant einen Callback in delay_us µs (periodisch bei period_us > 0)
+
+        Returns:
+            Eintrag für cancel()
+        """
+        entry = [self.us + max(0, delay_us), period_us, callback]
+        self._timers.append(entry)
+        return entry
+
+    def cancel(self, entry):
+        if entry in self._timers:
+            self._timers.remove(entry)
+
+    def pending(self):
+        """True wenn noch etwas die Uhr weiterbringt (Timer oder andere Threads)"""
+        return bool(self._timers) or len(self._threads) > 1
+
+    def _next_due(self, end):
+        due = None
+        for entry in self._timers:
+            if entry[0] <= end and (due is None or entry[0] < due[0]):
+                due = entry
+        return due
+
+    def advance(self, us):
+        """Stellt die Uhr um us µs vor und führt fällige Callbacks aus"""
+        end = self.us + max(0, us)
+        limit = self.limit_us
+        if limit is not None and end > limit:
+            end = limit
+
+        while True:
+            entry = self._next_due(end)
+            if entry is None:
+                break
+            self.us = entry[0]
+            if entry[1] > 0:
+                entry[0] += entry[1]
+            else:
+                self._timers.remove(entry)
+            self.fired += 1
+            entry[2]()
+
+        self.us = end
+        if limit is not None and end >= limit:
+            # Nur einmal auslösen, der Aufräumcode darf noch schlafen
+            self.limit_us = None
+            raise StopSimulation()
@@ -0,0 +1,78 @@
+import struct
+
+# Kompakte Aufzeichnung aller Frames und Tonwechsel
+#
+# Binärformat: Kopf b"SIMT" + Version, danach Einträge
+#   b"F" Zeit_ms(u32) Pin(u8) Länge(u16) Pixelbytes   neuer Frame
+#   b"T" Zeit_ms(u32) Pin(u8) Frequenz(u16) Duty(u16)  Tonwechsel
+# Frames, die sich nicht geändert haben, und wiederholte Tonzustände werden
+# nur gezählt, nicht gespeichert. Stunden von Augen-Animation bleiben so
+# klein, und zwei Läufe lassen sich byteweise (oder per digest()) vergleichen.
+
+MAGIC = b"SIMT\x01"
+
+FRAME = b"F"
+TONE = b"T"
+
+_FRAME_HEAD = struct.Struct("<IBH")
+_TONE_BODY = struct.Struct("<IBHH")
+
+class Trace:
+    """Schreibt Frames und Töne in einen Stream (Datei oder io.BytesIO)"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        stream.write(MAGIC)
+        self.frames = 0
+        self.stored_frames = 0
+        self.tones = 0
+        self._last_frame = {}
+        self._last_tone = {}
+
+    def frame(self, t_ms, pin, buf):
+        """Zeichnet einen gesendeten Frame auf (nur wenn er sich geändert hat)"""
+        self.frames += 1
+        last = self._last_frame.get(pin)
+        if last is not None and last == buf:
+            return
+        self._last_frame[pin] = bytes(buf)
+        self.stored_frames += 1
+        self.stream.write(FRAME + _FRAME_HEAD.pack(t_ms & 0xFFFFFFFF, pin, len(buf)))
+        self.stream.write(buf)
+
+    def tone(self, t_ms, pin, frequency, duty):
+        """Zeichnet einen Tonwechsel auf (Frequenz 0 = still)"""
+        if not duty:
+            frequency = 0
+        state = (frequency, duty)
+        if self._last_tone.get(pin) == state:
+            return
+        self._last_tone[pin] = state
+        self.tones += 1
+        self.stream.write(TONE + _TONE_BODY.pack(t_ms & 0xFFFFFFFF, pin, frequency, duty))
+
+    def summary(self):
+        return "{} Frames ({} gespeichert), {} Tonwechsel".format(
+            self.frames, self.stored_frames, self.tones)
+
+def read(stream):
+    """Liest eine Aufzeichnung
+
+    Yields:
+        (art, zeit_ms, pin, daten) mit daten = Pixelbytes bei FRAME,
+        (frequenz, duty) bei TONE
+    """
+    if stream.read(len(MAGIC)) != MAGIC:
+        raise ValueError("keine Simulator-Aufzeichnung")
+    while True:
+        kind = stream.read(1)
+        if not kind:
+            return
+        if kind == FRAME:
+            t, pin, length = _FRAME_HEAD.unpack(stream.read(_FRAME_HEAD.size))
+            yield (FRAME, t, pin, stream.read(length))
+        elif kind == TONE:
+            t, pin, frequency, duty = _TONE_BODY.unpack(stream.read(_TONE_BODY.size))
+            yield (TONE, t, pin, (frequency, duty))
+        else:
+            raise ValueError("unbekannter Eintrag {!r}".format(kind))
@@ -0,0 +1,112 @@
+from array import array
+
+# Kompaktes Binärformat für Melodien (.pns)
+#
+# Aufbau einer Datei:
+#   0      3 Bytes  Kennung b'PNS'
+#   3      1 Byte   Version (1)
+#   4      1 Byte   Tick-Länge in ms
+#   5      1 Byte   Länge n des Namens
+#   6      n Bytes  Name (UTF-8)
+#   6+n    2 Bytes  Anzahl Noten (little endian)
+#   8+n    je Note 2 Bytes: Notenindex (MIDI-Nummer, 0 = Pause), Dauer in Ticks
+#
+# Noten werden als gemeinsames Event-Objekt geliefert (array mit Frequenz
+# und Dauer), das bei jeder Note überschrieben wird. Das Abspielen erzeugt
+# dadurch keine neuen Objekte pro Note.
+
+MAGIC = b'PNS'
+VERSION = 1
+TICK_MS = 10
+REST = 0
+
+# Indizes im Event-Objekt
+FREQ = 0
+DURATION = 1
+
+NOTE_NAMES = ('C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B')
+
+# Frequenz (Hz, gerundet) für jede MIDI-Nummer, Index 0 = Pause
+FREQUENCIES = array('H', [0] * 128)
+for _m in range(1, 128):
+    FREQUENCIES[_m] = int(440 * 2 ** ((_m - 69) / 12) + 0.5)
+
+def new_event():
+    """Legt ein Event-Objekt [frequenz, dauer_ms] an"""
+    return array('H', [0, 0])
+
+def note_index(name):
+    """Wandelt einen Notennamen ('C#4', 'REST') in die MIDI-Nummer um"""
+    if name == 'REST':
+        return REST
+    octave = int(name[-1])
+    return 12 * (octave + 1) + NOTE_NAMES.index(name[:-1])
+
+class Song:
+    """Ein geladenes Lied im Binärformat"""
+
+    def __init__(self, data):
+        if data[0:3] != MAGIC or data[3] != VERSION:
+            raise ValueError("Keine PNS-Datei (Version {})".format(VERSION))
+
+        self.data = data
+        self.tick_ms = data[4]
+        name_len = data[5]
+        self.name = str(data[6:6 + name_len], 'utf-8')
+
+        offset = 6 + name_len
+        self.count = data[offset] | (data[offset + 1] << 8)
+        self._notes = offset + 2
+
+    def duration_ms(self):
+        """Gesamtdauer des Lieds in ms"""
+        data = self.data
+        total = 0
+        for i in range(self._notes + 1, self._notes + 2 * self.count, 2):
+            total += data[i]
+        return total * self.tick_ms
+
+    def events(self, event=None):
+        """Generator über alle Noten, liefert immer dasselbe Event-Objekt
+
+        Args:
+            event: Event-Objekt aus new_event() (optional)
+        """
+        if event is None:
+            event = new_event()
+
+        data = self.data
+        tick_ms = self.tick_ms
+        for i in range(self._notes, self._notes + 2 * self.count, 2):
+            event[FREQ] = FREQUENCIES[data[i]]
+            event[DURATION] = data[i + 1] * tick_ms
+            yield event
+
+def load(path):
+    """Lädt ein Lied aus einer .pns-Datei"""
+    with open(path, 'rb') as f:
+        return Song(f.read())
+
+def encode(name, melody, tick_ms=TICK_MS):
+    """Wandelt eine Melodie [('E4', 0.3), ...] in das Binärformat um
+
+    Returns:
+        bytes der .pns-Datei
+    """
+    name_bytes = name.encode('utf-8')
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    out.append(tick_ms)
+    out.append(len(name_bytes))
+    out.extend(name_bytes)
+    out.append(len(melody) & 0xFF)
+    out.append(len(melody) >> 8)
+
+    for note, duration in melody:
+        ticks = int(duration * 1000 / tick_ms + 0.5)
+        if not 0 < ticks < 256:
+            raise ValueError("Dauer {} s passt nicht in ein Byte".format(duration))
+        out.append(note_index(note))
+        out.append(ticks)
+
+    return bytes(out)
@@ -0,0 +1,440 @@
+import os
+from array import array
+
+import song_format
+from song_format import FREQUENCIES, FREQ, DURATION
+
+# Lieder direkt aus dem Dateisystem streamen (RTTTL und einfache MIDI-Dateien)
+#
+# Die Dateien werden in festen Blöcken in einen Puffer pro Leser gelesen und
+# Note für Note als Generator geliefert (gleiches Event-Format wie
+# song_format). Dadurch können Lieder länger sein als der freie Heap, und
+# mehrere Lieder lassen sich gleichzeitig lesen (z.B. Show berechnen und
+# dabei abspielen).
+# list_songs() findet alle Lieder im Ordner songs/, neue Lieder müssen also
+# nur dorthin kopiert werden.
+
+SONG_DIR = "songs"
+CHUNK_SIZE = 64
+
+# Unterstützte Dateiendungen
+PNS_EXT = ".pns"
+RTTTL_EXT = (".rtttl", ".rtx")
+MIDI_EXT = (".mid", ".midi")
+
+# Höchstens so viele Tempowechsel aus der Tempo-Spur (MIDI Format 1)
+MAX_TEMPOS = 32
+
+# Längste Dauer eines Events (16 Bit, siehe song_format.new_event)
+MAX_DURATION_MS = 0xFFFF
+
+# Zeichen als Bytewerte
+_COLON = ord(':')
+_COMMA = ord(',')
+_EQUALS = ord('=')
+_DOT = ord('.')
+_SHARP = ord('#')
+_ZERO = ord('0')
+_NINE = ord('9')
+
+# Halbtöne über C für die RTTTL-Notennamen (Kleinbuchstaben), p = Pause
+_SEMITONES = {ord('c'): 0, ord('d'): 2, ord('e'): 4, ord('f'): 5,
+              ord('g'): 7, ord('a'): 9, ord('b'): 11, ord('h'): 11}
+_PAUSE = ord('p')
+
+# MIDI-Kennungen
+_MTHD = 0x4D546864
+_MTRK = 0x4D54726B
+
+class ChunkReader:
+    """Liest eine Datei byteweise über einen festen Puffer"""
+
+    def __init__(self, f, buf):
+        self.f = f
+        self.buf = buf
+        self.pos = 0
+        self.len = 0
+
+    def peek(self):
+        """Nächstes Byte ohne es zu verbrauchen (-1 am Dateiende)"""
+        if self.pos >= self.len:
+            self.len = self.f.readinto(self.buf) or 0
+            self.pos = 0
+            if self.len == 0:
+                return -1
+        return self.buf[self.pos]
+
+    def byte(self):
+        """Nächstes Byte (-1 am Dateiende)"""
+        b = self.peek()
+        if b >= 0:
+            self.pos += 1
+        return b
+
+    def skip(self, n):
+        """Überspringt n Bytes"""
+        while n > 0 and self.byte() >= 0:
+            n -= 1
+
+    def u16(self):
+        """16 Bit big endian"""
+        return (self.byte() << 8) | self.byte()
+
+    def u32(self):
+        """32 Bit big endian (-1 am Dateiende)"""
+        if self.peek() < 0:
+            return -1
+        return (self.u16() << 16) | self.u16()
+
+    def varlen(self):
+        """Zahl variabler Länge (MIDI)"""
+        value = 0
+        while True:
+            b = self.byte()
+            if b < 0:
+                return value
+            value = (value << 7) | (b & 0x7F)
+            if not b & 0x80:
+                return value
+
+    def number(self, default):
+        """Dezimalzahl (RTTTL), oder default wenn keine Ziffer folgt"""
+        c = self.peek()
+        if c < _ZERO or c > _NINE:
+            return default
+        value = 0
+        while _ZERO <= c <= _NINE:
+            value = value * 10 + c - _ZERO
+            self.pos += 1
+            c = self.peek()
+        return value
+
+    def skip_spaces(self):
+        c = self.peek()
+        while c >= 0 and c <= 32:
+            self.pos += 1
+            c = self.peek()
+
+def rtttl_events(path, event=None, buf=None):
+    """Generator über die Noten einer RTTTL-Datei ("name:d=4,o=5,b=120:8e5,...")
+
+    Args:
+        path: Pfad der Datei
+        event: Event-Objekt aus song_format.new_event() (optional)
+        buf: Lesepuffer (optional, sonst ein eigener mit CHUNK_SIZE Bytes)
+
+    Raises:
+        ValueError: bei ungültigen Einstellungen, Dauern, Noten oder Oktaven
+    """
+    if event is None:
+        event = song_format.new_event()
+    if buf is None:
+        buf = bytearray(CHUNK_SIZE)
+
+    with open(path, 'rb') as f:
+        r = ChunkReader(f, buf)
+
+        # Name überspringen
+        c = r.byte()
+        while c >= 0 and c != _COLON:
+            c = r.byte()
+
+        # Standardwerte: d=4, o=6, b=63
+        default_duration = 4
+        default_octave = 6
+        bpm = 63
+
+        while True:
+            r.skip_spaces()
+            c = r.byte()
+            if c < 0 or c == _COLON:
+                break
+            if c == _COMMA:
+                continue
+
+            key = c | 0x20  # Kleinbuchstabe
+            r.skip_spaces()
+            if r.byte() != _EQUALS:
+                raise ValueError("RTTTL: ungültige Einstellungen")
+            r.skip_spaces()
+            value = r.number(0)
+            if key == ord('d'):
+                default_duration = value
+            elif key == ord('o'):
+                default_octave = value
+            elif key == ord('b'):
+                bpm = value
+
+        if bpm <= 0 or default_duration <= 0:
+            raise ValueError("RTTTL: ungültige Einstellungen")
+
+        # Dauer einer ganzen Note in ms
+        whole_ms = 240000 // bpm
+
+        while True:
+            r.skip_spaces()
+            if r.peek() < 0:
+                return
+
+            duration = r.number(default_duration)
+            letter = r.byte() | 0x20
+
+            semitone = 0
+            if letter == _PAUSE:
+                semitone = -1
+            elif letter in _SEMITONES:
+                semitone = _SEMITONES[letter]
+            else:
+                raise ValueError("RTTTL: unbekannte Note")
+
+            if r.peek() == _SHARP:
+                r.byte()
+                semitone += 1
+
+            dotted = False
+            if r.peek() == _DOT:
+                r.byte()
+                dotted = True
+
+            octave = r.number(default_octave)
+
+            if r.peek() == _DOT:
+                r.byte()
+                dotted = True
+
+            # Trennzeichen überspringen
+            r.skip_spaces()
+            if r.peek() == _COMMA:
+                r.byte()
+
+            if duration <= 0:
+                raise ValueError("RTTTL: ungültige Notendauer")
+            ms = whole_ms // duration
+            if dotted:
+                ms += ms // 2
+            if ms > MAX_DURATION_MS:
+                raise ValueError("RTTTL: Note zu lang")
+
+            if semitone < 0:
+                event[FREQ] = 0
+            else:
+                index = 12 * (octave + 1) + semitone
+                if index >= len(FREQUENCIES):
+                    raise ValueError("RTTTL: Oktave außerhalb des Bereichs")
+                event[FREQ] = FREQUENCIES[index]
+            event[DURATION] = ms
+            yield event
+
+def midi_events(path, event=None, buf=None):
+    """Generator über die Noten einer einfachen MIDI-Datei
+
+    Gelesen wird die erste Spur mit Noten (Format 0 oder 1). Überlappende
+    Noten werden einstimmig gespielt: eine neue Note beendet die vorherige,
+    eine noch klingende Note endet spätestens mit der Spur. Lücken zwischen
+    Noten werden als Pausen geliefert. Tempowechsel aus vorherigen Spuren
+    ohne Noten (Tempo-Spur bei Format 1) gelten an ihrer Position.
+
+    Args:
+        path: Pfad der Datei
+        event: Event-Objekt aus song_format.new_event() (optional)
+        buf: Lesepuffer (optional, sonst ein eigener mit CHUNK_SIZE Bytes)
+    """
+    if event is None:
+        event = song_format.new_event()
+    if buf is None:
+        buf = bytearray(CHUNK_SIZE)
+
+    # Tempowechsel der Tempo-Spur: Position in Ticks und µs pro Viertel
+    tempo_ticks = array('I', [0] * MAX_TEMPOS)
+    tempo_values = array('I', [0] * MAX_TEMPOS)
+    tempo_count = 0
+
+    with open(path, 'rb') as f:
+        r = ChunkReader(f, buf)
+
+        if r.u32() != _MTHD:
+            raise ValueError("Keine MIDI-Datei")
+        header_len = r.u32()
+        r.u16()  # Format
+        r.u16()  # Anzahl Spuren
+        division = r.u16()
+        r.skip(header_len - 6)
+        if division & 0x8000:
+            raise ValueError("MIDI: SMPTE-Zeitbasis wird nicht unterstützt")
+
+        while True:
+            chunk_id = r.u32()
+            if chunk_id < 0:
+                return
+            length = r.u32()
+            if chunk_id != _MTRK:
+                r.skip(length)
+                continue
+
+            # Dauer eines MIDI-Ticks in 1/16 µs (120 bpm bis zur ersten Tempo-Angabe)
+            tick_us16 = (500000 << 4) // division
+            next_tempo = 0    # nächster Eintrag aus der Tempo-Spur
+
+            # Zeit in ms seit Spurbeginn (Rest in 1/16 µs, damit nichts verloren geht)
+            ticks = 0
+            now_ms = 0
+            rest = 0
+            active = -1       # aktuell klingende Note
+            note_start = 0
+            last_end = 0
+            had_notes = False
+            status = 0
+            track_tempos = tempo_count
+
+            while True:
+                delta = r.varlen()
+
+                # Bis zu Tempowechseln der Tempo-Spur im alten Tempo rechnen
+                while next_tempo < tempo_count and tempo_ticks[next_tempo] <= ticks + delta:
+                    step = tempo_ticks[next_tempo] - ticks
+                    rest += step * tick_us16
+                    ticks += step
+                    delta -= step
+                    tick_us16 = (tempo_values[next_tempo] << 4) // division
+                    next_tempo += 1
+                ticks += delta
+                rest += delta * tick_us16
+                now_ms += rest // 16000
+                rest %= 16000
+
+                b = r.byte()
+                end = b < 0
+                if not end:
+                    if b & 0x80:
+                        status = b
+                        data1 = -1
+                    else:
+                        # Running Status: b ist schon das erste Datenbyte
+                        data1 = b
+
+                    if status == 0xFF:
+                        meta = r.byte()
+                        meta_len = r.varlen()
+                        if meta == 0x51 and meta_len == 3:
+                            tempo = (r.byte() << 16) | (r.byte() << 8) | r.byte()
+                            tick_us16 = (tempo << 4) // division
+                            if track_tempos < MAX_TEMPOS:
+                                tempo_ticks[track_tempos] = ticks
+                                tempo_values[track_tempos] = tempo
+                                track_tempos += 1
+                        else:
+                            r.skip(meta_len)
+                        end = meta == 0x2F
+                        if not end:
+                            continue
+
+                if end:
+                    # Ende der Spur: eine noch klingende Note hier beenden
+                    if active >= 0 and now_ms > note_start:
+                        event[FREQ] = FREQUENCIES[active]
+                        event[DURATION] = now_ms - note_start
+                        yield event
+                    break
+
+                if status == 0xF0 or status == 0xF7:
+                    r.skip(r.varlen())
+                    continue
+
+                kind = status & 0xF0
+                if data1 < 0:
+                    data1 = r.byte()
+
+                if kind == 0xC0 or kind == 0xD0:
+                    # Ein Datenbyte
+                    continue
+
+                data2 = r.byte()
+                if kind == 0x90 and data2 > 0:
+                    # Note an
+                    if active >= 0:
+                        event[FREQ] = FREQUENCIES[active]
+                        event[DURATION] = now_ms - note_start
+                        last_end = now_ms
+                        if event[DURATION] > 0:
+                            yield event
+                    elif now_ms > last_end:
+                        event[FREQ] = 0
+                        event[DURATION] = now_ms - last_end
+                        yield event
+                    active = data1
+                    note_start = now_ms
+                    had_notes = True
+                elif (kind == 0x80 or kind == 0x90) and data1 == active:
+                    # Note aus
+                    event[FREQ] = FREQUENCIES[active]
+                    event[DURATION] = now_ms - note_start
+                    last_end = now_ms
+                    active = -1
+                    yield event
+
+            if had_notes or r.peek() < 0:
+                return
+
+            # Spur ohne Noten (Tempo-Spur): ihre Tempowechsel gelten für die folgenden
+            tempo_count = track_tempos
+
+class StreamSong:
+    """Lied, das beim Abspielen aus einer RTTTL- oder MIDI-Datei gestreamt wird"""
+
+    def __init__(self, path):
+        self.path = path
+        self.is_midi = _has_ext(path, MIDI_EXT)
+        self.name = _rtttl_name(path) if not self.is_midi else file_title(path)
+
+    def events(self, event=None):
+        """Generator über alle Noten (gleiches Event-Objekt für jede Note)"""
+        if self.is_midi:
+            return midi_events(self.path, event)
+        return rtttl_events(self.path, event)
+
+def _has_ext(name, extensions):
+    """Prüft die Dateiendung (ohne Tupel-Argument für endswith)"""
+    for ext in extensions:
+        if name.endswith(ext):
+            return True
+    return False
+
+def file_title(path):
+    """Dateiname ohne Ordner und Endung"""
+    name = path.split('/')[-1]
+    dot = name.rfind('.')
+    return name[:dot] if dot > 0 else name
+
+def _rtttl_name(path):
+    """Liest den Liednamen aus dem RTTTL-Kopf"""
+    with open(path, 'rb') as f:
+        head = f.read(CHUNK_SIZE)
+    colon = head.find(b':')
+    if colon <= 0:
+        return file_title(path)
+    return str(head[:colon], 'utf-8').strip()
+
+def list_songs(directory=SONG_DIR):
+    """Findet alle abspielbaren Lieder im Ordner (sortiert nach Dateiname)
+
+    Returns:
+        Liste der Pfade
+    """
+    songs = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(PNS_EXT) or _has_ext(name, RTTTL_EXT) or _has_ext(name, MIDI_EXT):
+            songs.append(directory + "/" + name)
+    return songs
+
+def open_song(path):
+    """Öffnet ein Lied passend zur Dateiendung
+
+    .pns wird komplett geladen (wenige Bytes pro Note), RTTTL und MIDI
+    werden beim Abspielen gestreamt.
+
+    Returns:
+        Objekt mit name und events() (song_format.Song oder StreamSong)
+    """
+    if path.endswith(PNS_EXT):
+        return song_format.load(path)
+    return StreamSong(path)
@@ -0,0 +1,62 @@
+import io
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Die Tests laufen auf dem PC im Simulator (sim/), ohne Pico.
+#
+# Projektmodule holen sleep/ticks_* beim Import direkt aus time. Sie dürfen
+# deshalb erst nach sim.install() importiert werden, also innerhalb der
+# Tests (Fixture simulator), nicht oben in der Testdatei.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import sim
+from sim import tracefile
+
+@pytest.fixture(autouse=True)
+def project_dir(monkeypatch):
+    """Lieder (songs/) und Cache werden relativ zum Projektordner gesucht"""
+    monkeypatch.chdir(ROOT)
+
+@pytest.fixture
+def simulator():
+    """Simulator ohne Zeitlimit, Aufzeichnung im Speicher"""
+    sim.install(stream=io.BytesIO())
+    yield sim
+    sim.uninstall()
+
+def records(stream):
+    """Einträge einer Aufzeichnung als Liste (siehe sim.tracefile.read)"""
+    stream.seek(0)
+    return list(tracefile.read(stream))
+
+def tones(entries, pin):
+    """Tonwechsel eines Pins als [(zeit_ms, frequenz, duty), ...]"""
+    return [(t, data[0], data[1]) for kind, t, p, data in entries
+            if kind == tracefile.TONE and p == pin]
+
+def frames(entries):
+    """Gespeicherte Frames als [(zeit_ms, pin, bytes), ...]"""
+    return [(t, p, data) for kind, t, p, data in entries if kind == tracefile.FRAME]
+
+def run_sim(tmp_path, script, seconds, presses=(), settings=(), timeout=120):
+    """Startet python3 -m sim in einem eigenen Prozess
+
+    Returns:
+        (Ausgabe, Einträge der Aufzeichnung)
+    """
+    trace_path = str(tmp_path / "run.trace")
+    args = [sys.executable, "-m", "sim", script, "--seconds", str(seconds),
+            "--trace", trace_path]
+    for at_ms in presses:
+        args += ["--press", str(at_ms)]
+    for setting in settings:
+        args += ["--set", setting]
+    result = subprocess.run(args, cwd=ROOT, capture_output=True, text=True, timeout=timeout)
+    assert result.returncode == 0, result.stdout + result.stderr
+    with open(trace_path, "rb") as f:
+        return result.stdout, list(tracefile.read(f))
@@ -0,0 +1,34 @@
+import pytest
+
+# Helligkeit der Töne: LED-Wert pro Note (quadratisch von 10% bis 100%)
+
+LED_VALUES = {
+    'C4': 25, 'C#4': 25, 'D4': 26, 'E4': 29, 'F4': 31, 'F#4': 35, 'G4': 39,
+    'G#4': 44, 'A4': 51, 'B4': 70, 'C5': 82, 'C#5': 97, 'D5': 113, 'E5': 156,
+    'F5': 184, 'G5': 255, 'REST': 0,
+}
+
+@pytest.fixture
+def show(simulator):
+    import hardware
+    import christmas_light_show as show
+
+    hw = hardware.init()
+    show.init_hardware(neopixel_obj=hw.np, buzzer_obj=hw.buzzer)
+    return show
+
+@pytest.mark.parametrize("note", sorted(LED_VALUES))
+def test_note_led_value(show, note):
+    show.light.set(show.note_target(show.NOTES[note]))
+    show._fill_current()
+    assert show.np[0] == (LED_VALUES[note], 0, 0)
+    assert show.np[show.np.n - 1] == (LED_VALUES[note], 0, 0)
+
+def test_curve_matches_float_mapping(simulator):
+    import brightness
+
+    # Früher direkt als LED-Wert gerechnet: 255 * (0.1 + 0.9 * n²)
+    for frequency in range(brightness.MIN_FREQ, brightness.MAX_FREQ + 1):
+        n = (frequency - brightness.MIN_FREQ) / (brightness.MAX_FREQ - brightness.MIN_FREQ)
+        led = brightness.GAMMA[brightness.freq_level(frequency)]
+        assert abs(led - int(255 * (0.1 + 0.9 * n * n))) <= 3
@@ -0,0 +1,93 @@
+# Hüllkurven: bit-genaue Stufenfolgen (Vergleich mit aufgezeichneten Frames)
+
+def run(envelope, limit=100):
+    """Schritte bis zum Ziel als Liste der Stufen"""
+    levels = []
+    while not envelope.done():
+        levels.append(envelope.step())
+        assert len(levels) <= limit
+    return levels
+
+def test_linear_up(simulator):
+    from envelope import Envelope
+
+    envelope = Envelope()
+    envelope.linear(200, 5)
+    assert run(envelope) == [40, 80, 120, 160, 200]
+    assert envelope.step() == 200
+
+def test_linear_down(simulator):
+    from envelope import Envelope
+
+    envelope = Envelope(200)
+    envelope.linear(50, 4)
+    assert run(envelope) == [162, 125, 87, 50]
+
+def test_linear_zero_steps(simulator):
+    from envelope import Envelope
+
+    envelope = Envelope(10)
+    envelope.linear(240, 0)
+    assert run(envelope) == [240]
+
+def test_exponential_fade(simulator):
+    import christmas_light_show as show
+    from envelope import Envelope
+
+    # Abdimmen zwischen den Noten (FADE_RATE pro 10ms), rastet auf 0 ein
+    envelope = Envelope(255)
+    envelope.exponential(0, show.FADE_RATE)
+    assert run(envelope) == [
+        217, 184, 157, 134, 114, 97, 82, 70, 60, 51, 43, 37, 31, 26, 22, 19, 16, 14,
+        12, 10, 8, 7, 6, 5, 4, 3, 3, 2, 2, 2, 1, 1, 1, 1, 0]
+
+def test_attack_decay(simulator):
+    from envelope import Envelope
+
+    envelope = Envelope()
+    envelope.attack_decay(255, 3, 64, 128)
+    assert run(envelope) == [85, 170, 255, 159, 111, 87, 75, 69, 66, 65, 64]
+
+def test_set_cancels_fade(simulator):
+    from envelope import Envelope
+
+    envelope = Envelope()
+    envelope.attack_decay(255, 3, 64, 128)
+    envelope.step()
+    envelope.set(30)
+    assert envelope.done()
+    assert envelope.step() == 30
+
+def test_compositor_crossfade(simulator):
+    import render
+    import compositor
+
+    np = render.PixelBuffer(2)
+    layers = compositor.Compositor(np)
+    eyes = layers.add_layer(opacity=255)
+    music = layers.add_layer()
+    render.fill(eyes, 255, 0, 0)
+    render.fill(music, 0, 0, 255)
+
+    layers.crossfade(music, 4)
+    frames = []
+    while layers.fading():
+        layers.render()
+        frames.append(np[1])
+    assert frames == [(143, 0, 63), (63, 0, 127), (15, 0, 191), (0, 0, 255)]
+    assert eyes.opacity.level() == 0
+    assert music.opacity.level() == 255
+
+def test_compositor_swaps_buffers(simulator):
+    import render
+    import compositor
+
+    np = render.FrameBuffer(render.PixelBuffer(2))
+    layers = compositor.Compositor(np)
+    render.fill(layers.add_layer(opacity=255), 9, 8, 7)
+
+    front, back = np.buf, layers.back
+    layers.render()
+    assert np.buf is back and layers.back is front
+    assert np.np.buf is back
+    assert np[0] == (9, 8, 7)
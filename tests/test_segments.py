@@ -0,0 +1,39 @@
+import pytest
+
+# Augen-Segmente: Kernel auf dem physischen Puffer folgen der logischen Reihenfolge
+
+@pytest.mark.parametrize("rotation, mirrored", [
+    (0, False), (3, False), (0, True), (5, True), (13, True),
+])
+def test_gradient_follows_map(simulator, rotation, mirrored):
+    import render
+    import segments
+    import color_wheel
+
+    strip = render.PixelBuffer(24)
+    eye = segments.Segment(strip, 12, 12, rotation, mirrored)
+    color_wheel.gradient(eye, 40, 200, 180)
+
+    # Dieselben Farben Pixel für Pixel über den logischen Index (Segment.map)
+    expected = render.PixelBuffer(24)
+    view = segments.Segment(expected, 12, 12, rotation, mirrored)
+    wheel = color_wheel.WHEEL
+    for i in range(12):
+        h = ((i * 200 // 12 + 40) & 255) * 3
+        view[i] = [(wheel[h + c] * 181) >> 8 for c in range(3)]
+
+    assert strip.buf == expected.buf
+
+def test_views_belong_to_buffer(simulator):
+    import render
+    import segments
+
+    first = render.PixelBuffer(24)
+    views = segments.eye_views(first, segments.CHAINED_24)
+    assert segments.eye_views(first, segments.CHAINED_24) is views
+
+    # Neuer Puffer (auch mit wiederverwendeter id) bekommt eigene Segmente
+    del first, views
+    second = render.PixelBuffer(24)
+    for eye in segments.eye_views(second, segments.CHAINED_24):
+        assert eye.np is second
@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+# Vorberechnete Licht-Shows: Cache-Schlüssel, stückweise Berechnung, Leerlauf
+
+SONG = "songs/jingle_bells.pns"
+
+@pytest.fixture
+def cache(simulator, tmp_path, monkeypatch):
+    import hardware
+    import christmas_light_show as show
+    import show_cache
+
+    hw = hardware.init()
+    show.init_hardware(neopixel_obj=hw.np, buzzer_obj=hw.buzzer)
+    monkeypatch.setattr(show_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(show_cache, "_missing", None)
+    monkeypatch.setattr(show_cache, "_compiler", None)
+    return show_cache
+
+@pytest.mark.parametrize("module, name, value", [
+    ("brightness", "GAMMA_EXPONENT", 2.5),
+    ("brightness", "MIN_FREQ_LEVEL", 40),
+    ("christmas_light_show", "NOTE_COLORS", True),
+])
+def test_key_covers_parameters(cache, monkeypatch, module, name, value):
+    key = cache.cache_key(SONG, 12)
+    monkeypatch.setattr(__import__(module), name, value)
+    assert cache.cache_key(SONG, 12) != key
+
+def test_key_ignores_eye_level(cache, monkeypatch):
+    import neopixel_eyes
+
+    # Die Augen-Helligkeit kommt in vorberechneten Shows nicht vor
+    key = cache.cache_key(SONG, 12)
+    monkeypatch.setattr(neopixel_eyes, "EYE_LEVEL", 60)
+    assert cache.cache_key(SONG, 12) == key
+
+def test_key_covers_tables(cache, monkeypatch):
+    import brightness
+
+    key = cache.cache_key(SONG, 12)
+    gamma = bytearray(brightness.GAMMA)
+    gamma[128] += 1
+    monkeypatch.setattr(brightness, "GAMMA", bytes(gamma))
+    assert cache.cache_key(SONG, 12) != key
+
+def test_slices_match_blocking_compile(cache, tmp_path):
+    import christmas_light_show as show
+
+    blocking = cache.compile_show(SONG, 12, str(tmp_path / "a.show"))
+
+    np = show.np
+    light = show.light
+    compiler = cache.ShowCompiler(SONG, 12, str(tmp_path / "b.show"))
+    steps = 0
+    while not compiler.step(3):
+        # Zwischen den Schritten gehören die Module wieder der Live-Show
+        assert show.np is np and show.light is light
+        steps += 1
+    assert steps > 10
+    with open(blocking, "rb") as a, open(compiler.target, "rb") as b:
+        assert a.read() == b.read()
+    assert not os.path.exists(compiler.target + ".tmp")
+
+def test_missing_show_plays_live_then_precompiles(cache, monkeypatch):
+    import christmas_light_show as show
+
+    monkeypatch.setattr(show, "last_played_song", None)
+    monkeypatch.setattr(show, "END_FADE_SPEED", 255)
+    assert cache.cached_show(show.song_stream.list_songs()[0], 12) is None
+
+    # Button-Druck ohne Cache: spielt live, berechnet nichts
+    show.play_random_song()
+    assert os.listdir(cache.CACHE_DIR) == []
+    assert show.drift_log.count > 0
+
+    # Leerlauf: in kleinen Stücken, bis alle Lieder eine Show haben
+    calls = 1
+    while cache.precompile(12, 0):
+        calls += 1
+    assert calls > 10
+    for path in show.song_stream.list_songs():
+        assert cache.cached_show(path, 12) is not None
+    assert cache.precompile(12, 1000) is False
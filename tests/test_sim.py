@@ -0,0 +1,146 @@
+import asyncio
+import time
+
+import pytest
+
+from conftest import tones, frames, run_sim
+
+# Simulator selbst und die Betriebsarten von main.py (jeweils ein eigener
+# Prozess, weil main.py beim Import startet und endlos läuft)
+
+BUZZER_PIN = 8
+NEOPIXEL_PIN = 1
+
+def test_override():
+    from sim.__main__ import override
+
+    source = "USE_X = False\nUSE_XY = 1\nif USE_X == 1:\n    pass\n"
+    assert override(source, "USE_X=True").startswith("USE_X = True\nUSE_XY = 1\n")
+    with pytest.raises(ValueError):
+        override(source, "USE_Z=True")
+    with pytest.raises(ValueError):
+        override(source, "USE_X")
+
+def test_eventloop_virtual_time(simulator):
+    async def wait():
+        await asyncio.sleep(3600)
+        return asyncio.get_running_loop().time()
+
+    started = time.perf_counter()
+    assert asyncio.run(wait()) == pytest.approx(3600, abs=0.001)
+    assert simulator.clock.us >= 3600 * 1000000
+    assert time.perf_counter() - started < 5
+
+def test_eventloop_stops_at_limit(simulator):
+    simulator.clock.limit_us = 1000000
+
+    async def forever():
+        while True:
+            await asyncio.sleep(0.1)
+
+    with pytest.raises(simulator.StopSimulation):
+        asyncio.run(forever())
+    assert simulator.clock.us == 1000000
+
+def test_threads_share_clock(simulator):
+    import thread_standin
+
+    clock = simulator.clock
+    events = []
+    done = []
+
+    def worker():
+        for i in range(3):
+            events.append(("worker", clock.ms()))
+            clock.sleep_ms(20)
+        done.append(True)
+
+    thread_standin.start_new_thread(worker, ())
+    for i in range(3):
+        events.append(("main", clock.ms()))
+        clock.sleep_ms(30)
+    while not done:
+        clock.sleep_ms(1)
+
+    # Abwechselnd nach virtueller Zeit, unabhängig vom Betriebssystem
+    assert events == [("main", 0), ("worker", 0), ("worker", 20), ("main", 30),
+                      ("worker", 40), ("main", 60)]
+
+def test_thread_limit_stops_main(simulator):
+    import thread_standin
+
+    clock = simulator.clock
+    clock.limit_us = 100000
+
+    def worker():
+        while True:
+            clock.sleep_ms(7)
+
+    thread_standin.start_new_thread(worker, ())
+    with pytest.raises(simulator.StopSimulation):
+        while True:
+            clock.sleep_ms(50)
+    assert clock.us == 100000
+
+def test_lightsleep_until_irq(simulator):
+    import machine
+
+    pin = machine.Pin(21, machine.Pin.IN, machine.Pin.PULL_UP)
+    pin.irq(lambda p: None, machine.Pin.IRQ_FALLING)
+    machine.press(21, 2500)
+    machine.lightsleep()
+    assert simulator.clock.ms() == 2500
+
+def test_lightsleep_stops_at_limit(simulator):
+    import machine
+
+    simulator.clock.limit_us = 1000000
+    with pytest.raises(simulator.StopSimulation):
+        machine.lightsleep()
+    assert simulator.clock.us == 1000000
+
+def test_lightsleep_without_events(simulator):
+    import machine
+
+    with pytest.raises(RuntimeError):
+        machine.lightsleep()
+
+def played_notes(entries):
+    return [t for t, freq, duty in tones(entries, BUZZER_PIN) if duty]
+
+def test_main_deterministic(tmp_path):
+    first = run_sim(tmp_path, "main.py", 30, presses=[3000])[1]
+    second = run_sim(tmp_path, "main.py", 30, presses=[3000])[1]
+    assert first == second
+    assert played_notes(first)
+
+@pytest.mark.parametrize("setting", [
+    "USE_ASYNC_RUNTIME=True",
+    "USE_PIO_DRIVER=True",
+    "USE_DUAL_CORE=True",
+])
+def test_main_mode_plays_song(tmp_path, setting):
+    output, entries = run_sim(tmp_path, "main.py", 30, presses=[2000], settings=[setting])
+    assert "Beendet" in output
+
+    # Vor dem Druck nur Augen, danach das Lied samt Lichtern
+    onsets = played_notes(entries)
+    assert len(onsets) > 20
+    assert onsets[0] >= 2000
+    assert frames(entries)[0][1] == NEOPIXEL_PIN
+    assert any(t > onsets[0] for t, pin, data in frames(entries))
+
+def test_dual_core_restores_targets(simulator):
+    import render
+    import neopixel_eyes
+    import christmas_light_show as show
+    import dual_core
+
+    eyes, music = render.PixelBuffer(12), render.PixelBuffer(12)
+    neopixel_eyes.np, show.np = eyes, music
+    renderer = dual_core.CoreRenderer(render.PixelBuffer(12))
+    renderer.start()
+    assert neopixel_eyes.np is renderer.eye_layer
+    simulator.clock.sleep_ms(100)
+    renderer.stop()
+    assert neopixel_eyes.np is eyes and show.np is music
@@ -0,0 +1,68 @@
+import pytest
+
+from conftest import ROOT
+
+# Lieder streamen: RTTTL-Prüfungen, MIDI-Sonderfälle, mehrere Leser
+
+MIDI_FIXTURE = ROOT + "/tests/data/tempo_map.mid"
+
+def events(generator):
+    return [tuple(event) for event in generator]
+
+def write_rtttl(tmp_path, text):
+    path = tmp_path / "test.rtttl"
+    path.write_bytes(text.encode())
+    return str(path)
+
+def test_rtttl_notes(tmp_path):
+    import song_stream
+
+    path = write_rtttl(tmp_path, "Test:d=4,o=5,b=120:c,8p,2c#6.,a4")
+    assert events(song_stream.rtttl_events(path)) == [
+        (523, 500), (0, 250), (1109, 1500), (440, 500)]
+
+@pytest.mark.parametrize("text", [
+    "Test:d=4,o=5,b=120:0c",      # Notendauer 0
+    "Test:d=0,o=5,b=120:c",       # Standarddauer 0
+    "Test:d=4,o=5,b=0:c",         # Tempo 0
+    "Test:d=4,o=5,b=120:c10",     # Oktave zu hoch
+    "Test:d=4,o=5,b=120:b#9",     # über der höchsten MIDI-Note
+    "Test:d=1,o=5,b=1:c",         # länger als 16 Bit ms
+])
+def test_rtttl_invalid(tmp_path, text):
+    import song_stream
+
+    with pytest.raises(ValueError):
+        events(song_stream.rtttl_events(write_rtttl(tmp_path, text)))
+
+def test_midi_tempo_map_and_open_note():
+    import song_stream
+
+    # Tempo-Spur: 120 bpm, ab Tick 960 (drittes Viertel) 240 bpm.
+    # Die letzte Note hat kein Note-Aus vor dem Spurende.
+    result = events(song_stream.midi_events(MIDI_FIXTURE))
+    expected = [(262, 500), (294, 500), (330, 250), (0, 250), (349, 250)]
+    assert [freq for freq, ms in result] == [freq for freq, ms in expected]
+    for (freq, ms), (_, expected_ms) in zip(result, expected):
+        assert abs(ms - expected_ms) <= 1
+
+def test_readers_independent():
+    import song_stream
+
+    rtttl = ROOT + "/songs/deck_the_halls.rtttl"
+    alone = (events(song_stream.rtttl_events(rtttl)), events(song_stream.midi_events(MIDI_FIXTURE)))
+
+    # Abwechselnd lesen (z.B. Show berechnen, während ein Lied spielt)
+    a = song_stream.rtttl_events(rtttl)
+    b = song_stream.midi_events(MIDI_FIXTURE)
+    mixed = ([], [])
+    while True:
+        progressed = False
+        for generator, out in ((a, mixed[0]), (b, mixed[1])):
+            event = next(generator, None)
+            if event is not None:
+                out.append(tuple(event))
+                progressed = True
+        if not progressed:
+            break
+    assert mixed == alone
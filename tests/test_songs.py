@@ -0,0 +1,64 @@
+import pytest
+
+from conftest import ROOT, records, tones, frames
+
+# Aufzeichnung jedes Lieds aus songs/ gegen seine Noten prüfen
+#
+# Jeder Ton muss zu seinem Sollzeitpunkt (Summe der vorherigen Dauern) mit
+# der richtigen Frequenz beginnen und vor der nächsten Note wieder aus sein,
+# beide Abspielwege (ToneSequencer und Schleife) müssen dasselbe liefern.
+
+# Timer-Auflösung des ToneSequencer plus Rundung auf ganze ms
+TOLERANCE_MS = 2
+
+def song_paths():
+    """Alle Lieder, relativ zum Projektordner (wie auf dem Pico)"""
+    import song_stream
+    directory = ROOT + "/" + song_stream.SONG_DIR
+    return [song_stream.SONG_DIR + path[len(directory):] for path in song_stream.list_songs(directory)]
+
+def expected_notes(path):
+    """[(start_ms, ende_ms, frequenz), ...] aller klingenden Noten"""
+    import song_stream
+    import song_format
+    notes = []
+    start = 0
+    for event in song_stream.open_song(path).events():
+        duration = event[song_format.DURATION]
+        if event[song_format.FREQ] and duration:
+            notes.append((start, start + duration, event[song_format.FREQ]))
+        start += duration
+    return notes, start
+
+@pytest.mark.parametrize("sequenced", [True, False], ids=["sequencer", "schleife"])
+@pytest.mark.parametrize("path", song_paths())
+def test_song_trace(simulator, path, sequenced):
+    import hardware
+    import christmas_light_show as show
+    import song_stream
+
+    hw = hardware.init()
+    show.init_hardware(neopixel_obj=hw.np, buzzer_obj=hw.buzzer)
+    show.USE_TIMER_SEQUENCER = sequenced
+    notes, total_ms = expected_notes(path)
+
+    show.play_melody(song_stream.open_song(path).events())
+    show.sequencer.stop()
+
+    entries = records(simulator.trace.stream)
+    played = tones(entries, hardware.BUZZER_PIN)
+    onsets = [(t, freq) for t, freq, duty in played if duty]
+    assert len(onsets) == len(notes)
+    for (t, freq), (start, end, expected) in zip(onsets, notes):
+        assert freq == expected
+        assert 0 <= t - start <= TOLERANCE_MS, (start, t)
+
+    # Nach jedem Ton ist der Buzzer vor dem Ende der Note aus
+    offsets = [t for t, freq, duty in played if not duty][-len(notes):]
+    for t, (start, end, expected) in zip(offsets, notes):
+        assert start < t <= end + TOLERANCE_MS
+
+    assert abs(show.drift_log.actual_ms - total_ms) <= TOLERANCE_MS
+    # Lichter laufen mit (mindestens jeder zweite Frame, gesendet und aufgezeichnet)
+    assert simulator.trace.frames > total_ms // (2 * show.FRAME_MS)
+    assert frames(entries)
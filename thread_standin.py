@@ -0,0 +1,54 @@
+import sys
+import threading
+
+# Ersatz für das MicroPython-Modul _thread auf dem PC
+#
+# Bietet dieselben Funktionen wie _thread auf dem RP2040 (allocate_lock,
+# start_new_thread, get_ident), damit dual_core.py ohne Pico getestet
+# werden kann. Der zweite Kern wird durch einen normalen Thread ersetzt.
+# Im Simulator (python3 -m sim) startet er über die virtuelle Uhr und
+# wechselt sich beim Schlafen mit dem Haupt-Thread ab (sim/timebase.py).
+# Die Locks zählen zusätzlich, wie oft sie schon belegt waren.
+
+class LockType:
+    """Lock wie _thread.LockType, zählt Wartefälle in contended"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.contended = 0
+
+    def acquire(self, waitflag=1, timeout=-1):
+        if self._lock.acquire(False):
+            return True
+        if not waitflag:
+            return False
+        self.contended += 1
+        return self._lock.acquire(True, timeout)
+
+    def release(self):
+        self._lock.release()
+
+    def locked(self):
+        return self._lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+def allocate_lock():
+    return LockType()
+
+def start_new_thread(function, args, kwargs=None):
+    sim = sys.modules.get("sim")
+    if sim is not None and sim.clock is not None:
+        return sim.clock.start_thread(function, args, kwargs)
+    thread = threading.Thread(target=function, args=args, kwargs=kwargs or {})
+    thread.daemon = True
+    thread.start()
+    return thread.ident
+
+def get_ident():
+    return threading.get_ident()
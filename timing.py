@@ -0,0 +1,115 @@
+from time import ticks_ms, ticks_add, ticks_diff
+from array import array
+
+import log
+import profiler
+
+# Zeitsteuerung mit absoluten Deadlines
+#
+# Statt nach jedem Frame fest zu schlafen (und dabei die Renderzeit und
+# np.write() zu ignorieren), wird auf absolute Zeitpunkte relativ zum
+# Start gewartet. Verspätungen summieren sich dadurch nicht auf und
+# verpasste Frames werden übersprungen.
+
+MAX_DRIFT_ENTRIES = 256  # Anzahl Noten, deren Drift einzeln gespeichert wird
+
+class Scheduler:
+    """Zeitbasis in Millisekunden seit reset()"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Setzt den Startzeitpunkt auf jetzt"""
+        self.start = ticks_ms()
+        self.skipped_frames = 0
+
+    def now(self):
+        """Millisekunden seit reset()"""
+        return ticks_diff(ticks_ms(), self.start)
+
+    def sleep_until(self, t):
+        """Schläft bis zum Zeitpunkt t (ms seit reset())
+
+        Returns:
+            Verspätung in ms (0 wenn pünktlich, > 0 wenn t schon vorbei war)
+        """
+        remaining = t - self.now()
+        if remaining > 0:
+            profiler.sleep_ms(remaining)
+        return self.now() - t
+
+    def next_frame(self, frame_time, frame_ms, end=None):
+        """Wartet auf den nächsten Frame und überspringt verpasste Frames
+
+        Args:
+            frame_time: Zeitpunkt des gerade gerenderten Frames
+            frame_ms: Abstand zwischen zwei Frames
+            end: Zeitpunkt, über den nicht hinaus gewartet wird (optional)
+
+        Returns:
+            Zeitpunkt des nächsten Frames (höchstens end)
+        """
+        frame_time += frame_ms
+        now = self.now()
+        if frame_time <= now:
+            missed = (now - frame_time) // frame_ms + 1
+            self.skipped_frames += missed
+            frame_time += missed * frame_ms
+
+        if end is not None and frame_time > end:
+            frame_time = end
+
+        self.sleep_until(frame_time)
+        return frame_time
+
+def deadline_after(ms):
+    """Absolute Deadline (ticks_ms) in ms Millisekunden"""
+    return ticks_add(ticks_ms(), ms)
+
+def remaining_ms(deadline):
+    """Verbleibende Zeit bis zur Deadline (negativ wenn vorbei)"""
+    return ticks_diff(deadline, ticks_ms())
+
+class DriftLog:
+    """Protokolliert, wie weit jede Note von ihrem Sollzeitpunkt abweicht"""
+
+    def __init__(self, size=MAX_DRIFT_ENTRIES):
+        self.drift = array('h', [0] * size)
+        self.reset()
+
+    def reset(self):
+        """Löscht alle Einträge (vor einem neuen Lied)"""
+        self.count = 0
+        self.max_drift = 0
+        self.sum_drift = 0
+        self.nominal_ms = 0
+        self.actual_ms = 0
+
+    def record(self, drift_ms):
+        """Speichert die Abweichung einer Note in ms (positiv = zu spät)"""
+        if profiler.ENABLED:
+            profiler.ONSET.add(abs(drift_ms) * 1000)
+        if self.count < len(self.drift):
+            self.drift[self.count] = drift_ms
+        self.count += 1
+
+        if abs(drift_ms) > abs(self.max_drift):
+            self.max_drift = drift_ms
+        self.sum_drift += abs(drift_ms)
+
+    def finish(self, nominal_ms, actual_ms):
+        """Speichert Soll- und Ist-Dauer des ganzen Lieds"""
+        self.nominal_ms = nominal_ms
+        self.actual_ms = actual_ms
+
+    def report(self):
+        """Gibt eine Zusammenfassung und die Drift jeder Note aus"""
+        mean = self.sum_drift / self.count if self.count else 0
+        log.info("Timing: Soll {} ms, Ist {} ms, Abweichung {} ms",
+                 self.nominal_ms, self.actual_ms, self.actual_ms - self.nominal_ms)
+        log.info("Noten: {}, Drift max {} ms, Mittel {:.1f} ms",
+                 self.count, self.max_drift, mean)
+
+        stored = min(self.count, len(self.drift))
+        log.info("Drift pro Note (ms): " + " ".join(str(self.drift[i]) for i in range(stored)))
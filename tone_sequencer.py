@@ -0,0 +1,166 @@
+from machine import Timer
+from time import ticks_ms, ticks_diff
+from array import array
+
+from timing import DriftLog
+from song_format import FREQ, DURATION
+
+# Tonfolge per Hardware-Timer
+#
+# Die Melodie wird vorab in eine Event-Liste (Startzeit + Frequenz) in
+# festen Arrays umgerechnet. Ein periodischer machine.Timer schaltet
+# PWM.freq/duty_u16 genau zu diesen Zeitpunkten, unabhängig davon, wie lange
+# das Rendern der LEDs im Hauptprogramm dauert. Das Hauptprogramm liest nur
+# die aktuelle Position (position, frequency, sounding) und füllt bei langen
+# Liedern mit feed() die Event-Liste nach.
+
+CAPACITY = 128          # Events im Ringpuffer (2 pro Note)
+TIMER_PERIOD_MS = 1     # Auflösung der Tonsteuerung
+NOTE_GAP_MS = 50        # Pause am Ende jeder Note
+
+# Event-Arten
+EVENT_OFF = 0
+EVENT_ON = 1
+EVENT_END = 2
+
+class ToneSequencer:
+    """Spielt Noten-Events (siehe song_format) per Timer-Interrupt auf dem Buzzer"""
+
+    def __init__(self, buzzer, volume, capacity=CAPACITY, gap_ms=NOTE_GAP_MS, onset_log=None):
+        self.buzzer = buzzer
+        self.volume = volume
+        self.gap_ms = gap_ms
+        self.capacity = capacity
+
+        # Vorberechnete Events (Ringpuffer)
+        self._time = array('i', [0] * capacity)   # ms seit Liedstart
+        self._freq = array('H', [0] * capacity)   # Frequenz in Hz
+        self._kind = bytearray(capacity)          # EVENT_ON/OFF/END
+        self._head = 0
+        self._tail = 0
+
+        # Noch nicht umgerechnete Noten
+        self._notes = None
+        self._next_time = 0
+
+        # Position für das Hauptprogramm
+        self.position = -1     # Index der aktuellen Note
+        self.frequency = 0     # Frequenz der aktuellen Note
+        self.sounding = False  # Ton gerade an (False = Pause zwischen Noten)
+        self.running = False
+
+        # Abweichung jedes Tonbeginns vom Sollzeitpunkt
+        self.onset_log = onset_log if onset_log is not None else DriftLog()
+
+        self._start = 0
+        self._timer = Timer()
+        self._callback = self._tick
+
+    def _free(self):
+        """Freie Plätze im Ringpuffer"""
+        return (self._tail - self._head - 1) % self.capacity
+
+    def _push(self, t, frequency, kind):
+        head = self._head
+        self._time[head] = t
+        self._freq[head] = frequency
+        self._kind[head] = kind
+        self._head = (head + 1) % self.capacity
+
+    def feed(self):
+        """Rechnet weitere Noten in Events um, solange Platz ist
+
+        Wird vom Hauptprogramm regelmäßig aufgerufen (nicht im Interrupt).
+        """
+        notes = self._notes
+        if notes is None:
+            return
+
+        while self._free() >= 2:
+            try:
+                event = next(notes)
+            except StopIteration:
+                # Ende des Lieds als eigenes Event
+                if self._free() >= 1:
+                    self._push(self._next_time, 0, EVENT_END)
+                    self._notes = None
+                return
+
+            frequency = event[FREQ]
+            duration_ms = event[DURATION]
+            start = self._next_time
+            end = start + duration_ms
+            gap = min(self.gap_ms, duration_ms // 4)
+
+            self._push(start, frequency, EVENT_ON)
+            self._push(end - gap, 0, EVENT_OFF)
+            self._next_time = end
+
+    def start(self, notes):
+        """Startet ein Lied
+
+        Args:
+            notes: Iterator über Noten-Events [frequenz, dauer_ms]; Frequenz 0 = Pause
+        """
+        self.stop()
+
+        self._notes = iter(notes)
+        self._next_time = 0
+        self._head = 0
+        self._tail = 0
+        self.position = -1
+        self.frequency = 0
+        self.sounding = False
+        self.onset_log.reset()
+        self.feed()
+
+        self.running = True
+        self._start = ticks_ms()
+        self._timer.init(mode=Timer.PERIODIC, period=TIMER_PERIOD_MS, callback=self._callback)
+
+    def stop(self):
+        """Bricht das Lied ab und schaltet den Buzzer aus"""
+        self._timer.deinit()
+        self.buzzer.duty_u16(0)
+        self.running = False
+        self.sounding = False
+        self._notes = None
+
+    def elapsed_ms(self):
+        """Millisekunden seit Liedstart"""
+        return ticks_diff(ticks_ms(), self._start)
+
+    def _tick(self, timer):
+        """Timer-Callback: fällige Events ausführen (keine Allokation)"""
+        now = ticks_diff(ticks_ms(), self._start)
+
+        while self._tail != self._head:
+            tail = self._tail
+            t = self._time[tail]
+            if t > now:
+                return
+
+            kind = self._kind[tail]
+            self._tail = (tail + 1) % self.capacity
+
+            if kind == EVENT_ON:
+                frequency = self._freq[tail]
+                if frequency == 0:
+                    self.buzzer.duty_u16(0)
+                else:
+                    self.buzzer.freq(frequency)
+                    self.buzzer.duty_u16(self.volume)
+                self.onset_log.record(now - t)
+                self.position += 1
+                self.frequency = frequency
+                self.sounding = True
+            elif kind == EVENT_OFF:
+                self.buzzer.duty_u16(0)
+                self.sounding = False
+            else:
+                self.buzzer.duty_u16(0)
+                self.sounding = False
+                self.running = False
+                self.onset_log.finish(t, now)
+                timer.deinit()
+                return
@@ -0,0 +1,188 @@
+from time import ticks_us, ticks_add, ticks_diff, sleep_us
+
+try:
+    import rp2
+except ImportError:
+    rp2 = None
+
+import render
+
+# WS2812-Ausgabe per PIO und DMA (nicht blockierend)
+#
+# neopixel.NeoPixel.write() blockiert die CPU für die ganze Übertragung
+# (ca. 30 µs pro LED). PIOPixels schiebt die Bits mit einer PIO-State-
+# Machine heraus, die Daten liefert ein DMA-Kanal. write() kopiert den
+# Puffer in einen Sendepuffer, startet den DMA und kehrt sofort zurück,
+# der nächste Frame kann also schon gezeichnet werden, während der
+# vorherige noch übertragen wird. busy() / wait() zeigen an, ob die
+# Übertragung inklusive Reset-Pause fertig ist.
+#
+# Die Klassen bieten buf, bpp, ORDER, n, np[i] und write() wie NeoPixel und
+# können direkt als np an neopixel_eyes und christmas_light_show gehen.
+# create() liefert auf dem Pico PIOPixels, sonst MockPixels (gleiche API,
+# simuliert die Übertragungszeit).
+
+BIT_US = 1.25           # Dauer eines Bits bei 800 kHz
+RESET_US = 300          # Pause nach dem Frame (WS2812B: mind. 280 µs)
+SM_FREQ = 8000000       # 10 Takte pro Bit
+
+# Adressen für den DMA (RP2040 Datenblatt): TX-FIFO der State-Machines
+_PIO_BASE = (0x50200000, 0x50300000)
+_TXF0 = 0x010
+# DREQ der TX-FIFOs: PIO0 0-3, PIO1 8-11
+_DREQ_PIO_TX = (0, 8)
+
+# Wird von MockPixels für jeden gesendeten Frame aufgerufen: monitor(pin, buf)
+# (der Simulator setzt hier seine Aufzeichnung ein, siehe sim/__init__.py)
+monitor = None
+
+def transfer_us(n, bpp=3):
+    """Dauer einer Übertragung in µs (ohne Reset-Pause)"""
+    return int(n * bpp * 8 * BIT_US)
+
+if rp2 is not None:
+    @rp2.asm_pio(sideset_init=rp2.PIO.OUT_LOW, out_shiftdir=rp2.PIO.SHIFT_LEFT,
+                 autopull=True, pull_thresh=8)
+    def _ws2812():
+        # 1-Bit: 7 Takte high, 3 low / 0-Bit: 2 Takte high, 8 low
+        wrap_target()
+        label("bitloop")
+        out(x, 1)               .side(0)    [2]
+        jmp(not_x, "do_zero")   .side(1)    [1]
+        jmp("bitloop")          .side(1)    [4]
+        label("do_zero")
+        nop()                   .side(0)    [4]
+        wrap()
+
+class _Pixels:
+    """Gemeinsame NeoPixel-API für PIOPixels und MockPixels"""
+
+    ORDER = (1, 0, 2, 3)
+
+    def __init__(self, n, bpp):
+        self.n = n
+        self.bpp = bpp
+        self.buf = bytearray(n * bpp)
+        # Sendepuffer: wird während der Übertragung gelesen
+        self._out = bytearray(n * bpp)
+        self._done_us = ticks_add(ticks_us(), -RESET_US)
+        self.frames = 0
+        self.waits = 0
+
+    def __len__(self):
+        return self.n
+
+    def __setitem__(self, i, v):
+        render.set_pixel(self, i, v[0], v[1], v[2])
+
+    def __getitem__(self, i):
+        offset = i * self.bpp
+        order = self.ORDER
+        buf = self.buf
+        return (buf[offset + order[0]], buf[offset + order[1]], buf[offset + order[2]])
+
+    def fill(self, v):
+        render.fill(self, v[0], v[1], v[2])
+
+    def _sending(self):
+        return False
+
+    def busy(self):
+        """True solange die letzte Übertragung oder ihre Reset-Pause läuft"""
+        if self._sending():
+            return True
+        return ticks_diff(ticks_us(), self._done_us) < RESET_US
+
+    def wait(self):
+        """Wartet, bis die letzte Übertragung abgeschlossen ist"""
+        if self.busy():
+            self.waits += 1
+            while self.busy():
+                sleep_us(20)
+
+    def write(self):
+        """Startet die Übertragung des Puffers und kehrt sofort zurück"""
+        self.wait()
+        self._out[:] = self.buf
+        self._start()
+        self.frames += 1
+
+class PIOPixels(_Pixels):
+    """WS2812 über PIO-State-Machine und DMA
+
+    Args:
+        pin: machine.Pin der Datenleitung
+        n: Anzahl LEDs
+        bpp: Bytes pro LED (3 = RGB, 4 = RGBW)
+        sm_id: State-Machine 0-7 (4-7 liegen auf PIO1)
+    """
+
+    def __init__(self, pin, n, bpp=3, sm_id=0):
+        super().__init__(n, bpp)
+        self.sm = rp2.StateMachine(sm_id, _ws2812, freq=SM_FREQ, sideset_base=pin)
+        self.sm.active(1)
+
+        pio = sm_id // 4
+        self._txf = _PIO_BASE[pio] + _TXF0 + 4 * (sm_id % 4)
+
+        # Ältere Firmware ohne rp2.DMA: blockierend über sm.put()
+        self.dma = rp2.DMA() if hasattr(rp2, "DMA") else None
+        if self.dma is not None:
+            self._ctrl = self.dma.pack_ctrl(size=0, inc_write=False,
+                                            treq_sel=_DREQ_PIO_TX[pio] + sm_id % 4)
+
+    def _sending(self):
+        if self.dma is not None and self.dma.active():
+            return True
+        if self.sm.tx_fifo():
+            return True
+        return False
+
+    def _start(self):
+        if self.dma is None:
+            self.sm.put(self._out, 24)
+            self._done_us = ticks_us()
+            return
+
+        # Ende der Übertragung: DMA fertig + FIFO leer, danach die Reset-Pause.
+        # Der Zeitpunkt wird großzügig ab jetzt geschätzt (keine IRQ nötig).
+        self._done_us = ticks_add(ticks_us(), transfer_us(self.n, self.bpp))
+        self.dma.config(read=self._out, write=self._txf, count=len(self._out),
+                        ctrl=self._ctrl, trigger=True)
+
+    def deinit(self):
+        if self.dma is not None:
+            self.dma.close()
+        self.sm.active(0)
+
+class MockPixels(_Pixels):
+    """Ersatz für PIOPixels auf dem PC (gleiche API, keine Hardware)
+
+    Die Übertragung dauert wie auf dem Strip transfer_us(), danach kommt
+    die Reset-Pause. last_frame enthält den zuletzt gesendeten Frame.
+    """
+
+    def __init__(self, pin, n, bpp=3, sm_id=0):
+        super().__init__(n, bpp)
+        self.pin = pin
+        self.last_frame = bytearray(n * bpp)
+        self._end_us = self._done_us
+
+    def _sending(self):
+        return ticks_diff(self._end_us, ticks_us()) > 0
+
+    def _start(self):
+        self.last_frame[:] = self._out
+        if monitor is not None:
+            monitor(self.pin, self._out)
+        self._end_us = ticks_add(ticks_us(), transfer_us(self.n, self.bpp))
+        self._done_us = self._end_us
+
+    def deinit(self):
+        pass
+
+def create(pin, n, bpp=3, sm_id=0):
+    """PIOPixels auf dem Pico, sonst MockPixels"""
+    if rp2 is None:
+        return MockPixels(pin, n, bpp, sm_id)
+    return PIOPixels(pin, n, bpp, sm_id)